@@ -0,0 +1,71 @@
+# app/artifacts.py
+# Artifact helpers: the content-hash transcript memo and duplicate cleanup.
+import logging
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app import models
+from app.llm import is_failed_transcript
+from app.llm_cache import hash_file
+from app.transcripts import ARTIFACT_ORDER, rebuild_transcript
+
+logger = logging.getLogger(__name__)
+
+def lookup_transcripts(db: Session, hashes: set[str]) -> dict[str, str]:
+    """Known transcripts for the given content hashes."""
+    if not hashes:
+        return {}
+    rows = db.query(models.TranscriptMemo).filter(models.TranscriptMemo.content_hash.in_(hashes)).all()
+    return {row.content_hash: row.transcript_text for row in rows}
+
+def remember_transcript(db: Session, content_hash: str, kind: models.ArtifactKind, text: str) -> None:
+    """Store a transcript for reuse; failures and placeholders are not remembered. Caller commits."""
+    if not content_hash or not text or is_failed_transcript(text):
+        return
+    if db.get(models.TranscriptMemo, content_hash) is None:
+        db.add(models.TranscriptMemo(content_hash=content_hash, kind=kind, transcript_text=text))
+
+def ensure_content_hash(artifact: models.Artifact) -> str | None:
+    """Fill in content_hash for artifacts uploaded before hashes were recorded."""
+    if not artifact.content_hash and artifact.file_path:
+        try:
+            artifact.content_hash = hash_file(artifact.file_path)
+        except OSError as e:
+            logger.warning(f"Cannot hash artifact {artifact.id}: {e}")
+    return artifact.content_hash
+
+def dedupe_artifacts(db: Session, meeting_id: str | None = None) -> dict[str, int]:
+    """Delete artifacts that repeat an earlier artifact of the same meeting.
+
+    Duplicates share a content hash or an identical transcript; failure placeholders do not count
+    as transcripts, so files that failed the same way are kept and retried. Runs over every meeting unless
+    ``meeting_id`` is given. Returns the number of artifacts removed per meeting.
+    Stored transcripts of the affected meetings are rebuilt.
+    """
+    query = db.query(models.Artifact.id, models.Artifact.meeting_id, models.Artifact.content_hash, models.Artifact.transcript_text)
+    if meeting_id:
+        query = query.filter(models.Artifact.meeting_id == meeting_id)
+    seen: set[tuple] = set()
+    removed: dict[str, int] = {}
+    doomed: list[str] = []
+    # Keep the first of each group in transcript order (app/transcripts.py), ties included
+    query = query.order_by(models.Artifact.meeting_id, *ARTIFACT_ORDER)
+    for art_id, mid, content_hash, transcript in query:
+        keys = [(mid, "hash", content_hash)] if content_hash else []
+        if transcript and not is_failed_transcript(transcript):
+            keys.append((mid, "text", transcript))  # failure placeholders repeat across different files
+        if not keys:
+            continue  # nothing to compare yet (e.g. untranscribed legacy upload)
+        if any(k in seen for k in keys):
+            doomed.append(art_id)
+            removed[mid] = removed.get(mid, 0) + 1
+        seen.update(keys)
+    for start in range(0, len(doomed), 500):
+        db.execute(delete(models.Artifact).where(models.Artifact.id.in_(doomed[start:start + 500])))
+    models.touch_meetings(db, removed.keys())
+    db.commit()
+    for mid in removed:
+        rebuild_transcript(db, mid)
+    logger.info(f"Removed {len(doomed)} duplicate artifacts across {len(removed)} meetings")
+    return removed
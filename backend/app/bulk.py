@@ -0,0 +1,61 @@
+# app/bulk.py
+# Bulk write path for rows that arrive as lists (participants, decisions, action items).
+#
+# Ids are generated client-side, so a whole batch goes to the database as one multi-row
+# INSERT ... RETURNING instead of an INSERT per row plus a SELECT per row to read it back.
+# Rows that carry an id which already exists in the same meeting are updated in place
+# (INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL), which makes re-importing
+# the same list idempotent.
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+def _dialect_insert(db: Session):
+    """The dialect's INSERT with ON CONFLICT support, or None where there is no upsert."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+def upsert_rows(db: Session, model, rows: list[dict], update_columns: tuple[str, ...]) -> list[dict]:
+    """Insert ``rows`` (dicts of column values) in one statement and return them as stored.
+
+    Rows without an ``id`` get a new uuid. A row whose id already exists is updated
+    (``update_columns`` only; none means existing rows are kept as they are) if it belongs to
+    the same meeting, and left out of the result if it does not: ids cannot move rows between
+    meetings. Returns mappings in input order, including server defaults such as created_at.
+    The caller commits.
+    """
+    if not rows:
+        return []
+    for row in rows:
+        if not row.get("id"):
+            row["id"] = str(uuid.uuid4())
+
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is None:
+        stmt = insert(model)
+    else:
+        stmt = dialect_insert(model)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[model.id],
+                set_={name: stmt.excluded[name] for name in update_columns},
+                where=model.meeting_id == stmt.excluded.meeting_id,
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[model.id])
+    stored = db.execute(stmt.returning(*model.__table__.c), rows).mappings().all()
+    # RETURNING order is not guaranteed across batches; put rows back in request order
+    by_id = {row["id"]: row for row in stored}
+    result = [by_id[row["id"]] for row in rows if row["id"] in by_id]
+    # Bulk statements skip the flush hook that keeps the bundle ETag current
+    models.touch_meetings(db, {row["meeting_id"] for row in result})
+    return result
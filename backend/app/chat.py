@@ -0,0 +1,216 @@
+# app/chat.py
+# Conversation-aware chat sessions.
+#
+# A session keeps its turns in chat_turns. The last CHAT_HISTORY_TURNS turns go into the prompt
+# verbatim; once more than CHAT_SUMMARY_BATCH turns pile up beyond that, the older ones are folded
+# into chat_sessions.history_summary, so the history sent with a question stays bounded.
+#
+# The meeting context (stored transcript, its prepared form and, where the provider supports it,
+# a provider-side context cache holding it) is built once per meeting version and shared by every
+# session on that meeting. Meeting.updated_at changes whenever an artifact does, so a follow-up
+# question costs one primary-key lookup instead of reading the transcript.
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.transcripts import load_transcript
+from app.db import SessionLocal
+from app.llm import (
+    prepare_transcript, cache_transcript_context, chat_prompt, answer_chat, stream_answer_chat,
+    summarize_chat_history,
+)
+from app.retrieval import retrieve, format_passage
+
+logger = logging.getLogger(__name__)
+
+CHAT_HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "6"))
+CHAT_SUMMARY_BATCH = int(os.getenv("CHAT_SUMMARY_BATCH", "4"))
+CHAT_CONTEXT_CACHE_ENTRIES = int(os.getenv("CHAT_CONTEXT_CACHE_ENTRIES", "64"))
+CHAT_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("CHAT_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+CHAT_RECORD_ATTEMPTS = 5
+
+NO_TRANSCRIPT = "No transcript available yet. Please upload meeting audio, image, or text first."
+NO_MATCH = "Couldn't find a direct answer in the transcript."
+
+@dataclass
+class MeetingContext:
+    version: datetime | None
+    transcript: str
+    transcript_hash: str
+    prepared: str
+    provider_cache: object | None = None
+    provider_cache_expires_at: float = 0.0
+
+@dataclass
+class TurnPlan:
+    """Everything needed to answer one question; ``answer`` is set when no model call is needed."""
+    session_id: str
+    meeting_id: str
+    question: str
+    passages: list[dict] = field(default_factory=list)
+    prompt: str = ""
+    cache_input: str = ""
+    fallback: str = "Answer not available."
+    cached_context: object | None = None
+    answer: str | None = None
+
+_contexts: OrderedDict[str, MeetingContext] = OrderedDict()
+_contexts_lock = threading.Lock()
+_compacting: set[str] = set()
+
+def meeting_context(db: Session, meeting: models.Meeting) -> MeetingContext:
+    """The meeting's transcript context, rebuilt only when the meeting has changed since."""
+    with _contexts_lock:
+        ctx = _contexts.get(meeting.id)
+        if ctx is not None and ctx.version == meeting.updated_at:
+            _contexts.move_to_end(meeting.id)
+        else:
+            ctx = None
+    if ctx is None:
+        stored = load_transcript(db, meeting.id)
+        ctx = MeetingContext(
+            version=meeting.updated_at,
+            transcript=stored.text,
+            transcript_hash=stored.content_hash,
+            prepared=prepare_transcript(stored.text) if stored.text.strip() else "",
+        )
+        logger.info(f"Built chat context for meeting {meeting.id} ({len(ctx.prepared)} chars)")
+        with _contexts_lock:
+            _contexts[meeting.id] = ctx
+            while len(_contexts) > CHAT_CONTEXT_CACHE_ENTRIES:
+                _contexts.popitem(last=False)
+    if ctx.prepared and ctx.provider_cache_expires_at < time.time():
+        ctx.provider_cache = cache_transcript_context(ctx.prepared, CHAT_CONTEXT_CACHE_TTL_SECONDS)
+        # Replace it a little before the provider expires it
+        ctx.provider_cache_expires_at = time.time() + CHAT_CONTEXT_CACHE_TTL_SECONDS * 0.9
+    return ctx
+
+def create_session(db: Session, mid: str) -> models.ChatSession:
+    session = models.ChatSession(meeting_id=mid)
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+def history_text(session: models.ChatSession, turns: list[models.ChatTurn]) -> str:
+    lines = [f"Earlier in this conversation: {session.history_summary}"] if session.history_summary else []
+    for turn in turns:
+        lines += [f"User: {turn.question}", f"Assistant: {turn.answer}"]
+    return "\n".join(lines)
+
+def recent_turns(db: Session, session: models.ChatSession, limit: int | None = None) -> list[models.ChatTurn]:
+    """Turns not yet folded into the summary, oldest first; the newest ``limit`` if given."""
+    query = db.query(models.ChatTurn).filter(
+        models.ChatTurn.session_id == session.id, models.ChatTurn.position >= session.summarized_turns,
+    ).order_by(models.ChatTurn.position.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return list(reversed(query.all()))
+
+def plan_turn(mid: str, session_id: str, question: str, offline: bool = False) -> TurnPlan:
+    """Build the prompt for a question in a session. Raises LookupError for an unknown session."""
+    with SessionLocal() as db:
+        session = db.get(models.ChatSession, session_id)
+        if session is None or session.meeting_id != mid:
+            raise LookupError(session_id)
+        ctx = meeting_context(db, session.meeting)
+        history = history_text(session, recent_turns(db, session, CHAT_HISTORY_TURNS))
+
+    plan = TurnPlan(session_id=session_id, meeting_id=mid, question=question)
+    if not ctx.transcript.strip():
+        plan.answer = NO_TRANSCRIPT
+        return plan
+    plan.passages = retrieve(mid, ctx.transcript, question)
+    excerpts = [format_passage(p) for p in plan.passages]
+    if offline:
+        plan.answer = excerpts[0] if excerpts else NO_MATCH
+        return plan
+    if excerpts:
+        plan.fallback = excerpts[0]
+    if ctx.provider_cache is not None:
+        # The whole transcript is already with the provider; the turn only sends history and question
+        plan.cached_context = ctx.provider_cache
+        plan.prompt, plan.cache_input = chat_prompt(question, history, context_id=ctx.transcript_hash)
+    elif excerpts:
+        plan.prompt, plan.cache_input = chat_prompt(question, history, excerpts=excerpts, context_id=ctx.transcript_hash)
+    else:
+        # No term overlap (e.g. "summarize the meeting"): fall back to the whole transcript
+        plan.prompt, plan.cache_input = chat_prompt(question, history, transcript=ctx.prepared,
+                                                    context_id=ctx.transcript_hash)
+    return plan
+
+def answer(plan: TurnPlan) -> str:
+    if plan.answer is not None:
+        return plan.answer
+    return answer_chat(plan.prompt, plan.cache_input, plan.fallback, plan.meeting_id, plan.cached_context)
+
+def stream_answer(plan: TurnPlan):
+    """Yield the answer in chunks; the turn is recorded only if the stream runs to the end."""
+    if plan.answer is not None:
+        chunks = iter([plan.answer])
+    else:
+        chunks = stream_answer_chat(plan.prompt, plan.cache_input, plan.fallback, plan.meeting_id, plan.cached_context)
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    record_turn(plan.session_id, plan.question, "".join(parts))
+
+def record_turn(session_id: str, question: str, answer_text: str) -> None:
+    turn = models.ChatTurn.__table__
+    with SessionLocal() as db:
+        for attempt in range(CHAT_RECORD_ATTEMPTS):
+            # The next position is read by the INSERT itself, which SQLite runs under its write lock;
+            # elsewhere a concurrent answer may take it first and the unique index makes us retry
+            next_position = select(
+                literal(str(uuid.uuid4())), literal(session_id),
+                func.coalesce(func.max(turn.c.position) + 1, 0), literal(question), literal(answer_text),
+            ).where(turn.c.session_id == session_id)
+            try:
+                db.execute(insert(turn).from_select(["id", "session_id", "position", "question", "answer"], next_position))
+                db.commit()
+                return
+            except IntegrityError:
+                db.rollback()
+                if attempt == CHAT_RECORD_ATTEMPTS - 1:
+                    raise
+
+def compact_history(session_id: str) -> None:
+    """Fold turns older than the last CHAT_HISTORY_TURNS into the session summary, in batches."""
+    with _contexts_lock:
+        if session_id in _compacting:
+            return  # another request is already compacting this session
+        _compacting.add(session_id)
+    try:
+        with SessionLocal() as db:
+            session = db.get(models.ChatSession, session_id)
+            if session is None:
+                return
+            turns = recent_turns(db, session)
+            if len(turns) <= CHAT_HISTORY_TURNS + CHAT_SUMMARY_BATCH:
+                return
+            folded = turns[:len(turns) - CHAT_HISTORY_TURNS]
+            session.history_summary = summarize_chat_history(
+                session.history_summary, [(t.question, t.answer) for t in folded], session.meeting_id,
+            )
+            session.summarized_turns = folded[-1].position + 1
+            db.commit()
+            logger.info(f"Folded {len(folded)} chat turns into the summary of session {session_id}")
+    finally:
+        with _contexts_lock:
+            _compacting.discard(session_id)
@@ -1,19 +1,123 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./meeting.db")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# ---- Engine profile (all overridable from the environment) ----
+# SQLite: WAL lets readers run while a processing job writes; NORMAL sync is durable in WAL mode
+# except for the last transactions on power loss; busy_timeout makes writers wait instead of
+# failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+
+# Pool: the sync pool serves job workers, transcription threads and sync endpoints (threadpool);
+# the async pool serves async def endpoints.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; server-side idle cutoffs (Postgres)
+
+def _is_memory_db(url: str) -> bool:
+    return IS_SQLITE and (":memory:" in url or url.rstrip("/").endswith("sqlite:"))
+
+def engine_options(url: str) -> dict:
+    if _is_memory_db(url):
+        return {}  # single shared connection; pool settings do not apply
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if not IS_SQLITE:
+        options.update(pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=True)
+    return options
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")  # negative = KiB
+    cursor.close()
+
+# ---- Pool metrics ----
+_pool_counters: dict[str, dict[str, int]] = {}
+
+def _instrument(sync_engine, name: str) -> None:
+    counters = _pool_counters.setdefault(name, {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0})
+
+    def count(key):
+        def listener(*args):
+            counters[key] += 1
+        return listener
 
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+    event.listen(sync_engine, "connect", count("connects"))
+    event.listen(sync_engine, "checkout", count("checkouts"))
+    event.listen(sync_engine, "checkin", count("checkins"))
+    event.listen(sync_engine, "invalidate", count("invalidations"))
+    if IS_SQLITE:
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **engine_options(DATABASE_URL))
+_instrument(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def to_async_url(url: str) -> str:
+    """Swap a sync driver for its asyncio counterpart (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgres:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+# Async engine for request handlers that run on the event loop
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+_instrument(async_engine.sync_engine, "async")
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+def pool_stats() -> dict:
+    """Current pool occupancy and lifetime event counts for both engines."""
+    stats = {}
+    for name, eng in (("sync", engine), ("async", async_engine.sync_engine)):
+        pool = eng.pool
+        entry = {"pool": type(pool).__name__, **_pool_counters[name]}
+        if hasattr(pool, "checkedout"):
+            entry.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+                max_overflow=DB_MAX_OVERFLOW,
+            )
+        stats[name] = entry
+    if IS_SQLITE:
+        stats["sqlite"] = {
+            "journal_mode": SQLITE_JOURNAL_MODE,
+            "synchronous": SQLITE_SYNCHRONOUS,
+            "busy_timeout_ms": SQLITE_BUSY_TIMEOUT_MS,
+            "mmap_size": SQLITE_MMAP_SIZE,
+            "cache_size_kb": SQLITE_CACHE_SIZE_KB,
+        }
+    return stats
+
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -22,3 +126,49 @@ def get_db():
     finally:
         db.close()
 
+# Dependency for async def endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def add_missing_columns():
+    """Lightweight migration for databases created before a column was added to the models.
+
+    create_all() only creates missing tables, so nullable columns (and their indexes)
+    added later are applied here with ALTER TABLE. Existing rows get the column's server default.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning(f"Cannot add NOT NULL column {table.name}.{column.name}; run a manual migration")
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                if column.server_default is not None:
+                    # SQLite cannot ALTER in a non-constant default; fill the existing rows instead
+                    default = column.server_default.arg
+                    if not isinstance(default, str):
+                        default = str(default.compile(dialect=engine.dialect))
+                    conn.execute(text(f"UPDATE {table.name} SET {column.name} = {default} WHERE {column.name} IS NULL"))
+                logger.info(f"Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                try:
+                    with conn.begin_nested():
+                        index.create(conn, checkfirst=True)
+                except exc.IntegrityError:
+                    logger.warning(f"Cannot create unique index {index.name}: existing rows violate it")
+
+def init_db():
+    """Bring the schema up to date: run at startup by the API and by external job workers."""
+    from app import models, search  # noqa: F401  (models registers the tables; search imports this module)
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    search.ensure_search_index()
@@ -0,0 +1,109 @@
+# app/embeddings.py
+# Pluggable text embedders for semantic search (app/semantic.py). Vectors are float32, L2-normalized.
+#
+#   EMBEDDING_PROVIDER=hashing (default)  Deterministic feature hashing of non-stopword words and
+#                                         bigrams. Needs no network or API key; good for offline runs and tests.
+#   EMBEDDING_PROVIDER=gemini             Gemini embedding model (EMBEDDING_MODEL).
+import hashlib
+import os
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.rate_limit import BATCH, INTERACTIVE, rate_limiter
+from app.retrieval import tokenize
+
+load_dotenv()
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "hashing")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/text-embedding-004")
+HASHING_DIM = int(os.getenv("HASHING_EMBEDDING_DIM", "1024"))
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+class Embedder:
+    """``name`` identifies the vector space: vectors from embedders with different names are not comparable."""
+
+    name = "base"
+    dim = 0
+
+    def embed(self, texts: list[str], query: bool = False) -> np.ndarray:
+        raise NotImplementedError
+
+class HashingEmbedder(Embedder):
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> list[str]:
+        words = tokenize(text)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: list[str], query: bool = False) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                # Signed hashing keeps collisions from only ever adding up
+                vectors[i, h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        return normalize_rows(vectors)
+
+class GeminiEmbedder(Embedder):
+    def __init__(self, model: str = EMBEDDING_MODEL):
+        self.model = model
+        self.name = f"gemini-{model}"
+        self.dim = 0  # known after the first call
+        self._configured = False
+        self._lock = threading.Lock()
+
+    def _genai(self):
+        import google.generativeai as genai  # heavy import, deferred until the first call
+        if not self._configured:
+            with self._lock:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY environment variable is required")
+                genai.configure(api_key=api_key)
+                self._configured = True
+        return genai
+
+    def embed(self, texts: list[str], query: bool = False) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        genai = self._genai()
+        # Same limiter as generation: a re-index backs off on 429s and yields to interactive calls
+        result = rate_limiter.call(
+            lambda: genai.embed_content(
+                model=self.model,
+                content=texts,
+                task_type="retrieval_query" if query else "retrieval_document",
+            ),
+            sum(len(t) for t in texts) // 4, INTERACTIVE if query else BATCH, label="embed",
+        )
+        vectors = np.asarray(result["embedding"], dtype=np.float32)
+        self.dim = vectors.shape[1]
+        return normalize_rows(vectors)
+
+EMBEDDERS = {"hashing": HashingEmbedder, "gemini": GeminiEmbedder}
+
+_embedder: Embedder | None = None
+_embedder_lock = threading.Lock()
+
+def get_embedder() -> Embedder:
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                if EMBEDDING_PROVIDER not in EMBEDDERS:
+                    raise ValueError(f"Unknown EMBEDDING_PROVIDER {EMBEDDING_PROVIDER!r}; expected one of {sorted(EMBEDDERS)}")
+                _embedder = EMBEDDERS[EMBEDDING_PROVIDER]()
+    return _embedder
+
+def set_embedder(embedder: Embedder) -> None:
+    """Swap the embedder at runtime (tests, benchmarks)."""
+    global _embedder
+    _embedder = embedder
@@ -0,0 +1,243 @@
+# app/jobs.py
+# Durable job queue for meeting processing.
+#
+# Jobs live in the processing_jobs table. Workers claim a job by taking a lease and keep
+# extending it while they run. If a worker dies, its lease expires and another worker reclaims
+# the job. Workers run as threads in the API process (JOB_WORKER_MODE=thread) or in a separate
+# process: `python -m app.jobs --workers 4` (set METRICS_PORT to expose its metrics).
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal, init_db
+from app.metrics import PROCESSING_JOBS, serve as serve_metrics
+from app.processing import STAGES, real_processing
+from app.schemas import ExtractionMode
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_WORKER_MODE = os.getenv("JOB_WORKER_MODE", "thread")  # "thread" | "external"
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))
+
+ACTIVE_STATUSES = (models.JobStatus.queued, models.JobStatus.running)
+
+Job = models.ProcessingJob
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def enqueue_processing(db: Session, mid: str, mode: ExtractionMode, refresh: bool = False) -> tuple[models.ProcessingJob, bool]:
+    """Queue processing for a meeting. Returns ``(job, created)``.
+
+    ``refresh`` asks for a full rebuild of generated outputs instead of incremental processing.
+
+    If the meeting already has a queued or running job, that job is returned instead,
+    so repeated /process clicks join the job in flight. A ``refresh`` that joins a job
+    sets its ``full_refresh``: a queued job then runs as a refresh, and a running one is
+    queued again as a refresh once its current run succeeds.
+    """
+    active = db.query(Job).filter(Job.meeting_id == mid, Job.status.in_(ACTIVE_STATUSES)).first()
+    if active:
+        if refresh and not active.full_refresh:
+            active.full_refresh = True
+            db.commit()
+            logger.info(f"Processing job {active.id} for meeting {mid} upgraded to a full refresh")
+        return active, False
+    job = Job(
+        meeting_id=mid,
+        mode=mode.value,
+        full_refresh=refresh,
+        status=models.JobStatus.queued,
+        progress=json.dumps({stage: "pending" for stage in STAGES}),
+        max_attempts=JOB_MAX_ATTEMPTS,
+        run_after=utcnow(),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost the race against a concurrent enqueue; the unique active-job index let only one through
+        db.rollback()
+        return db.query(Job).filter(Job.meeting_id == mid, Job.status.in_(ACTIVE_STATUSES)).one(), False
+    db.refresh(job)
+    logger.info(f"Queued processing job {job.id} for meeting {mid}")
+    return job, True
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Job.status == models.JobStatus.queued, Job.run_after <= now),
+        # A running job whose lease expired belongs to a dead worker
+        and_(Job.status == models.JobStatus.running, Job.lease_expires_at < now),
+    )
+
+def claim_next(worker_id: str) -> str | None:
+    """Lease the next runnable job to ``worker_id``; returns its id, or None if the queue is empty."""
+    now = utcnow()
+    with SessionLocal() as db:
+        candidates = db.query(Job.id).filter(_claimable(now)).order_by(Job.run_after).limit(5).all()
+        for (job_id,) in candidates:
+            # Conditional update: only one worker can move a given row out of the claimable state
+            result = db.execute(
+                update(Job)
+                .where(Job.id == job_id, _claimable(now))
+                .values(
+                    status=models.JobStatus.running,
+                    lease_owner=worker_id,
+                    lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    attempts=Job.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if result.rowcount == 1:
+                return job_id
+    return None
+
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker after this worker's lease expired."""
+
+def _record(job_id: str, worker_id: str, **values) -> bool:
+    """Update a job we hold the lease on; also extends the lease unless told otherwise.
+
+    Returns False if the lease is no longer ours, in which case nothing was written.
+    """
+    values.setdefault("lease_expires_at", utcnow() + timedelta(seconds=JOB_LEASE_SECONDS))
+    with SessionLocal() as db:
+        result = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.lease_owner == worker_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+def _finish(job_id: str, worker_id: str, **values) -> None:
+    """Write a job's final state and release its lease."""
+    if not _record(job_id, worker_id, lease_owner=None, lease_expires_at=None, **values):
+        logger.warning(f"Job {job_id} was reclaimed by another worker; dropped its {values['status'].value} result")
+
+def _heartbeat(job_id: str, worker_id: str, done: threading.Event, lost: threading.Event) -> None:
+    while not done.wait(JOB_LEASE_SECONDS / 3):
+        try:
+            if not _record(job_id, worker_id):
+                logger.warning(f"Lost the lease on job {job_id}; stopping at the next stage")
+                lost.set()
+                return
+        except Exception:
+            # Keep beating: the lease is still ours until it expires
+            logger.exception(f"Failed to extend the lease on job {job_id}")
+
+def run_job(job_id: str, worker_id: str) -> None:
+    with SessionLocal() as db:
+        job = db.get(Job, job_id)
+        if job.attempts > job.max_attempts:
+            # Reclaimed after its workers kept dying mid-run; stop retrying
+            _finish(job_id, worker_id, status=models.JobStatus.failed, error="Worker lost too many times")
+            return
+        progress = json.loads(job.progress or "{}")
+        refresh = bool(job.full_refresh)
+        done, lost = threading.Event(), threading.Event()
+
+        def report(stage: str, state: str) -> None:
+            # Stage boundaries are where a worker that lost its lease stops, before it persists anything
+            progress[stage] = state
+            if lost.is_set() or not _record(job_id, worker_id, stage=stage, progress=json.dumps(progress)):
+                raise LeaseLost(job_id)
+
+        threading.Thread(target=_heartbeat, args=(job_id, worker_id, done, lost), daemon=True).start()
+        try:
+            real_processing(job.meeting_id, db, ExtractionMode(job.mode), report, refresh=refresh)
+        except LeaseLost:
+            db.rollback()
+            logger.warning(f"Job {job_id} was reclaimed by another worker; abandoned this run")
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"Job {job_id} failed on attempt {job.attempts}/{job.max_attempts}")
+            if job.attempts >= job.max_attempts:
+                PROCESSING_JOBS.labels("failed").inc()
+                _finish(job_id, worker_id, status=models.JobStatus.failed, error=str(e))
+            else:
+                PROCESSING_JOBS.labels("retried").inc()
+                delay = JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+                _finish(job_id, worker_id, status=models.JobStatus.queued, error=str(e),
+                        run_after=utcnow() + timedelta(seconds=delay))
+        else:
+            PROCESSING_JOBS.labels("succeeded").inc()
+            db.refresh(job)
+            if job.full_refresh and not refresh:
+                # A refresh was requested while this run was in flight; run again as one
+                _finish(job_id, worker_id, status=models.JobStatus.queued, error=None, attempts=0,
+                        run_after=utcnow(), progress=json.dumps({stage: "pending" for stage in STAGES}))
+                logger.info(f"Job {job_id} succeeded; queued again as a full refresh")
+            else:
+                _finish(job_id, worker_id, status=models.JobStatus.succeeded, error=None)
+                logger.info(f"Job {job_id} succeeded")
+        finally:
+            done.set()
+
+class JobWorker(threading.Thread):
+    """Polls the queue and runs one job at a time."""
+
+    def __init__(self, index: int):
+        super().__init__(name=f"job-worker-{index}", daemon=True)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                job_id = claim_next(self.worker_id)
+            except Exception:
+                logger.exception("Failed to claim a job")
+                job_id = None
+            if job_id is None:
+                self._stop_event.wait(JOB_POLL_SECONDS)
+                continue
+            run_job(job_id, self.worker_id)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+_workers: list[JobWorker] = []
+
+def start_workers(count: int = JOB_WORKERS) -> None:
+    for i in range(count):
+        worker = JobWorker(i)
+        worker.start()
+        _workers.append(worker)
+    logger.info(f"Started {count} processing job workers")
+
+def stop_workers() -> None:
+    for worker in _workers:
+        worker.stop()
+    _workers.clear()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run meeting processing workers")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    serve_metrics()
+    start_workers(args.workers)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_workers()
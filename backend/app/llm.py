@@ -1,11 +1,18 @@
 # app/llm.py
-import google.generativeai as genai
-import os
 import json
 import logging
+import os
+import time
 from dotenv import load_dotenv
 from google.api_core.exceptions import GoogleAPIError
 from datetime import datetime
+from pydantic import ValidationError
+
+from app.schemas import ExtractedActionItem
+from app.llm_cache import llm_cache, make_key, normalize_text, hash_file
+from app.llm_provider import get_provider
+from app.metrics import observe_llm_call, observe_llm_cache_hit
+from app.rate_limit import rate_limiter, estimate_tokens, INTERACTIVE, BATCH
 
 # Load .env file
 load_dotenv()
@@ -14,29 +21,10 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    logger.error("GEMINI_API_KEY is not set in .env file")
-    raise ValueError("GEMINI_API_KEY environment variable is required")
-genai.configure(api_key=api_key)
-
-# List available models and select one that supports generateContent
-try:
-    available_models = genai.list_models()
-    model_name = None
-    for model in available_models:
-        if "generateContent" in model.supported_generation_methods:
-            model_name = model.name
-            break
-    if not model_name:
-        logger.error("No models supporting generateContent found")
-        raise ValueError("No suitable Gemini model found")
-    logger.info(f"Using model: {model_name}")
-    model = genai.GenerativeModel(model_name)
-except GoogleAPIError as e:
-    logger.error(f"Error listing models: {str(e)}")
-    raise
+# The model client is created lazily on first use (see app/llm_provider.py),
+# so importing this module never touches the network
+
+MAX_TRANSCRIPT_CHARS = 10000
 
 def deduplicate_transcript(transcript: str) -> str:
     """Deduplicate lines in the transcript to avoid redundant content."""
@@ -45,17 +33,132 @@ def deduplicate_transcript(transcript: str) -> str:
     unique_lines = [line for line in lines if line.strip() and line not in seen and not seen.add(line)]
     return "\n".join(unique_lines)
 
-def transcribe_audio(file_path: str) -> str:
+def prepare_transcript(transcript: str) -> str:
+    """Deduplicate and truncate a transcript so it fits in a single prompt."""
+    transcript = deduplicate_transcript(transcript)
+    if len(transcript) > MAX_TRANSCRIPT_CHARS:
+        transcript = transcript[:MAX_TRANSCRIPT_CHARS] + "... [truncated]"
+        logger.warning(f"Transcript truncated to {MAX_TRANSCRIPT_CHARS} characters")
+    return transcript
+
+# Bump a prompt's version whenever its wording changes so stale cached responses are not reused
+PROMPT_VERSIONS = {
+    "transcribe_audio": "1",
+    "analyze_image": "1",
+    "generate_summary": "1",
+    "generate_decisions": "1",
+    "generate_action_items": "1",
+    "extract_meeting_outputs": "1",
+    "answer_question": "1",
+    "merge_summaries": "1",
+    "answer_from_passages": "1",
+    "answer_chat": "1",
+    "summarize_chat_history": "1",
+}
+
+# Calls made while a user waits on /chat; they go ahead of batch processing in the rate limiter
+INTERACTIVE_KINDS = {"answer_question", "answer_from_passages", "answer_chat"}
+
+def upload_file(file_path: str):
+    """Upload a file for a prompt; uploads are provider requests too, so they go through the rate limiter."""
+    return rate_limiter.call(lambda: get_provider().upload_file(file_path), 0, BATCH, label="upload_file")
+
+def cached_generate(kind: str, cache_input: str, contents, *, meeting_id: str | None = None, validate=None, **kwargs) -> str:
+    """Call the provider's generate_content through the response cache and return the stripped text.
+
+    ``cache_input`` identifies the content (normalized transcript, file hash, ...).
+    ``contents`` may be a callable so setup such as file uploads only runs on a miss.
+    Only non-empty responses accepted by ``validate`` are cached.
+    Misses go through the shared rate limiter, which retries quota errors before they reach the caller.
+    """
+    started = time.perf_counter()
+    provider = get_provider()
+    key = make_key(provider.model_name, kind, PROMPT_VERSIONS[kind], cache_input)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        logger.info(f"{kind}: served from LLM cache")
+        observe_llm_cache_hit(kind, started)
+        return cached
+    try:
+        if callable(contents):
+            contents = contents()
+        response = rate_limiter.call(
+            lambda: provider.generate_content(contents, **kwargs), estimate_tokens(contents),
+            INTERACTIVE if kind in INTERACTIVE_KINDS else BATCH, label=kind,
+        )
+    except Exception as e:
+        observe_llm_call(kind, started, error=e)
+        raise
+    observe_llm_call(kind, started, response)
+    log_token_usage(kind, response)
+    text = response.text.strip()
+    if text and (validate is None or validate(text)):
+        llm_cache.set(key, text, meeting_id)
+    return text
+
+def cached_stream(kind: str, cache_input: str, contents, *, meeting_id: str | None = None, **kwargs):
+    """Streaming counterpart of ``cached_generate``: yields text chunks as the model produces them.
+
+    A cache hit is yielded as a single chunk. The full text is cached only if the stream completes,
+    so a client that disconnects midway leaves nothing half-written behind.
+    """
+    started = time.perf_counter()
+    provider = get_provider()
+    key = make_key(provider.model_name, kind, PROMPT_VERSIONS[kind], cache_input)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        logger.info(f"{kind}: served from LLM cache")
+        observe_llm_cache_hit(kind, started)
+        yield cached
+        return
+    chunks = []
+    last = None  # the final chunk carries the usage totals
+    try:
+        for last in rate_limiter.stream(
+            lambda: provider.generate_content_stream(contents, **kwargs), estimate_tokens(contents),
+            INTERACTIVE if kind in INTERACTIVE_KINDS else BATCH, label=kind,
+        ):
+            text = getattr(last, "text", "") or ""
+            if text:
+                chunks.append(text)
+                yield text
+    except Exception as e:
+        observe_llm_call(kind, started, error=e)
+        raise
+    observe_llm_call(kind, started, last)
+    text = "".join(chunks).strip()
+    if text:
+        llm_cache.set(key, text, meeting_id)
+
+def is_json(text: str) -> bool:
+    try:
+        json.loads(strip_json_fences(text))
+        return True
+    except json.JSONDecodeError:
+        return False
+
+# Placeholder texts transcribe_audio/analyze_image return instead of raising
+FAILED_TRANSCRIPT_PREFIXES = (
+    "Audio transcription failed", "No transcription available",
+    "Image analysis failed", "No text extracted",
+)
+
+def is_failed_transcript(text: str) -> bool:
+    return text.startswith(FAILED_TRANSCRIPT_PREFIXES)
+
+def transcribe_audio(file_path: str, meeting_id: str | None = None) -> str:
     """Transcribe audio using Gemini"""
     try:
         logger.info(f"Transcribing audio: {file_path}")
-        uploaded_file = genai.upload_file(file_path)
-        response = model.generate_content(["Transcribe this audio meeting accurately:", uploaded_file])
-        text = response.text.strip()
+        text = cached_generate(
+            "transcribe_audio", hash_file(file_path),
+            lambda: ["Transcribe this audio meeting accurately:", upload_file(file_path)],
+            meeting_id=meeting_id,
+        )
         if not text:
             logger.warning(f"No text transcribed from audio: {file_path}")
             return "No transcription available from audio."
-        logger.info(f"Transcription successful: {text[:100]}...")
+        logger.info(f"Transcription successful ({len(text)} chars)")
         return text
     except GoogleAPIError as e:
         logger.error(f"Transcription error for {file_path}: {str(e)}")
@@ -64,17 +167,19 @@ def transcribe_audio(file_path: str) -> str:
         logger.error(f"Unexpected transcription error for {file_path}: {str(e)}")
         return f"Audio transcription failed: {str(e)}"
 
-def analyze_image(file_path: str) -> str:
+def analyze_image(file_path: str, meeting_id: str | None = None) -> str:
     """Analyze/OCR image (e.g., whiteboard) using Gemini"""
     try:
         logger.info(f"Analyzing image: {file_path}")
-        uploaded_file = genai.upload_file(file_path)
-        response = model.generate_content(["Transcribe and summarize the text from this whiteboard or notes image:", uploaded_file])
-        text = response.text.strip()
+        text = cached_generate(
+            "analyze_image", hash_file(file_path),
+            lambda: ["Transcribe and summarize the text from this whiteboard or notes image:", upload_file(file_path)],
+            meeting_id=meeting_id,
+        )
         if not text:
             logger.warning(f"No text extracted from image: {file_path}")
             return "No text extracted from image."
-        logger.info(f"Image analysis successful: {text[:100]}...")
+        logger.info(f"Image analysis successful ({len(text)} chars)")
         return text
     except GoogleAPIError as e:
         logger.error(f"Image analysis error for {file_path}: {str(e)}")
@@ -83,53 +188,95 @@ def analyze_image(file_path: str) -> str:
         logger.error(f"Unexpected image analysis error for {file_path}: {str(e)}")
         return f"Image analysis failed: {str(e)}"
 
-def generate_summary(transcript: str) -> str:
+# ----------------------------
+# Heuristic fallbacks (used when Gemini is unavailable)
+# ----------------------------
+def fallback_summary(transcript: str) -> str:
+    """Simple truncation-based summary"""
+    sentences = [s.strip() for s in transcript.split(".") if s.strip()]
+    return " ".join(sentences[:4]) + "." if sentences else "Summary generation failed."
+
+def fallback_decisions(transcript: str) -> list[str]:
+    """Extract lines containing "decision" """
+    return [line.strip() for line in transcript.split("\n") if "decision" in line.lower() and line.strip()]
+
+def fallback_action_items(transcript: str) -> list[dict]:
+    """Extract tasks based on keywords"""
+    tasks = []
+    for line in transcript.split("\n"):
+        if any(word in line.lower() for word in ["task", "action", "do", "assigned"]):
+            tasks.append({
+                "task": line.strip(),
+                "owner": "Unassigned",
+                "due_date": None,
+                "dependencies": []
+            })
+    return tasks
+
+def strip_json_fences(text: str) -> str:
+    """Remove a ```json ... ``` fence the model sometimes wraps around JSON output"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return text.strip()
+
+def log_token_usage(label: str, response) -> None:
+    """Log prompt/output token counts when the response reports them"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        logger.info(f"{label} token usage: prompt={usage.prompt_token_count} output={usage.candidates_token_count}")
+
+def parse_due_dates(actions: list[dict]) -> list[dict]:
+    """Convert due_date strings to Python date objects or None (in place)"""
+    for action in actions:
+        if action.get("due_date") and action["due_date"] != "Not set":
+            try:
+                action["due_date"] = datetime.strptime(action["due_date"], "%Y-%m-%d").date()
+            except ValueError:
+                logger.warning(f"Invalid due_date format: {action['due_date']}")
+                action["due_date"] = None
+        else:
+            action["due_date"] = None
+    return actions
+
+def generate_summary(transcript: str, meeting_id: str | None = None) -> str:
     """Generate a summary using Gemini"""
     if not transcript.strip() or transcript.startswith("No "):
         logger.warning("Empty or invalid transcript for summary")
         return "No valid transcript provided for summary."
     try:
         logger.info(f"Generating summary for transcript (length: {len(transcript)} chars)")
-        transcript = deduplicate_transcript(transcript)
-        max_length = 10000
-        if len(transcript) > max_length:
-            transcript = transcript[:max_length] + "... [truncated]"
-            logger.warning(f"Transcript truncated to {max_length} characters")
-        response = model.generate_content(
-            f"Summarize this meeting transcript in 4-5 concise sentences:\n\n{transcript}"
+        transcript = prepare_transcript(transcript)
+        text = cached_generate(
+            "generate_summary", normalize_text(transcript),
+            f"Summarize this meeting transcript in 4-5 concise sentences:\n\n{transcript}",
+            meeting_id=meeting_id,
         )
-        text = response.text.strip()
         if not text:
             logger.warning("Empty summary generated")
             return "Unable to generate summary."
-        logger.info(f"Summary generated: {text[:100]}...")
+        logger.info(f"Summary generated ({len(text)} chars)")
         return text
     except GoogleAPIError as e:
         logger.error(f"Summary generation error: {str(e)}")
-        # Fallback: simple truncation-based summary
-        sentences = [s.strip() for s in transcript.split(".") if s.strip()]
-        return " ".join(sentences[:4]) + "." if sentences else "Summary generation failed."
+        return fallback_summary(transcript)
     except Exception as e:
         logger.error(f"Unexpected summary generation error: {str(e)}")
         return "Summary generation failed."
 
-def generate_decisions(transcript: str) -> list[str]:
+def generate_decisions(transcript: str, meeting_id: str | None = None) -> list[str]:
     """Extract key decisions using Gemini with structured output"""
     if not transcript.strip() or transcript.startswith("No "):
         logger.warning("Empty or invalid transcript for decisions")
         return []
     try:
         logger.info(f"Generating decisions for transcript (length: {len(transcript)} chars)")
-        transcript = deduplicate_transcript(transcript)
-        max_length = 10000
-        if len(transcript) > max_length:
-            transcript = transcript[:max_length] + "... [truncated]"
-            logger.warning(f"Transcript truncated to {max_length} characters")
+        transcript = prepare_transcript(transcript)
         prompt = f"Extract all key decisions from this meeting transcript as a JSON list of strings:\n\n{transcript}\nOutput only JSON: [\"decision1\", \"decision2\"]"
-        response = model.generate_content(prompt)
-        text = response.text.strip()
+        text = cached_generate("generate_decisions", normalize_text(transcript), prompt, meeting_id=meeting_id, validate=is_json)
         try:
-            decisions = json.loads(text) if text else []
+            decisions = json.loads(strip_json_fences(text)) if text else []
             logger.info(f"Decisions generated: {decisions}")
             return decisions if isinstance(decisions, list) else []
         except json.JSONDecodeError as e:
@@ -137,13 +284,12 @@ def generate_decisions(transcript: str) -> list[str]:
             return []
     except GoogleAPIError as e:
         logger.error(f"Decisions generation error: {str(e)}")
-        # Fallback: extract lines containing "decision"
-        return [line.strip() for line in transcript.split("\n") if "decision" in line.lower() and line.strip()]
+        return fallback_decisions(transcript)
     except Exception as e:
         logger.error(f"Unexpected decisions generation error: {str(e)}")
         return []
 
-def generate_action_items(transcript: str, participant_names: list[str]) -> list[dict]:
+def generate_action_items(transcript: str, participant_names: list[str], meeting_id: str | None = None) -> list[dict]:
     """Extract action items using Gemini with structure: task, owner, due_date, dependencies"""
     if not transcript.strip() or transcript.startswith("No "):
         logger.warning("Empty or invalid transcript for action items")
@@ -151,11 +297,7 @@ def generate_action_items(transcript: str, participant_names: list[str]) -> list
     try:
         names_str = ", ".join(participant_names) or "Unassigned"
         logger.info(f"Generating action items with participants: {names_str}")
-        transcript = deduplicate_transcript(transcript)
-        max_length = 10000
-        if len(transcript) > max_length:
-            transcript = transcript[:max_length] + "... [truncated]"
-            logger.warning(f"Transcript truncated to {max_length} characters")
+        transcript = prepare_transcript(transcript)
         prompt = f"""
         Extract action items from this meeting transcript. For each, auto-assign an owner from: {names_str}.
         If no clear owner, use 'Unassigned'. Infer due dates as YYYY-MM-DD if mentioned, else use null.
@@ -164,56 +306,134 @@ def generate_action_items(transcript: str, participant_names: list[str]) -> list
         
         Transcript:\n{transcript}
         """
-        response = model.generate_content(prompt)
-        text = response.text.strip()
+        text = cached_generate(
+            "generate_action_items", names_str + "\n" + normalize_text(transcript), prompt,
+            meeting_id=meeting_id, validate=is_json,
+        )
         try:
-            actions = json.loads(text) if text else []
-            # Convert due_date strings to Python date objects or None
-            for action in actions:
-                if action.get("due_date") and action["due_date"] != "Not set":
-                    try:
-                        action["due_date"] = datetime.strptime(action["due_date"], "%Y-%m-%d").date()
-                    except ValueError:
-                        logger.warning(f"Invalid due_date format: {action['due_date']}")
-                        action["due_date"] = None
-                else:
-                    action["due_date"] = None
+            actions = json.loads(strip_json_fences(text)) if text else []
+            if not isinstance(actions, list):
+                return []
+            parse_due_dates(actions)
             logger.info(f"Action items generated: {actions}")
-            return actions if isinstance(actions, list) else []
+            return actions
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in action items response: {text}, error: {str(e)}")
             return []
     except GoogleAPIError as e:
         logger.error(f"Action items generation error: {str(e)}")
-        # Fallback: extract tasks based on keywords
-        tasks = []
-        lines = transcript.split("\n")
-        for i, line in enumerate(lines, 1):
-            if any(word in line.lower() for word in ["task", "action", "do", "assigned"]):
-                tasks.append({
-                    "task": line.strip(),
-                    "owner": "Unassigned",
-                    "due_date": None,
-                    "dependencies": []
-                })
-        return tasks
+        return fallback_action_items(transcript)
     except Exception as e:
         logger.error(f"Unexpected action items generation error: {str(e)}")
         return []
 
-def answer_question(transcript: str, question: str) -> str:
-    """Answer arbitrary questions using Gemini"""
+def extract_meeting_outputs(transcript: str, participant_names: list[str], meeting_id: str | None = None) -> dict:
+    """Extract summary, decisions and action items with a single Gemini call.
+
+    The response is validated field by field. A missing or malformed field falls back
+    to its dedicated generator, so one bad field does not discard the others.
+    """
     if not transcript.strip() or transcript.startswith("No "):
-        logger.warning("Empty or invalid transcript for chatbot")
-        return "No valid transcript available to answer the question."
+        logger.warning("Empty or invalid transcript for extraction")
+        return {"summary": "No valid transcript provided for summary.", "decisions": [], "action_items": []}
+    prepared = prepare_transcript(transcript)
+    raw = {}
     try:
-        logger.info(f"Answering question: {question}")
-        transcript = deduplicate_transcript(transcript)
-        max_length = 10000
-        if len(transcript) > max_length:
-            transcript = transcript[:max_length] + "... [truncated]"
-            logger.warning(f"Transcript truncated to {max_length} characters")
+        names_str = ", ".join(participant_names) or "Unassigned"
+        logger.info(f"Extracting meeting outputs in one call (length: {len(prepared)} chars)")
         prompt = f"""
+        From this meeting transcript, extract the following as a single JSON object:
+        {{
+            "summary": "The meeting summarized in 4-5 concise sentences",
+            "decisions": ["Each key decision as a string"],
+            "action_items": [
+                {{"task": "str", "owner": "str", "due_date": "YYYY-MM-DD or null", "dependencies": [int]}}
+            ]
+        }}
+        For each action item, auto-assign an owner from: {names_str}. If no clear owner, use 'Unassigned'.
+        Infer due dates as YYYY-MM-DD if mentioned, else use null.
+        Include dependencies as a list of action item numbers (number them starting from 1).
+
+        Transcript:\n{prepared}
+        """
+        text = strip_json_fences(cached_generate(
+            "extract_meeting_outputs", names_str + "\n" + normalize_text(prepared), prompt,
+            meeting_id=meeting_id, validate=is_json,
+            generation_config={"response_mime_type": "application/json"},
+        ))
+        raw = json.loads(text) if text else {}
+        if not isinstance(raw, dict):
+            logger.error(f"Combined extraction returned {type(raw).__name__}, expected an object")
+            raw = {}
+    except GoogleAPIError as e:
+        logger.error(f"Combined extraction error: {str(e)}")
+        return {
+            "summary": fallback_summary(prepared),
+            "decisions": fallback_decisions(prepared),
+            "action_items": fallback_action_items(prepared),
+            "degraded": True,
+        }
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in combined extraction response, error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Unexpected combined extraction error: {str(e)}")
+
+    summary = raw.get("summary")
+    if isinstance(summary, str) and summary.strip():
+        summary = summary.strip()
+    else:
+        logger.warning("Combined extraction has no usable summary, falling back to generate_summary")
+        summary = generate_summary(transcript, meeting_id)
+
+    decisions = raw.get("decisions")
+    if isinstance(decisions, list):
+        decisions = [d.strip() for d in decisions if isinstance(d, str) and d.strip()]
+    else:
+        logger.warning("Combined extraction has no usable decisions, falling back to generate_decisions")
+        decisions = generate_decisions(transcript, meeting_id)
+
+    actions = raw.get("action_items")
+    if isinstance(actions, list):
+        validated = []
+        for item in actions:
+            try:
+                validated.append(ExtractedActionItem.model_validate(item).model_dump())
+            except ValidationError as e:
+                logger.warning(f"Dropping malformed action item {item!r}: {e.error_count()} error(s)")
+        actions = parse_due_dates(validated)
+    else:
+        logger.warning("Combined extraction has no usable action items, falling back to generate_action_items")
+        actions = generate_action_items(transcript, participant_names, meeting_id)
+
+    return {"summary": summary, "decisions": decisions, "action_items": actions}
+
+def merge_summaries(partials: list[str], meeting_id: str | None = None) -> str:
+    """Reduce step: merge summaries of consecutive transcript chunks into one summary"""
+    partials = [p.strip() for p in partials if p and p.strip()]
+    if not partials:
+        return "No valid transcript provided for summary."
+    if len(partials) == 1:
+        return partials[0]
+    joined = "\n\n".join(f"Part {i}: {p}" for i, p in enumerate(partials, 1))
+    try:
+        logger.info(f"Merging {len(partials)} partial summaries")
+        text = cached_generate(
+            "merge_summaries", normalize_text(joined),
+            f"These are summaries of consecutive parts of one meeting. "
+            f"Merge them into a single summary of 4-5 concise sentences covering the whole meeting:\n\n{joined}",
+            meeting_id=meeting_id,
+        )
+        return text or " ".join(partials)
+    except GoogleAPIError as e:
+        logger.error(f"Summary merge error: {str(e)}")
+        return " ".join(partials)
+    except Exception as e:
+        logger.error(f"Unexpected summary merge error: {str(e)}")
+        return " ".join(partials)
+
+def question_prompt(transcript: str, question: str) -> tuple[str, str]:
+    """Prompt and cache input for answering ``question`` from a prepared transcript"""
+    prompt = f"""
         You are a helpful assistant. 
         Use the meeting transcript below to answer the user's question concisely.
 
@@ -222,8 +442,32 @@ def answer_question(transcript: str, question: str) -> str:
 
         Question: {question}
         """
-        response = model.generate_content(prompt)
-        text = response.text.strip()
+    return prompt, " ".join(question.lower().split()) + "\n" + normalize_text(transcript)
+
+def passages_prompt(passages: list[str], question: str) -> tuple[str, str]:
+    """Prompt and cache input for answering ``question`` from retrieved excerpts"""
+    excerpts = "\n".join(f"- {p}" for p in passages)
+    prompt = f"""
+        You are a helpful assistant.
+        Use the meeting transcript excerpts below to answer the user's question concisely.
+        If the excerpts do not contain the answer, say so.
+
+        Excerpts:
+        {excerpts}
+
+        Question: {question}
+        """
+    return prompt, " ".join(question.lower().split()) + "\n" + normalize_text(excerpts)
+
+def answer_question(transcript: str, question: str, meeting_id: str | None = None) -> str:
+    """Answer arbitrary questions using Gemini"""
+    if not transcript.strip() or transcript.startswith("No "):
+        logger.warning("Empty or invalid transcript for chatbot")
+        return "No valid transcript available to answer the question."
+    try:
+        logger.info(f"Answering question: {question}")
+        prompt, cache_input = question_prompt(prepare_transcript(transcript), question)
+        text = cached_generate("answer_question", cache_input, prompt, meeting_id=meeting_id)
         logger.info(f"Chatbot answer: {text[:100]}...")
         return text
     except GoogleAPIError as e:
@@ -232,3 +476,153 @@ def answer_question(transcript: str, question: str) -> str:
     except Exception as e:
         logger.error(f"Unexpected chatbot answer error: {str(e)}")
         return "Answer not available."
+
+def answer_from_passages(passages: list[str], question: str, meeting_id: str | None = None) -> str:
+    """Answer a question from retrieved transcript excerpts instead of the full transcript"""
+    if not passages:
+        return "No valid transcript available to answer the question."
+    try:
+        logger.info(f"Answering question from {len(passages)} passages: {question}")
+        prompt, cache_input = passages_prompt(passages, question)
+        text = cached_generate("answer_from_passages", cache_input, prompt, meeting_id=meeting_id)
+        return text or passages[0]
+    except GoogleAPIError as e:
+        logger.error(f"Chatbot answer error: {str(e)}")
+        return passages[0]
+    except Exception as e:
+        logger.error(f"Unexpected chatbot answer error: {str(e)}")
+        return passages[0]
+
+def _stream_with_fallback(chunks, fallback: str):
+    """Yield ``chunks``; on a model error, yield ``fallback`` unless output has already been sent."""
+    sent = False
+    try:
+        for chunk in chunks:
+            sent = True
+            yield chunk
+        if not sent:
+            yield fallback
+    except GoogleAPIError as e:
+        logger.error(f"Chatbot stream error: {str(e)}")
+        if not sent:
+            yield fallback
+    except Exception as e:
+        logger.error(f"Unexpected chatbot stream error: {str(e)}")
+        if not sent:
+            yield fallback
+
+def stream_answer_question(transcript: str, question: str, meeting_id: str | None = None):
+    """Streaming ``answer_question``: yields the answer in chunks as it is generated"""
+    if not transcript.strip() or transcript.startswith("No "):
+        yield "No valid transcript available to answer the question."
+        return
+    logger.info(f"Streaming answer to question: {question}")
+    prompt, cache_input = question_prompt(prepare_transcript(transcript), question)
+    yield from _stream_with_fallback(
+        cached_stream("answer_question", cache_input, prompt, meeting_id=meeting_id), "Answer not available.",
+    )
+
+def stream_answer_from_passages(passages: list[str], question: str, meeting_id: str | None = None):
+    """Streaming ``answer_from_passages``: yields the answer in chunks as it is generated"""
+    if not passages:
+        yield "No valid transcript available to answer the question."
+        return
+    logger.info(f"Streaming answer from {len(passages)} passages: {question}")
+    prompt, cache_input = passages_prompt(passages, question)
+    yield from _stream_with_fallback(
+        cached_stream("answer_from_passages", cache_input, prompt, meeting_id=meeting_id), passages[0],
+    )
+
+# ----------------------------
+# Chat sessions (see app/chat.py)
+# ----------------------------
+# Provider context caches have a minimum size; smaller transcripts are cheaper to resend
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "4096"))
+CHAT_SUMMARY_MAX_CHARS = 2000
+
+def cache_transcript_context(transcript: str, ttl_seconds: int):
+    """Store a prepared transcript in the provider's context cache so follow-up questions reference
+    it instead of resending it. Returns the handle, or None when caching is unsupported or fails."""
+    contents = [f"This is the transcript of a meeting. Answer questions about it.\n\nTranscript:\n{transcript}"]
+    tokens = estimate_tokens(contents)
+    if tokens < CONTEXT_CACHE_MIN_TOKENS:
+        return None
+    provider = get_provider()
+    try:
+        return rate_limiter.call(lambda: provider.cache_context(contents, ttl_seconds), tokens, INTERACTIVE,
+                                 label="cache_transcript_context")
+    except Exception as e:
+        logger.warning(f"Provider context caching unavailable, sending the transcript inline: {str(e)}")
+        return None
+
+def chat_prompt(question: str, history: str, *, excerpts: list[str] | None = None, transcript: str | None = None,
+                context_id: str = "") -> tuple[str, str]:
+    """Prompt and cache input for a chat turn.
+
+    The meeting content is either retrieved ``excerpts``, an inline ``transcript``, or neither when
+    the transcript is already in a provider context cache. ``context_id`` identifies that content
+    in the cache input.
+    """
+    if excerpts:
+        context = "Meeting transcript excerpts:\n" + "\n".join(f"- {p}" for p in excerpts)
+    elif transcript:
+        context = f"Meeting transcript:\n{transcript}"
+    else:
+        context = "Use the meeting transcript you were given."
+    prompt = f"""
+        You are a helpful assistant answering questions about a meeting.
+        Answer the user's latest question concisely. If the meeting content does not contain the answer, say so.
+
+        {context}
+
+        Conversation so far:
+        {history or "(none)"}
+
+        Question: {question}
+        """
+    cache_input = "\n".join([context_id, normalize_text(history), " ".join(question.lower().split()), normalize_text(context)])
+    return prompt, cache_input
+
+def answer_chat(prompt: str, cache_input: str, fallback: str, meeting_id: str | None = None, cached_context=None) -> str:
+    """Answer a chat turn built by ``chat_prompt``"""
+    kwargs = {"cached_context": cached_context} if cached_context is not None else {}
+    try:
+        text = cached_generate("answer_chat", cache_input, prompt, meeting_id=meeting_id, **kwargs)
+        return text or fallback
+    except GoogleAPIError as e:
+        logger.error(f"Chat answer error: {str(e)}")
+        return fallback
+    except Exception as e:
+        logger.error(f"Unexpected chat answer error: {str(e)}")
+        return fallback
+
+def stream_answer_chat(prompt: str, cache_input: str, fallback: str, meeting_id: str | None = None, cached_context=None):
+    """Streaming ``answer_chat``"""
+    kwargs = {"cached_context": cached_context} if cached_context is not None else {}
+    yield from _stream_with_fallback(
+        cached_stream("answer_chat", cache_input, prompt, meeting_id=meeting_id, **kwargs), fallback,
+    )
+
+def fallback_history_summary(summary: str | None, turns: list[tuple[str, str]]) -> str:
+    """Keep the questions asked, most recent last, within CHAT_SUMMARY_MAX_CHARS"""
+    text = " ".join(filter(None, [summary, *(f"Asked: {q}" for q, _ in turns)]))
+    return text[-CHAT_SUMMARY_MAX_CHARS:]
+
+def summarize_chat_history(summary: str | None, turns: list[tuple[str, str]], meeting_id: str | None = None) -> str:
+    """Fold older chat turns into the running summary of the conversation"""
+    exchanges = "\n".join(f"Q: {q}\nA: {a}" for q, a in turns)
+    try:
+        text = cached_generate(
+            "summarize_chat_history", normalize_text((summary or "") + "\n" + exchanges),
+            f"Update the summary of a conversation about a meeting with the exchanges below. "
+            f"Keep the facts and open questions a follow-up might refer to, in at most 5 sentences.\n\n"
+            f"Summary so far: {summary or '(none)'}\n\nExchanges:\n{exchanges}",
+            meeting_id=meeting_id,
+        )
+        return text[:CHAT_SUMMARY_MAX_CHARS] if text else fallback_history_summary(summary, turns)
+    except GoogleAPIError as e:
+        logger.error(f"Chat history summary error: {str(e)}")
+        return fallback_history_summary(summary, turns)
+    except Exception as e:
+        logger.error(f"Unexpected chat history summary error: {str(e)}")
+        return fallback_history_summary(summary, turns)
@@ -0,0 +1,189 @@
+# app/llm_cache.py
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and drop blank lines so cosmetic edits keep the same key."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def make_key(*parts: str) -> str:
+    """Content-addressed cache key: SHA-256 over the parts (model, prompt version, input, ...)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+class LLMCache:
+    """Two-tier response cache: an in-process LRU in front of a SQLite table.
+
+    Entries expire after ``ttl_seconds``; the SQLite tier is trimmed to ``max_bytes``
+    by least-recent access. Keys can be tagged with meeting ids for invalidation.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, memory_entries: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access);
+            CREATE TABLE IF NOT EXISTS llm_cache_tags (
+                key TEXT NOT NULL,
+                meeting_id TEXT NOT NULL,
+                PRIMARY KEY (key, meeting_id)
+            );
+            CREATE INDEX IF NOT EXISTS ix_llm_cache_tags_meeting ON llm_cache_tags (meeting_id);
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._delete_keys([key])
+                self._conn.commit()
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, expires_at, value)
+            self._counters["disk_hits"] += 1
+            return value
+
+    def set(self, key: str, value: str, meeting_id: str | None = None) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), expires_at, now),
+            )
+            if meeting_id:
+                self._conn.execute("INSERT OR IGNORE INTO llm_cache_tags (key, meeting_id) VALUES (?, ?)", (key, meeting_id))
+            self._counters["sets"] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def invalidate_meeting(self, meeting_id: str) -> int:
+        """Drop every entry produced for ``meeting_id``; returns the number removed."""
+        with self._lock:
+            keys = [k for (k,) in self._conn.execute("SELECT key FROM llm_cache_tags WHERE meeting_id = ?", (meeting_id,))]
+            self._delete_keys(keys)
+            self._conn.commit()
+        logger.info(f"Invalidated {len(keys)} cached LLM responses for meeting {meeting_id}")
+        return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = lookups - self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": entries,
+                "disk_bytes": size,
+            }
+
+    # -- internals (caller holds the lock) --
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete_keys(self, keys: list[str]) -> None:
+        for key in keys:
+            self._memory.pop(key, None)
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in keys])
+        self._conn.executemany("DELETE FROM llm_cache_tags WHERE key = ?", [(k,) for k in keys])
+
+    def _evict(self, now: float) -> None:
+        expired = [k for (k,) in self._conn.execute("SELECT key FROM llm_cache WHERE expires_at <= ?", (now,))]
+        self._delete_keys(expired)
+        self._counters["expired"] += len(expired)
+
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            victims.append(key)
+            total -= size
+        self._delete_keys(victims)
+        self._counters["evictions"] += len(victims)
+
+class NullCache:
+    """Stand-in used when LLM_CACHE_ENABLED=0."""
+
+    def get(self, key: str) -> str | None:
+        return None
+
+    def set(self, key: str, value: str, meeting_id: str | None = None) -> None:
+        pass
+
+    def invalidate_meeting(self, meeting_id: str) -> int:
+        return 0
+
+    def stats(self) -> dict:
+        return {"enabled": False}
+
+llm_cache = (
+    LLMCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_MAX_BYTES)
+    if LLM_CACHE_ENABLED else NullCache()
+)
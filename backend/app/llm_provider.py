@@ -0,0 +1,185 @@
+# app/llm_provider.py
+# Pluggable model backends for app/llm.py, created lazily on first use.
+#
+#   LLM_PROVIDER=gemini (default)  Google Gemini. The model is pinned by GEMINI_MODEL, or discovered
+#                                  once with list_models() and cached in GEMINI_MODEL_CACHE_PATH.
+#   LLM_PROVIDER=stub              Deterministic local responses for tests and offline runs.
+#
+# Providers with server-side context caching return a handle from cache_context(); passing it as
+# ``cached_context=`` to generate_content reuses that prefix without sending it again.
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL")
+GEMINI_MODEL_CACHE_PATH = Path(os.getenv("GEMINI_MODEL_CACHE_PATH", "./.gemini_model"))
+
+class ModelProvider:
+    """Interface used by app/llm.py. Responses expose ``.text`` and, optionally, ``.usage_metadata``."""
+
+    name = "base"
+
+    @property
+    def model_name(self) -> str:
+        raise NotImplementedError
+
+    def generate_content(self, contents, **kwargs):
+        raise NotImplementedError
+
+    def generate_content_stream(self, contents, **kwargs):
+        """Iterate over response chunks as they are generated. Backends without streaming
+        yield the whole response as one chunk."""
+        yield self.generate_content(contents, **kwargs)
+
+    def upload_file(self, file_path: str):
+        raise NotImplementedError
+
+    def cache_context(self, contents, ttl_seconds: int):
+        """Store ``contents`` provider-side and return a handle, or None if unsupported."""
+        return None
+
+class GeminiProvider(ModelProvider):
+    name = "gemini"
+
+    def __init__(self):
+        self._model = None
+        self._model_name = None
+        self._lock = threading.Lock()
+
+    def _genai(self):
+        import google.generativeai as genai  # heavy import, deferred until the first call
+        return genai
+
+    def _known_model_name(self) -> str | None:
+        """The pinned or previously discovered model, without calling the API."""
+        if GEMINI_MODEL:
+            return GEMINI_MODEL
+        if GEMINI_MODEL_CACHE_PATH.exists():
+            cached = GEMINI_MODEL_CACHE_PATH.read_text(encoding="utf-8").strip()
+            if cached:
+                return cached
+        return None
+
+    def _resolve_model_name(self, genai) -> str:
+        known = self._known_model_name()
+        if known:
+            return known
+        # List available models and select one that supports generateContent
+        for model in genai.list_models():
+            if "generateContent" in model.supported_generation_methods:
+                try:
+                    GEMINI_MODEL_CACHE_PATH.write_text(model.name, encoding="utf-8")
+                except OSError as e:
+                    logger.warning(f"Could not cache model name: {e}")
+                return model.name
+        raise ValueError("No suitable Gemini model found")
+
+    def _ensure_model(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY environment variable is required")
+                genai = self._genai()
+                genai.configure(api_key=api_key)
+                self._model_name = self._resolve_model_name(genai)
+                logger.info(f"Using model: {self._model_name}")
+                self._model = genai.GenerativeModel(self._model_name)
+        return self._model
+
+    @property
+    def model_name(self) -> str:
+        # Response cache keys need the name before any call; only discovery needs the API key
+        if self._model_name is None:
+            self._model_name = self._known_model_name()
+        if self._model_name is None:
+            self._ensure_model()
+        return self._model_name
+
+    def _model_for(self, cached_context):
+        if cached_context is None:
+            return self._ensure_model()
+        return self._genai().GenerativeModel.from_cached_content(cached_content=cached_context)
+
+    def generate_content(self, contents, cached_context=None, **kwargs):
+        return self._model_for(cached_context).generate_content(contents, **kwargs)
+
+    def generate_content_stream(self, contents, cached_context=None, **kwargs):
+        return iter(self._model_for(cached_context).generate_content(contents, stream=True, **kwargs))
+
+    def upload_file(self, file_path: str):
+        self._ensure_model()
+        return self._genai().upload_file(file_path)
+
+    def cache_context(self, contents, ttl_seconds: int):
+        from datetime import timedelta
+        from google.generativeai import caching
+        self._ensure_model()
+        return caching.CachedContent.create(model=self._model_name, contents=contents, ttl=timedelta(seconds=ttl_seconds))
+
+@dataclass
+class StubResponse:
+    text: str
+    usage_metadata: object = None
+
+class StubProvider(ModelProvider):
+    """Offline backend: answers every prompt with deterministic, well-formed output."""
+
+    name = "stub"
+
+    @property
+    def model_name(self) -> str:
+        return "stub"
+
+    def respond(self, prompt: str, json_output: bool) -> str:
+        if "single JSON object" in prompt:
+            return json.dumps({"summary": "Stub summary of the meeting.", "decisions": [], "action_items": []})
+        if json_output or "JSON" in prompt:
+            return "[]"
+        return "Stub response."
+
+    def generate_content(self, contents, **kwargs):
+        parts = contents if isinstance(contents, list) else [contents]
+        prompt = "\n".join(p for p in parts if isinstance(p, str))
+        config = kwargs.get("generation_config") or {}
+        return StubResponse(self.respond(prompt, config.get("response_mime_type") == "application/json"))
+
+    def generate_content_stream(self, contents, **kwargs):
+        words = self.generate_content(contents, **kwargs).text.split(" ")
+        for i, word in enumerate(words):
+            yield StubResponse(word if i == 0 else " " + word)
+
+    def upload_file(self, file_path: str):
+        return Path(file_path).name
+
+PROVIDERS = {"gemini": GeminiProvider, "stub": StubProvider}
+
+_provider: ModelProvider | None = None
+_provider_lock = threading.Lock()
+
+def get_provider() -> ModelProvider:
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                if LLM_PROVIDER not in PROVIDERS:
+                    raise ValueError(f"Unknown LLM_PROVIDER {LLM_PROVIDER!r}; expected one of {sorted(PROVIDERS)}")
+                _provider = PROVIDERS[LLM_PROVIDER]()
+    return _provider
+
+def set_provider(provider: ModelProvider) -> None:
+    """Swap the backend at runtime (tests, benchmarks)."""
+    global _provider
+    _provider = provider
@@ -1,35 +1,57 @@
 from __future__ import annotations
 import os
+import json
 import uuid
-from pathlib import Path
-import io
+import hashlib
 import logging
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from contextlib import asynccontextmanager
+
+from datetime import date
+
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, UploadFile, File, Request, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from gtts import gTTS
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from sqlalchemy import select
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
 from pydantic import BaseModel
 
-from app.db import engine, Base, get_db
-from app import models
+from app.db import async_engine, get_db, get_async_db, init_db, pool_stats
+from app import bulk, metrics, models, search, timeline, transcripts, tts, uploads
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page, projection
+from app.artifacts import lookup_transcripts, dedupe_artifacts
 from app.schemas import (
-    MeetingCreate, MeetingOut,
+    MeetingCreate, MeetingOut, MeetingBundle,
     ParticipantCreate, ParticipantOut,
-    ArtifactTextIn, ArtifactOut,
+    ArtifactTextIn, ArtifactOut, UploadSessionIn, UploadSessionOut,
     SummaryIn, SummaryOut,
     DecisionIn, DecisionOut,
-    ActionItemIn, ActionItemOut,
+    ActionItemIn, ActionItemOut, ActionItemUpdate,
+    ExtractionMode, JobOut, SemanticHit, SearchHit, ChatSessionOut,
 )
 
 # ----------------------------
 # App & Logging
 # ----------------------------
-app = FastAPI(title="Meetings API")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Processing workers run in-process unless JOB_WORKER_MODE=external (see app/jobs.py)
+    if jobs.JOB_WORKER_MODE == "thread":
+        jobs.start_workers()
+    yield
+    jobs.stop_workers()
+    await async_engine.dispose()
+
+app = FastAPI(title="Meetings API", lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -37,15 +59,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Upload folder
-PROJECT_ROOT = Path(os.getcwd())
-UPLOAD_DIR = PROJECT_ROOT / "uploads"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables, add columns introduced since the database was created, and the search index
+init_db()
 
 # ----------------------------
 # Root
@@ -54,20 +72,65 @@ Base.metadata.create_all(bind=engine)
 def root():
     return {"message": "API running!"}
 
+# ----------------------------
+# Pagination
+# ----------------------------
+def _page(query, model, schema, cursor: str | None, limit: int, fields: str | None,
+          descending: bool = False, default_exclude: tuple[str, ...] = ()):
+    """Run a keyset-paginated list query; the next page's cursor goes in the X-Next-Cursor header.
+
+    With a field projection only the requested columns are loaded and the rows are returned as
+    plain objects (the response model, which requires every field, is bypassed).
+    """
+    try:
+        include = projection(schema, fields, default_exclude)
+        if include is not None:
+            columns = {"id", "created_at", *include}
+            query = query.options(load_only(*(getattr(model, c) for c in columns if hasattr(model, c))))
+        rows, next_cursor = keyset_page(query, model, cursor, limit, descending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if include is None:
+        return JSONResponse(jsonable_encoder([schema.model_validate(r) for r in rows]), headers=headers)
+    return JSONResponse(jsonable_encoder([{f: getattr(r, f, None) for f in include} for r in rows]), headers=headers)
+
 # ----------------------------
 # Meetings
 # ----------------------------
 @app.post("/meetings", response_model=MeetingOut, status_code=201)
 def create_meeting(meeting: MeetingCreate, db: Session = Depends(get_db)):
-    db_meeting = models.Meeting(**meeting.dict())
+    db_meeting = models.Meeting(**meeting.model_dump())
     db.add(db_meeting)
     db.commit()
     db.refresh(db_meeting)
     return db_meeting
 
 @app.get("/meetings", response_model=list[MeetingOut])
-def list_meetings(db: Session = Depends(get_db)):
-    return db.query(models.Meeting).all()
+def list_meetings(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    created_by: str | None = None,
+    status: models.JobStatus | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """Newest meetings first. Pass the X-Next-Cursor response header back as ``cursor`` for the next page.
+
+    ``status`` keeps meetings that have a processing job in that status.
+    """
+    query = db.query(models.Meeting)
+    if date_from:
+        query = query.filter(models.Meeting.date >= date_from)
+    if date_to:
+        query = query.filter(models.Meeting.date <= date_to)
+    if created_by:
+        query = query.filter(models.Meeting.created_by == created_by)
+    if status:
+        query = query.filter(models.Meeting.jobs.any(models.ProcessingJob.status == status))
+    return _page(query, models.Meeting, MeetingOut, cursor, limit, fields, descending=True)
 
 @app.get("/meetings/{meeting_id}", response_model=MeetingOut)
 def get_meeting(meeting_id: str, db: Session = Depends(get_db)):
@@ -76,6 +139,42 @@ def get_meeting(meeting_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Meeting not found")
     return meeting
 
+def _bundle_etag(meeting_id: str, changed_at) -> str:
+    return f'"{hashlib.sha256(f"{meeting_id}:{changed_at}".encode()).hexdigest()[:32]}"'
+
+@app.get("/meetings/{mid}/bundle", response_model=MeetingBundle,
+         response_model_exclude={"artifacts": {"__all__": {"transcript_text"}}})
+def get_meeting_bundle(mid: str, request: Request, response: Response, db: Session = Depends(get_db)):
+    """The meeting with its participants, artifacts (without transcripts) and outputs in one response.
+
+    Loaded with one query per relationship. The ETag follows the meeting's last write, so an
+    unchanged meeting costs a single lookup and a 304.
+    """
+    stamp = db.query(models.Meeting.updated_at, models.Meeting.created_at).filter(models.Meeting.id == mid).first()
+    if stamp is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    etag = _bundle_etag(mid, stamp.updated_at or stamp.created_at)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    meeting = (
+        db.query(models.Meeting)
+        .options(
+            selectinload(models.Meeting.participants),
+            selectinload(models.Meeting.artifacts).defer(models.Artifact.transcript_text),
+            selectinload(models.Meeting.summaries),
+            selectinload(models.Meeting.decisions),
+            selectinload(models.Meeting.action_items),
+        )
+        .filter(models.Meeting.id == mid)
+        .one()
+    )
+    # Tag what was actually loaded, in case the meeting changed since the lookup above
+    headers["ETag"] = _bundle_etag(mid, meeting.updated_at or meeting.created_at)
+    response.headers.update(headers)
+    return meeting
+
 # ----------------------------
 # Participants
 # ----------------------------
@@ -84,19 +183,16 @@ def add_participants(mid: str, participants: list[ParticipantCreate], db: Sessio
     meeting = db.get(models.Meeting, mid)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    rows: list[models.Participant] = []
-    for p in participants:
-        row = models.Participant(meeting_id=mid, **p.dict())
-        db.add(row)
-        rows.append(row)
+    rows = bulk.upsert_rows(db, models.Participant, [{**p.model_dump(), "meeting_id": mid} for p in participants],
+                            update_columns=("name", "role", "email", "avatar"))
     db.commit()
-    for r in rows:
-        db.refresh(r)
     return rows
 
 @app.get("/meetings/{mid}/participants", response_model=list[ParticipantOut])
-def list_participants(mid: str, db: Session = Depends(get_db)):
-    return db.query(models.Participant).filter_by(meeting_id=mid).all()
+def list_participants(mid: str, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: str | None = None,
+                      fields: str | None = None, db: Session = Depends(get_db)):
+    query = db.query(models.Participant).filter_by(meeting_id=mid)
+    return _page(query, models.Participant, ParticipantOut, cursor, limit, fields)
 
 # ----------------------------
 # Artifacts
@@ -120,62 +216,152 @@ def add_text_artifact(mid: str, payload: ArtifactTextIn, db: Session = Depends(g
     db.add(art)
     db.commit()
     db.refresh(art)
+    transcripts.append_transcript(db, art)
     return art
 
-@app.post("/meetings/{mid}/artifacts/audio", response_model=ArtifactOut, status_code=201)
-def upload_audio_artifact(mid: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
-    meeting = db.get(models.Meeting, mid)
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-
-    ext = os.path.splitext(file.filename or "")[1] or ".wav"
-    fname = f"{mid}_{uuid.uuid4().hex}{ext}"
-    path = UPLOAD_DIR / fname
-    with path.open("wb") as f:
-        f.write(file.file.read())
-
-    artifact_url = f"http://localhost:8000/uploads/{fname}"
+def _create_file_artifact(db: Session, mid: str, kind: models.ArtifactKind, stored: uploads.StoredUpload) -> models.Artifact:
+    # A file we have seen before (in any meeting) reuses its transcript instead of another LLM call
+    known = lookup_transcripts(db, {stored.sha256})
     art = models.Artifact(
         meeting_id=mid,
-        kind=models.ArtifactKind.audio,
-        url=artifact_url,
-        file_path=str(path)
+        kind=kind,
+        url=f"http://localhost:8000/uploads/{stored.file_name}",
+        file_path=str(stored.path),
+        content_hash=stored.sha256,
+        size_bytes=stored.size_bytes,
+        transcript_text=known.get(stored.sha256),
     )
+    metrics.observe_upload(kind.value, stored.size_bytes)
     db.add(art)
     db.commit()
     db.refresh(art)
+    transcripts.append_transcript(db, art)
     return art
 
+def _store_upload_file(file: UploadFile, default_ext: str) -> uploads.StoredUpload:
+    ext = os.path.splitext(file.filename or "")[1] or default_ext
+    try:
+        return uploads.store_stream(uploads.read_chunks(file.file), ext)
+    except uploads.UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@app.post("/meetings/{mid}/artifacts/audio", response_model=ArtifactOut, status_code=201)
+def upload_audio_artifact(mid: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    meeting = db.get(models.Meeting, mid)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    stored = _store_upload_file(file, ".wav")
+    return _create_file_artifact(db, mid, models.ArtifactKind.audio, stored)
+
 @app.post("/meetings/{mid}/artifacts/image", response_model=ArtifactOut, status_code=201)
 def upload_image_artifact(mid: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
     meeting = db.get(models.Meeting, mid)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
 
-    ext = os.path.splitext(file.filename or "")[1] or ".jpg"
-    fname = f"{mid}_{uuid.uuid4().hex}{ext}"
-    path = UPLOAD_DIR / fname
-    with path.open("wb") as f:
-        f.write(file.file.read())
+    stored = _store_upload_file(file, ".jpg")
+    return _create_file_artifact(db, mid, models.ArtifactKind.image, stored)
 
-    artifact_url = f"http://localhost:8000/uploads/{fname}"
-    art = models.Artifact(
-        meeting_id=mid,
-        kind=models.ArtifactKind.image,
-        url=artifact_url,
-        file_path=str(path)
-    )
-    db.add(art)
+# Resumable uploads for large recordings: start a session, PUT raw chunks at an offset
+# (a dropped connection resumes from GET's offset), then complete to create the artifact.
+@app.post("/meetings/{mid}/uploads", response_model=UploadSessionOut, status_code=201)
+def start_upload(mid: str, payload: UploadSessionIn, db: Session = Depends(get_db)):
+    if not db.get(models.Meeting, mid):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    if payload.kind not in (models.ArtifactKind.audio, models.ArtifactKind.image):
+        raise HTTPException(status_code=400, detail="Only audio and image uploads are supported")
+    row = models.UploadSession(meeting_id=mid, kind=payload.kind, filename=payload.filename, received_bytes=0)
+    db.add(row)
     db.commit()
-    db.refresh(art)
-    return art
+    db.refresh(row)
+    return row
+
+def _get_upload_session(db: Session, mid: str, upload_id: str) -> models.UploadSession:
+    row = db.get(models.UploadSession, upload_id)
+    if not row or row.meeting_id != mid:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return row
+
+@app.get("/meetings/{mid}/uploads/{upload_id}", response_model=UploadSessionOut)
+def get_upload(mid: str, upload_id: str, db: Session = Depends(get_db)):
+    return _get_upload_session(db, mid, upload_id)
+
+@app.put("/meetings/{mid}/uploads/{upload_id}", response_model=UploadSessionOut)
+async def upload_chunk(mid: str, upload_id: str, request: Request, offset: int = 0,
+                       db: AsyncSession = Depends(get_async_db)):
+    try:
+        with uploads.exclusive(upload_id):
+            return await _write_chunk(db, mid, upload_id, request, offset)
+    except uploads.UploadBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+async def _write_chunk(db: AsyncSession, mid: str, upload_id: str, request: Request, offset: int) -> models.UploadSession:
+    row = await db.get(models.UploadSession, upload_id)
+    if not row or row.meeting_id != mid:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if offset != row.received_bytes:
+        raise HTTPException(status_code=409, detail=f"Expected offset {row.received_bytes}")
+    written = offset
+    f = await run_in_threadpool(uploads.open_partial, upload_id, offset)
+    try:
+        async for chunk in request.stream():
+            if written + len(chunk) > uploads.MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds the {uploads.MAX_UPLOAD_BYTES} byte limit")
+            await run_in_threadpool(f.write, chunk)
+            written += len(chunk)
+    finally:
+        await run_in_threadpool(f.close)
+        # Also on a dropped connection or 413: the client resumes after the bytes that reached the file
+        row.received_bytes = written
+        await db.commit()
+    return row
+
+@app.post("/meetings/{mid}/uploads/{upload_id}/complete", response_model=ArtifactOut, status_code=201)
+def complete_upload(mid: str, upload_id: str, db: Session = Depends(get_db)):
+    try:
+        with uploads.exclusive(upload_id):
+            row = _get_upload_session(db, mid, upload_id)
+            if row.received_bytes == 0:
+                raise HTTPException(status_code=400, detail="No data uploaded")
+            default_ext = ".wav" if row.kind == models.ArtifactKind.audio else ".jpg"
+            ext = os.path.splitext(row.filename or "")[1] or default_ext
+            try:
+                stored = uploads.finalize_partial(upload_id, ext)
+            except FileNotFoundError:
+                row.received_bytes = 0
+                db.commit()
+                raise HTTPException(status_code=409, detail="Uploaded data is missing; resume from offset 0")
+            kind = row.kind
+            db.delete(row)
+            return _create_file_artifact(db, mid, kind, stored)
+    except uploads.UploadBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @app.get("/meetings/{mid}/artifacts", response_model=list[ArtifactOut])
-def list_artifacts(mid: str, db: Session = Depends(get_db)):
+def list_artifacts(mid: str, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: str | None = None,
+                   fields: str | None = None, db: Session = Depends(get_db)):
+    """Transcripts are left out unless asked for (``fields=*`` or a list including transcript_text)."""
     meeting = db.get(models.Meeting, mid)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    return db.query(models.Artifact).filter_by(meeting_id=mid).all()
+    query = db.query(models.Artifact).filter_by(meeting_id=mid)
+    return _page(query, models.Artifact, ArtifactOut, cursor, limit, fields, default_exclude=("transcript_text",))
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    body, content_type = metrics.latest()
+    return Response(body, media_type=content_type)
+
+@app.get("/admin/db/pool")
+def db_pool_stats():
+    return pool_stats()
+
+@app.post("/admin/artifacts/cleanup")
+def cleanup_duplicate_artifacts(db: Session = Depends(get_db)):
+    """Remove duplicate artifacts (same file or same transcript) from every meeting."""
+    removed = dedupe_artifacts(db)
+    return {"removed": sum(removed.values()), "meetings": removed}
 
 # ----------------------------
 # Summaries
@@ -184,15 +370,18 @@ def list_artifacts(mid: str, db: Session = Depends(get_db)):
 def create_summary(mid: str, payload: SummaryIn, db: Session = Depends(get_db)):
     if not db.get(models.Meeting, mid):
         raise HTTPException(status_code=404, detail="Meeting not found")
-    row = models.Summary(meeting_id=mid, text=payload.text)
+    row = models.Summary(meeting_id=mid, text=payload.text, source=models.OutputSource.manual)
     db.add(row)
     db.commit()
     db.refresh(row)
+    tts.prerender_summary(row.text)
     return row
 
 @app.get("/meetings/{mid}/summary", response_model=list[SummaryOut])
-def get_summaries(mid: str, db: Session = Depends(get_db)):
-    return db.query(models.Summary).filter_by(meeting_id=mid).all()
+def get_summaries(mid: str, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: str | None = None,
+                  fields: str | None = None, db: Session = Depends(get_db)):
+    query = db.query(models.Summary).filter_by(meeting_id=mid)
+    return _page(query, models.Summary, SummaryOut, cursor, limit, fields)
 
 # ----------------------------
 # Decisions
@@ -201,15 +390,19 @@ def get_summaries(mid: str, db: Session = Depends(get_db)):
 def create_decisions(mid: str, items: list[DecisionIn], db: Session = Depends(get_db)):
     if not db.get(models.Meeting, mid):
         raise HTTPException(status_code=404, detail="Meeting not found")
-    rows = [models.Decision(meeting_id=mid, text=i.text) for i in items]
-    db.add_all(rows)
+    rows = bulk.upsert_rows(
+        db, models.Decision,
+        [{"id": i.id, "meeting_id": mid, "text": i.text, "source": models.OutputSource.manual} for i in items],
+        update_columns=("text", "source"),
+    )
     db.commit()
-    for r in rows: db.refresh(r)
     return rows
 
 @app.get("/meetings/{mid}/decisions", response_model=list[DecisionOut])
-def list_decisions(mid: str, db: Session = Depends(get_db)):
-    return db.query(models.Decision).filter_by(meeting_id=mid).all()
+def list_decisions(mid: str, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: str | None = None,
+                   fields: str | None = None, db: Session = Depends(get_db)):
+    query = db.query(models.Decision).filter_by(meeting_id=mid)
+    return _page(query, models.Decision, DecisionOut, cursor, limit, fields)
 
 # ----------------------------
 # Action Items
@@ -218,149 +411,285 @@ def list_decisions(mid: str, db: Session = Depends(get_db)):
 def create_action_items(mid: str, items: list[ActionItemIn], db: Session = Depends(get_db)):
     if not db.get(models.Meeting, mid):
         raise HTTPException(status_code=404, detail="Meeting not found")
-    rows = [
-        models.ActionItem(meeting_id=mid, task=i.task, owner=i.owner, due_date=i.due_date, status=models.ActionStatus.pending)
-        for i in items
-    ]
-    db.add_all(rows)
+    rows = bulk.upsert_rows(
+        db, models.ActionItem,
+        [{"id": i.id, "meeting_id": mid, "task": i.task, "owner": i.owner, "due_date": i.due_date,
+          "status": models.ActionStatus.pending, "source": models.OutputSource.manual} for i in items],
+        update_columns=("task", "owner", "due_date", "source"),  # an update keeps the item's status
+    )
     db.commit()
-    for r in rows: db.refresh(r)
     return rows
 
 @app.get("/meetings/{mid}/action-items", response_model=list[ActionItemOut])
-def list_action_items(mid: str, db: Session = Depends(get_db)):
-    return db.query(models.ActionItem).filter_by(meeting_id=mid).all()
+def list_action_items(mid: str, limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: str | None = None,
+                      status: models.ActionStatus | None = None, fields: str | None = None,
+                      db: Session = Depends(get_db)):
+    query = db.query(models.ActionItem).filter_by(meeting_id=mid)
+    if status:
+        query = query.filter(models.ActionItem.status == status)
+    return _page(query, models.ActionItem, ActionItemOut, cursor, limit, fields)
+
+@app.patch("/meetings/{mid}/action-items/{item_id}", response_model=ActionItemOut)
+def update_action_item(mid: str, item_id: str, payload: ActionItemUpdate, db: Session = Depends(get_db)):
+    row = db.get(models.ActionItem, item_id)
+    if not row or row.meeting_id != mid:
+        raise HTTPException(status_code=404, detail="Action item not found")
+    changes = payload.model_dump(exclude_unset=True)
+    if "status" in changes:
+        try:
+            changes["status"] = models.ActionStatus(changes["status"])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid status")
+    for field, value in changes.items():
+        setattr(row, field, value)
+    # Edited items belong to the user now; reprocessing will not replace them
+    row.source = models.OutputSource.manual
+    db.commit()
+    db.refresh(row)
+    return row
 
 # ----------------------------
 # Processing / Summarization
 # ----------------------------
-from app.llm import generate_summary, generate_decisions, generate_action_items, answer_question, transcribe_audio, analyze_image
+from app.llm import answer_question, answer_from_passages, stream_answer_question, stream_answer_from_passages
+from app.retrieval import retrieve, format_passage
+from app.semantic import search_meetings
+from app.llm_cache import llm_cache
+from app import chat
+from app.rate_limit import rate_limiter
+from app.processing import DEFAULT_EXTRACTION_MODE
+from app import jobs
 
 @app.post("/meetings/{mid}/process")
-async def process_meeting(mid: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    meeting = db.get(models.Meeting, mid)
+async def process_meeting(mid: str, mode: ExtractionMode | None = None, refresh: bool = False,
+                          db: AsyncSession = Depends(get_async_db)):
+    meeting = await db.get(models.Meeting, mid)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    background_tasks.add_task(real_processing, mid, db)
-    
-    return {"status": "processing started", "meeting_id": mid}
-
-def real_processing(mid: str, db: Session):
-    meeting = db.get(models.Meeting, mid)
-    if not meeting:
-        logger.error(f"Meeting {mid} not found during processing")
-        return
-
-    artifacts = db.query(models.Artifact).filter_by(meeting_id=mid).all()
-
-    # Transcribe non-text artifacts
-    for a in artifacts:
-        if a.transcript_text:
-            continue
-        if a.kind == models.ArtifactKind.audio and a.file_path:
-            a.transcript_text = transcribe_audio(a.file_path)
-        elif a.kind == models.ArtifactKind.image and a.file_path:
-            a.transcript_text = analyze_image(a.file_path)
-    db.commit()
-
-    # Deduplicate and concatenate transcripts
-    transcripts = [a.transcript_text for a in artifacts if a.transcript_text]
-    unique_transcripts = list(dict.fromkeys(transcripts))  # Remove duplicates
-    transcript = "\n".join(unique_transcripts)
-    
-    if not transcript.strip():
-        logger.warning(f"No valid transcript for meeting {mid}")
-        transcript = "No valid transcript available."
-
-    logger.info(f"Processing transcript for meeting {mid} (length: {len(transcript)} chars): {transcript[:200]}...")
-
-    # Get participants for assignment
-    participants = db.query(models.Participant).filter_by(meeting_id=mid).all()
-    participant_names = [p.name for p in participants if p.name]
 
-    # Clear existing summaries, decisions, and action items
-    db.query(models.Summary).filter_by(meeting_id=mid).delete()
-    db.query(models.Decision).filter_by(meeting_id=mid).delete()
-    db.query(models.ActionItem).filter_by(meeting_id=mid).delete()
-    db.commit()
-
-    # Summarize
-    summary_text = generate_summary(transcript)
-    db.add(models.Summary(meeting_id=mid, text=summary_text))
-
-    # Decisions
-    decisions_list = generate_decisions(transcript)
-    db.add_all([models.Decision(meeting_id=mid, text=d) for d in decisions_list])
-
-    # Action Items
-    actions_list = generate_action_items(transcript, participant_names)
-    db.add_all([
-        models.ActionItem(
-            meeting_id=mid,
-            task=a['task'],
-            owner=a['owner'],
-            due_date=a['due_date'],
-            status=models.ActionStatus.pending
-        )
-        for a in actions_list
-    ])
-
-    db.commit()
-    logger.info(f"Processing completed for meeting {mid}")
+    # Incremental by default; refresh=true rebuilds every generated output from the full transcript.
+    # run_sync shares the queue logic with the workers while keeping the I/O on the async driver.
+    job, created = await db.run_sync(jobs.enqueue_processing, mid, mode or DEFAULT_EXTRACTION_MODE, refresh)
+
+    return {
+        "status": "processing started" if created else (
+            "full refresh queued after the current run"
+            if refresh and job.status == models.JobStatus.running else "processing already in progress"
+        ),
+        "meeting_id": mid,
+        "job_id": job.id,
+        "mode": job.mode,
+        "full_refresh": bool(job.full_refresh),
+    }
+
+@app.get("/meetings/{mid}/jobs/{job_id}", response_model=JobOut)
+def get_job(mid: str, job_id: str, db: Session = Depends(get_db)):
+    job = db.get(models.ProcessingJob, job_id)
+    if not job or job.meeting_id != mid:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 # ----------------------------
 # Smart Chatbot
 # ----------------------------
 class ChatRequest(BaseModel):
     question: str
+    offline: bool = False  # answer straight from the retrieval index, without an LLM call
+    session_id: str | None = None  # from POST /meetings/{mid}/chat/sessions; keeps history and context
+
+# CHAT_OFFLINE=1 answers every question from the index (no Gemini access needed)
+CHAT_OFFLINE = os.getenv("CHAT_OFFLINE", "0") in ("1", "true", "True")
+
+@app.post("/meetings/{mid}/chat/sessions", response_model=ChatSessionOut, status_code=201)
+def create_chat_session(mid: str, db: Session = Depends(get_db)):
+    if not db.get(models.Meeting, mid):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return chat.create_session(db, mid)
+
+@app.get("/meetings/{mid}/chat/sessions/{session_id}", response_model=ChatSessionOut)
+def get_chat_session(mid: str, session_id: str, db: Session = Depends(get_db)):
+    session = db.get(models.ChatSession, session_id)
+    if not session or session.meeting_id != mid:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return session
+
+async def _plan_session_turn(mid: str, req: ChatRequest) -> chat.TurnPlan:
+    try:
+        return await run_in_threadpool(chat.plan_turn, mid, req.session_id, req.question, req.offline or CHAT_OFFLINE)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Chat session not found")
 
 @app.post("/meetings/{mid}/chat")
-async def chat_meeting(mid: str, req: ChatRequest, db: Session = Depends(get_db)):
-    meeting = db.get(models.Meeting, mid)
+async def chat_meeting(mid: str, req: ChatRequest, background_tasks: BackgroundTasks,
+                       db: AsyncSession = Depends(get_async_db)):
+    meeting = await db.get(models.Meeting, mid)
     if not meeting:
         return {"answer": "Meeting not found. Please check the meeting ID."}
 
-    artifacts = db.query(models.Artifact).filter_by(meeting_id=mid).all()
-    transcripts = [a.transcript_text for a in artifacts if a.transcript_text]
-    unique_transcripts = list(dict.fromkeys(transcripts))  # Remove duplicates
-    transcript = "\n".join(unique_transcripts)
+    if req.session_id:
+        plan = await _plan_session_turn(mid, req)
+        answer = await run_in_threadpool(chat.answer, plan)
+        await run_in_threadpool(chat.record_turn, req.session_id, req.question, answer)
+        background_tasks.add_task(chat.compact_history, req.session_id)
+        return {"answer": answer, "sources": plan.passages, "session_id": req.session_id}
+
+    transcript = await db.run_sync(transcripts.current_transcript, mid)
 
     if not transcript.strip():
         logger.warning(f"No transcript available for meeting {mid}")
         return {"answer": "No transcript available yet. Please upload meeting audio, image, or text first."}
 
-    # Use LLM to answer
-    answer = answer_question(transcript, req.question)
-    return {"answer": answer}
+    # Retrieve the most relevant passages and send only those to the LLM.
+    # Index builds and Gemini calls block, so they run in the threadpool, not on the event loop.
+    passages = await run_in_threadpool(retrieve, mid, transcript, req.question)
+    if req.offline or CHAT_OFFLINE:
+        answer = format_passage(passages[0]) if passages else "Couldn't find a direct answer in the transcript."
+    elif passages:
+        answer = await run_in_threadpool(answer_from_passages, [format_passage(p) for p in passages], req.question, mid)
+    else:
+        # No term overlap (e.g. "summarize the meeting"): fall back to the whole transcript
+        answer = await run_in_threadpool(answer_question, transcript, req.question, mid)
+    return {"answer": answer, "sources": passages}
+
+def _sse(data, event: str | None = None) -> str:
+    return (f"event: {event}\n" if event else "") + f"data: {json.dumps(jsonable_encoder(data))}\n\n"
+
+async def _stream_events(request: Request, chunks, sources: list[dict]):
+    """Relay answer chunks as SSE: ``sources`` first, one ``data: {"delta": ...}`` per chunk, then ``done``.
+
+    Chunks come from a blocking generator, pulled one at a time in the threadpool. Closing it when
+    the client goes away stops the model stream and frees its rate-limiter slot.
+    """
+    answer = []
+    try:
+        yield _sse(sources, "sources")
+        while True:
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                break
+            if await request.is_disconnected():
+                logger.info("Chat client disconnected, cancelling the answer stream")
+                return
+            answer.append(chunk)
+            yield _sse({"delta": chunk})
+        yield _sse({"answer": "".join(answer)}, "done")
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+@app.post("/meetings/{mid}/chat/stream")
+async def chat_meeting_stream(mid: str, req: ChatRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Same answer as /chat, sent as Server-Sent Events while the model generates it."""
+    meeting = await db.get(models.Meeting, mid)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    if req.session_id:
+        plan = await _plan_session_turn(mid, req)
+        return StreamingResponse(
+            _stream_events(request, chat.stream_answer(plan), plan.passages), media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            background=BackgroundTask(chat.compact_history, req.session_id),
+        )
+
+    transcript = await db.run_sync(transcripts.current_transcript, mid)
+    passages = []
+    if not transcript.strip():
+        chunks = iter(["No transcript available yet. Please upload meeting audio, image, or text first."])
+    else:
+        passages = await run_in_threadpool(retrieve, mid, transcript, req.question)
+        if req.offline or CHAT_OFFLINE:
+            chunks = iter([format_passage(passages[0]) if passages else "Couldn't find a direct answer in the transcript."])
+        elif passages:
+            chunks = stream_answer_from_passages([format_passage(p) for p in passages], req.question, mid)
+        else:
+            chunks = stream_answer_question(transcript, req.question, mid)
+    return StreamingResponse(
+        _stream_events(request, chunks, passages), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # ----------------------------
-# Avatar / TTS
+# Action flow
 # ----------------------------
-@app.get("/meetings/{mid}/avatar")
-async def avatar_meeting(mid: str, db: Session = Depends(get_db)):
+@app.get("/meetings/{mid}/action-flow")
+def get_action_flow(mid: str, offset: int = Query(0, ge=0), limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                    speaker: list[str] | None = Query(None), db: Session = Depends(get_db)):
+    """A page of the speaker timeline with per-speaker talk time and turn counts."""
     meeting = db.get(models.Meeting, mid)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
+    return timeline.timeline_page(db, timeline.current_timeline(db, meeting), offset, limit, speaker)
 
-    # Use the latest summary for TTS
-    summaries = db.query(models.Summary).filter_by(meeting_id=mid).order_by(models.Summary.created_at.desc()).all()
-    text = summaries[0].text if summaries else "Hello! No summary is available for this meeting yet."
+# ----------------------------
+# Search
+# ----------------------------
+@app.get("/search", response_model=list[SearchHit])
+def full_text_search(q: str, kind: list[str] | None = Query(None), meeting_id: str | None = None,
+                     limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0),
+                     db: Session = Depends(get_db)):
+    """Full-text matches in transcripts, summaries, decisions and action items, best first."""
+    unknown = set(kind or ()) - set(search.SOURCES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kind(s): {', '.join(sorted(unknown))}")
+    return search.search(db, q, kind, meeting_id, limit, offset)
+
+@app.get("/search/semantic", response_model=list[SemanticHit])
+def semantic_search(q: str, k: int = 10, db: Session = Depends(get_db)):
+    """Meetings whose transcripts are semantically closest to ``q``, best first."""
+    return search_meetings(db, q, max(1, min(k, 50)))
 
-    if len(text) > 1000:
-        text = text[:1000] + "... The full details contain more."
+# ----------------------------
+# LLM response cache
+# ----------------------------
+@app.get("/llm-cache/stats")
+def llm_cache_stats():
+    return llm_cache.stats()
 
-    logger.info(f"Generating TTS for meeting {mid}")
-    tts = gTTS(text, lang="en", slow=False)
-    audio_io = io.BytesIO()
-    tts.write_to_fp(audio_io)
-    audio_io.seek(0)
+@app.get("/admin/llm/rate-limit")
+def llm_rate_limit_stats():
+    return rate_limiter.stats()
 
-    return StreamingResponse(
-        audio_io, 
-        media_type="audio/mpeg",
-        headers={
-            "Content-Disposition": f"inline; filename=meeting_{mid}_avatar.mp3",
-            "Cache-Control": "no-cache"
-        }
+@app.delete("/meetings/{mid}/llm-cache")
+def invalidate_llm_cache(mid: str):
+    return {"meeting_id": mid, "invalidated": llm_cache.invalidate_meeting(mid)}
+
+# ----------------------------
+# Avatar / TTS
+# ----------------------------
+@app.get("/meetings/{mid}/avatar")
+async def avatar_meeting(mid: str, request: Request, voice: str = tts.TTS_VOICE,
+                         db: AsyncSession = Depends(get_async_db)):
+    meeting = await db.get(models.Meeting, mid)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    # Use the latest summary for TTS
+    summary = await db.scalar(
+        select(models.Summary).where(models.Summary.meeting_id == mid).order_by(models.Summary.created_at.desc()).limit(1)
     )
+    text = tts.speech_text(summary.text if summary else None)
+    key = tts.cache_key(text, voice)
+    headers = {
+        "ETag": f'"{key}"',
+        # Revalidate on every play; the audio only changes when the summary does
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Content-Disposition": f"inline; filename=meeting_{mid}_avatar.mp3",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    # Held until the response is sent, so a concurrent eviction cannot delete the file mid-stream
+    path = tts.acquire(key)
+    if path is None:
+        logger.info(f"Generating TTS for meeting {mid}")
+        try:
+            await run_in_threadpool(tts.render, text, voice)
+        except ValueError as e:  # unsupported voice/language
+            raise HTTPException(status_code=400, detail=str(e))
+        path = tts.acquire(key)
+        if path is None:
+            raise HTTPException(status_code=503, detail="Avatar audio was evicted while rendering; try again")
+    # FileResponse answers Range requests, so players can seek without re-downloading
+    return FileResponse(path, media_type="audio/mpeg", headers=headers, background=BackgroundTask(tts.release, path))
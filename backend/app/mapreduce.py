@@ -0,0 +1,169 @@
+# app/mapreduce.py
+# Map-reduce extraction for transcripts longer than a single prompt allows.
+# Map results are stored per chunk hash, so an append only maps the new chunks.
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.llm import deduplicate_transcript, extract_meeting_outputs, merge_summaries, parse_due_dates
+
+logger = logging.getLogger(__name__)
+
+CHUNK_TOKENS = int(os.getenv("MAPREDUCE_CHUNK_TOKENS", "2000"))
+MAP_CONCURRENCY = int(os.getenv("MAPREDUCE_CONCURRENCY", "4"))
+CHARS_PER_TOKEN = 4  # rough estimate for English text
+
+SENTENCE_SPLIT_REGEX = re.compile(r"(?<=[.?!])\s+")
+WORD_REGEX = re.compile(r"\w+")
+
+def _pieces(line: str, max_chars: int):
+    """Yield a line whole, or split on sentences (then hard-wrapped) when it exceeds the budget."""
+    if len(line) <= max_chars:
+        yield line
+        return
+    for sentence in SENTENCE_SPLIT_REGEX.split(line):
+        for start in range(0, len(sentence), max_chars):
+            yield sentence[start:start + max_chars]
+
+def split_transcript(transcript: str, chunk_tokens: int = CHUNK_TOKENS) -> list[str]:
+    """Greedily pack speaker lines into chunks of at most ``chunk_tokens`` estimated tokens.
+
+    Packing is deterministic from the start of the transcript, so appending text
+    leaves every earlier chunk (and its hash) unchanged.
+    """
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    chunks, current, size = [], [], 0
+    for line in transcript.split("\n"):
+        for piece in _pieces(line, max_chars):
+            if current and size + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def _chunk_hash(chunk: str, participant_names: list[str]) -> str:
+    # Owner assignment depends on the participant list, so it is part of the key
+    return hashlib.sha256((",".join(participant_names) + "\x00" + chunk).encode("utf-8")).hexdigest()
+
+def _fingerprint(text: str) -> frozenset[str]:
+    return frozenset(w for w in WORD_REGEX.findall(text.lower()) if len(w) > 2)
+
+def _is_duplicate(fp: frozenset[str], seen: list[frozenset[str]], threshold: float = 0.8) -> int | None:
+    """Index of the first near-duplicate in ``seen`` by Jaccard similarity, if any."""
+    for i, other in enumerate(seen):
+        if not fp and not other:
+            return i
+        union = len(fp | other)
+        if union and len(fp & other) / union >= threshold:
+            return i
+    return None
+
+def merge_decisions(groups: list[list[str]]) -> list[str]:
+    merged, seen = [], []
+    for decisions in groups:
+        for decision in decisions:
+            fp = _fingerprint(decision)
+            if _is_duplicate(fp, seen) is None:
+                seen.append(fp)
+                merged.append(decision)
+    return merged
+
+def merge_action_items(groups: list[list[dict]]) -> list[dict]:
+    """Deduplicate action items across chunks and renumber chunk-local dependencies."""
+    merged, seen = [], []
+    for actions in groups:
+        local_to_global, added = {}, []
+        for local_id, action in enumerate(actions, 1):
+            fp = _fingerprint(action.get("task", ""))
+            dup = _is_duplicate(fp, seen)
+            if dup is None:
+                seen.append(fp)
+                item = {**action, "dependencies": list(action.get("dependencies") or [])}
+                merged.append(item)
+                added.append(item)
+                local_to_global[local_id] = len(merged)
+                continue
+            local_to_global[local_id] = dup + 1
+            existing = merged[dup]
+            if existing.get("owner") in (None, "", "Unassigned") and action.get("owner"):
+                existing["owner"] = action["owner"]
+            if not existing.get("due_date") and action.get("due_date"):
+                existing["due_date"] = action["due_date"]
+        for item in added:
+            item["dependencies"] = [local_to_global[d] for d in item["dependencies"] if d in local_to_global]
+    return merged
+
+def match_existing(existing: list[str], candidates: list[str]) -> list[int | None]:
+    """For each candidate, the index of a near-duplicate among ``existing`` and the candidates before it.
+
+    None means the candidate is new. Indexes >= len(existing) point at earlier candidates.
+    """
+    seen = [_fingerprint(t) for t in existing]
+    matches = []
+    for candidate in candidates:
+        fp = _fingerprint(candidate)
+        matches.append(_is_duplicate(fp, seen))
+        seen.append(fp)
+    return matches
+
+def _to_json(result: dict) -> str:
+    def default(value):
+        if isinstance(value, date):
+            return value.isoformat()
+        raise TypeError(f"Unserializable {type(value).__name__}")
+    return json.dumps(result, default=default)
+
+def map_reduce_extract(db: Session, mid: str, transcript: str, participant_names: list[str], prune: bool = True) -> dict:
+    """Extract summary, decisions and action items from a transcript of any length.
+
+    With ``prune=False`` (extracting only newly added content) stored chunks of the rest of the
+    meeting are kept.
+    """
+    chunks = split_transcript(deduplicate_transcript(transcript))
+    hashes = [_chunk_hash(c, participant_names) for c in chunks]
+
+    stored = {
+        row.chunk_hash: row
+        for row in db.query(models.TranscriptChunk).filter_by(meeting_id=mid).all()
+    }
+    pending = [i for i, h in enumerate(hashes) if h not in stored]
+    logger.info(f"Map-reduce for meeting {mid}: {len(chunks)} chunks, {len(pending)} to map")
+
+    results: dict[int, dict] = {}
+    with ThreadPoolExecutor(max_workers=MAP_CONCURRENCY) as pool:
+        mapped = pool.map(lambda i: extract_meeting_outputs(chunks[i], participant_names, mid), pending)
+        for i, result in zip(pending, mapped):
+            results[i] = result
+
+    # Persist fresh map results (heuristic fallbacks are not worth keeping) and prune stale chunks
+    for i, h in enumerate(hashes):
+        if i in results:
+            if not results[i].get("degraded"):
+                db.add(models.TranscriptChunk(meeting_id=mid, chunk_hash=h, position=i, result_json=_to_json(results[i])))
+        else:
+            row = stored[h]
+            row.position = i
+            results[i] = json.loads(row.result_json)
+            parse_due_dates(results[i]["action_items"])
+    current = set(hashes)
+    for h, row in stored.items():
+        if prune and h not in current:
+            db.delete(row)
+    db.commit()
+
+    ordered = [results[i] for i in range(len(chunks))]
+    return {
+        "summary": merge_summaries([r["summary"] for r in ordered], mid),
+        "decisions": merge_decisions([r["decisions"] for r in ordered]),
+        "action_items": merge_action_items([r["action_items"] for r in ordered]),
+    }
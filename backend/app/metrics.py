@@ -0,0 +1,207 @@
+# app/metrics.py
+# Prometheus metrics, served at GET /metrics (and, for external job workers, on METRICS_PORT).
+#
+# Requests are labelled by route template, never by raw path, so series stay bounded. Every SQL
+# statement is timed by cursor event hooks; the statements of an HTTP request are also added up
+# in a per-request counter held in a context variable (the threadpool copies the context, so sync
+# endpoints and their dependencies are counted too).
+#
+# Numbers that already have a stats() source (DB pool, LLM cache, LLM rate limiter) and the job
+# queue depth are read when Prometheus scrapes, not updated on the hot path.
+import contextvars
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event, func, select
+
+from app import models
+from app.db import async_engine, engine, pool_stats
+from app.llm_cache import llm_cache
+from app.rate_limit import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # external workers only; 0 = off
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+UPLOAD_BUCKETS = tuple(2 ** n for n in range(10, 32, 2))  # 1 KiB .. 1 GiB
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the last body chunk is sent",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ["route"], buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request", ["route"],
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement latency", ["engine"])
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "LLM call latency including rate-limiter wait and retries",
+    ["function", "outcome"], buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the model", ["function", "type"])
+LLM_ERRORS = Counter("llm_errors_total", "LLM calls that raised", ["function", "error"])
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes of uploaded artifact files", ["kind"])
+UPLOAD_SIZE = Histogram("upload_size_bytes", "Size of uploaded artifact files", ["kind"], buckets=UPLOAD_BUCKETS)
+PROCESSING_STAGE_SECONDS = Histogram(
+    "processing_stage_duration_seconds", "Duration of each meeting processing stage", ["stage"], buckets=STAGE_BUCKETS,
+)
+PROCESSING_JOBS = Counter("processing_jobs_total", "Finished processing job attempts", ["outcome"])
+
+# ---- Per-request SQL accounting ----
+@dataclass
+class RequestQueries:
+    count: int = 0
+    seconds: float = 0.0
+
+_request_queries: contextvars.ContextVar[RequestQueries | None] = contextvars.ContextVar("request_queries", default=None)
+
+def _instrument(sync_engine, name: str) -> None:
+    histogram = DB_QUERY_SECONDS.labels(name)
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        histogram.observe(elapsed)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += elapsed
+
+    event.listen(sync_engine, "before_cursor_execute", before)
+    event.listen(sync_engine, "after_cursor_execute", after)
+
+_instrument(engine, "sync")
+_instrument(async_engine.sync_engine, "async")
+
+class MetricsMiddleware:
+    """Times every HTTP request and records its SQL statements (plain ASGI, so streaming bodies are timed
+    to their end)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries()
+        token = _request_queries.set(queries)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_queries.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+            HTTP_REQUEST_DB_QUERIES.labels(route).observe(queries.count)
+            HTTP_REQUEST_DB_SECONDS.labels(route).observe(queries.seconds)
+
+# ---- LLM calls ----
+def observe_llm_call(function: str, started: float, response=None, error: Exception | None = None) -> None:
+    """Record one provider call started at ``started`` (perf_counter) and its token usage."""
+    outcome = "error" if error is not None else "ok"
+    LLM_CALL_SECONDS.labels(function, outcome).observe(time.perf_counter() - started)
+    if error is not None:
+        LLM_ERRORS.labels(function, type(error).__name__).inc()
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        LLM_TOKENS.labels(function, "prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+        LLM_TOKENS.labels(function, "output").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+def observe_llm_cache_hit(function: str, started: float) -> None:
+    LLM_CALL_SECONDS.labels(function, "cache_hit").observe(time.perf_counter() - started)
+
+# ---- Uploads and processing ----
+def observe_upload(kind: str, size_bytes: int) -> None:
+    UPLOAD_BYTES.labels(kind).inc(size_bytes)
+    UPLOAD_SIZE.labels(kind).observe(size_bytes)
+
+def timed_stages(progress):
+    """Wrap a processing progress callback so each stage's running -> done interval is recorded."""
+    started: dict[str, float] = {}
+
+    def report(stage: str, state: str) -> None:
+        if state == "running":
+            started[stage] = time.perf_counter()
+        elif state == "done" and stage in started:
+            PROCESSING_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started.pop(stage))
+        progress(stage, state)
+    return report
+
+# ---- Scrape-time gauges ----
+def _gauges(prefix: str, series: dict[tuple, dict], label_names: tuple[str, ...] = ()):
+    """One gauge family per numeric entry of the stats() dicts in ``series``, which maps label values
+    to a stats() dict; each dict adds one sample per family. Nested dicts become a "key" label."""
+    families: dict[str, GaugeMetricFamily] = {}
+    for label_values, stats in series.items():
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float, dict)):
+                continue
+            nested = isinstance(value, dict)
+            gauge = families.get(key)
+            if gauge is None:
+                labels = [*label_names, "key"] if nested else list(label_names)
+                gauge = families[key] = GaugeMetricFamily(f"{prefix}_{key}", f"{prefix} {key}", labels=labels)
+            if nested:
+                for sub, v in value.items():
+                    gauge.add_metric([*label_values, sub], v)
+            else:
+                gauge.add_metric(list(label_values), value)
+    return list(families.values())
+
+class StatsCollector:
+    def describe(self):
+        return []  # values are only known at scrape time
+
+    def collect(self):
+        yield from _gauges("llm_cache", {(): llm_cache.stats()})
+        yield from _gauges("llm_rate_limiter", {(): rate_limiter.stats()})
+        pools = pool_stats()
+        yield from _gauges("db_pool", {(name,): pools[name] for name in ("sync", "async")}, ("engine",))
+        depth = GaugeMetricFamily("processing_queue_depth", "Queued and running processing jobs", labels=["status"])
+        active = (models.JobStatus.queued, models.JobStatus.running)
+        try:
+            with engine.connect() as conn:
+                # Served by the partial index on active jobs; finished jobs are never scanned
+                rows = conn.execute(
+                    select(models.ProcessingJob.status, func.count())
+                    .where(models.ProcessingJob.status.in_(active)).group_by(models.ProcessingJob.status)
+                ).all()
+        except Exception:
+            logger.exception("Cannot read the job queue depth")
+            rows = []
+        counts = dict(rows)
+        for status in active:
+            depth.add_metric([status.value], counts.get(status, 0))
+        yield depth
+
+REGISTRY.register(StatsCollector())
+
+def latest() -> tuple[bytes, str]:
+    """The current metrics in the Prometheus text format, and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+def serve(port: int = METRICS_PORT) -> None:
+    """Expose /metrics on its own port (for processes without the API, e.g. `python -m app.jobs`)."""
+    if port:
+        start_http_server(port)
+        logger.info(f"Serving metrics on port {port}")
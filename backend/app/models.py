@@ -1,8 +1,12 @@
 from app.db import Base
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Text, Enum, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Boolean, Date, DateTime, ForeignKey, Text, Enum, Index, LargeBinary, event, func, text, update
+from sqlalchemy.orm import Session, deferred, relationship
+from datetime import datetime, timezone
 import enum, uuid
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 # ---- ENUMS ----
 class ArtifactKind(str, enum.Enum):
     audio = "audio"
@@ -14,20 +18,43 @@ class ActionStatus(str, enum.Enum):
     open    = "open"
     done    = "done"
 
+class OutputSource(str, enum.Enum):
+    auto   = "auto"    # generated by processing; replaced on a full refresh
+    manual = "manual"  # created or edited through the API; never touched by processing
+
+class JobStatus(str, enum.Enum):
+    queued    = "queued"
+    running   = "running"
+    succeeded = "succeeded"
+    failed    = "failed"
+
 # ---- TABLES ----
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        # Keyset pagination order for GET /meetings
+        Index("ix_meetings_created_at_id", "created_at", "id"),
+    )
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, nullable=False)
-    date = Column(Date)
-    created_by = Column(String)
+    date = Column(Date, index=True)
+    created_by = Column(String, index=True)
     created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, nullable=True)  # last write to the meeting or its outputs (see touch_meetings)
 
-    participants = relationship("Participant", back_populates="meeting", cascade="all,delete")
-    artifacts    = relationship("Artifact", back_populates="meeting", cascade="all,delete")
-    summaries    = relationship("Summary", back_populates="meeting", cascade="all,delete")
-    decisions    = relationship("Decision", back_populates="meeting", cascade="all,delete")
-    action_items = relationship("ActionItem", back_populates="meeting", cascade="all,delete")
+    participants = relationship("Participant", back_populates="meeting", cascade="all,delete", order_by="Participant.created_at")
+    artifacts    = relationship("Artifact", back_populates="meeting", cascade="all,delete", order_by="Artifact.created_at")
+    summaries    = relationship("Summary", back_populates="meeting", cascade="all,delete", order_by="Summary.created_at")
+    decisions    = relationship("Decision", back_populates="meeting", cascade="all,delete", order_by="Decision.created_at")
+    action_items = relationship("ActionItem", back_populates="meeting", cascade="all,delete", order_by="ActionItem.created_at")
+    transcript_chunks = relationship("TranscriptChunk", back_populates="meeting", cascade="all,delete")
+    jobs         = relationship("ProcessingJob", back_populates="meeting", cascade="all,delete")
+    transcript_index = relationship("TranscriptIndex", back_populates="meeting", cascade="all,delete", uselist=False)
+    semantic_chunks = relationship("SemanticChunk", back_populates="meeting", cascade="all,delete")
+    chat_sessions = relationship("ChatSession", back_populates="meeting", cascade="all,delete")
+    timeline = relationship("SpeakerTimeline", back_populates="meeting", cascade="all,delete", uselist=False)
+    timeline_entries = relationship("TimelineEntry", cascade="all,delete")
+    transcript = relationship("MeetingTranscript", back_populates="meeting", cascade="all,delete", uselist=False)
 
 class Participant(Base):
     __tablename__ = "participants"
@@ -37,6 +64,7 @@ class Participant(Base):
     role = Column(String)
     email = Column(String)
     avatar = Column(String, default="https://www.gravatar.com/avatar/?d=mp&s=200")
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())  # added by ALTER on older databases
 
     meeting = relationship("Meeting", back_populates="participants")
 
@@ -48,6 +76,9 @@ class Artifact(Base):
     url  = Column(String, nullable=True)
     transcript_text = Column(Text, nullable=True)
     file_path = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True, index=True)  # SHA-256 of the uploaded file
+    size_bytes = Column(Integer, nullable=True)
+    processed_at = Column(DateTime, nullable=True)  # when its transcript was last extracted into outputs
     created_at = Column(DateTime, server_default=func.now())
 
     meeting = relationship("Meeting", back_populates="artifacts")
@@ -57,6 +88,7 @@ class Summary(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     meeting_id = Column(ForeignKey("meetings.id"), index=True)
     text = Column(Text, nullable=False)
+    source = Column(Enum(OutputSource), nullable=True, default=OutputSource.auto)
     created_at = Column(DateTime, server_default=func.now())
 
     meeting = relationship("Meeting", back_populates="summaries")
@@ -66,6 +98,8 @@ class Decision(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     meeting_id = Column(ForeignKey("meetings.id"), index=True)
     text = Column(Text, nullable=False)
+    source = Column(Enum(OutputSource), nullable=True, default=OutputSource.auto)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())  # added by ALTER on older databases
 
     meeting = relationship("Meeting", back_populates="decisions")
 
@@ -77,5 +111,187 @@ class ActionItem(Base):
     task = Column(Text, nullable=False)
     due_date = Column(Date, nullable=True)
     status = Column(Enum(ActionStatus), default=ActionStatus.pending)
+    source = Column(Enum(OutputSource), nullable=True, default=OutputSource.auto)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())  # added by ALTER on older databases
 
     meeting = relationship("Meeting", back_populates="action_items")
+
+class TranscriptChunk(Base):
+    """Map-step output for one chunk of a long transcript, keyed by the chunk's content hash."""
+    __tablename__ = "transcript_chunks"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    meeting_id = Column(ForeignKey("meetings.id"), index=True)
+    chunk_hash = Column(String, nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    result_json = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    meeting = relationship("Meeting", back_populates="transcript_chunks")
+
+class ProcessingJob(Base):
+    """A durable /process request. Workers claim queued jobs by taking a time-limited lease."""
+    __tablename__ = "processing_jobs"
+    __table_args__ = (
+        # At most one queued/running job per meeting, so concurrent /process calls cannot both enqueue
+        Index(
+            "uq_processing_jobs_active_meeting", "meeting_id", unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    meeting_id = Column(ForeignKey("meetings.id"), index=True)
+    mode = Column(String, nullable=False)
+    full_refresh = Column(Boolean, nullable=True, default=False)  # rebuild all generated outputs
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.queued, index=True)
+    stage = Column(String, nullable=True)
+    progress = Column(Text, nullable=True)  # JSON: {"transcribe": "done", "extract": "running", ...}
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, server_default=func.now())
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    meeting = relationship("Meeting", back_populates="jobs")
+
+class UploadSession(Base):
+    """A resumable upload in progress; bytes live in uploads/.partial/<id> until completed."""
+    __tablename__ = "upload_sessions"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    meeting_id = Column(ForeignKey("meetings.id"), index=True)
+    kind = Column(Enum(ArtifactKind), nullable=False)
+    filename = Column(String, nullable=True)
+    received_bytes = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+
+class TranscriptMemo(Base):
+    """Transcript of an uploaded file, keyed by the file's SHA-256 and shared across meetings."""
+    __tablename__ = "transcript_memos"
+    content_hash = Column(String, primary_key=True)
+    kind = Column(Enum(ArtifactKind), nullable=False)
+    transcript_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+class TranscriptIndex(Base):
+    """Serialized BM25 sentence index of a meeting's transcript (see app/retrieval.py)."""
+    __tablename__ = "transcript_indexes"
+    meeting_id = Column(ForeignKey("meetings.id"), primary_key=True)
+    transcript_hash = Column(String, nullable=False)
+    index_json = Column(Text, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    meeting = relationship("Meeting", back_populates="transcript_index")
+
+class SemanticChunk(Base):
+    """A transcript chunk and its row in the semantic search vector file (see app/semantic.py)."""
+    __tablename__ = "semantic_chunks"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    meeting_id = Column(ForeignKey("meetings.id"), index=True)
+    row = Column(Integer, nullable=False, unique=True)
+    chunk_hash = Column(String, nullable=False)
+    position = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    meeting = relationship("Meeting", back_populates="semantic_chunks")
+
+class ChatSession(Base):
+    """A conversation about one meeting. Turns before ``summarized_turns`` are folded into ``history_summary``."""
+    __tablename__ = "chat_sessions"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    meeting_id = Column(ForeignKey("meetings.id"), index=True)
+    history_summary = Column(Text, nullable=True)
+    summarized_turns = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    meeting = relationship("Meeting", back_populates="chat_sessions")
+    turns = relationship("ChatTurn", back_populates="session", cascade="all,delete", order_by="ChatTurn.position")
+
+class ChatTurn(Base):
+    __tablename__ = "chat_turns"
+    __table_args__ = (
+        # Concurrent answers in one session cannot take the same position (app/chat.py retries)
+        Index("uq_chat_turns_session_position", "session_id", "position", unique=True),
+    )
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = Column(ForeignKey("chat_sessions.id"), nullable=False)
+    position = Column(Integer, nullable=False)
+    question = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    session = relationship("ChatSession", back_populates="turns")
+
+class SpeakerTimeline(Base):
+    """Per-speaker statistics of a meeting's parsed timeline (see app/timeline.py)."""
+    __tablename__ = "speaker_timelines"
+    meeting_id = Column(ForeignKey("meetings.id"), primary_key=True)
+    transcript_hash = Column(String, nullable=False)
+    entries = Column(Integer, nullable=False, default=0)
+    turns = Column(Integer, nullable=False, default=0)
+    speakers_json = Column(Text, nullable=False)  # JSON list of per-speaker stats, most talk time first
+    checked_at = Column(DateTime, nullable=False)  # last time the transcript was confirmed unchanged
+
+    meeting = relationship("Meeting", back_populates="timeline")
+
+class TimelineEntry(Base):
+    """One speaker line of a meeting's timeline; ``turn`` counts speaker changes up to it."""
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        Index("ix_timeline_entries_meeting_speaker_position", "meeting_id", "speaker", "position"),
+    )
+    meeting_id = Column(ForeignKey("meetings.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    turn = Column(Integer, nullable=False)
+    speaker = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    words = Column(Integer, nullable=False)
+
+class MeetingTranscript(Base):
+    """The meeting's canonical transcript, compressed (see app/transcripts.py)."""
+    __tablename__ = "meeting_transcripts"
+    meeting_id = Column(ForeignKey("meetings.id"), primary_key=True)
+    version = Column(Integer, nullable=False)  # bumped on every change; concurrent writers conflict on it
+    content_hash = Column(String, nullable=False)  # SHA-256 of the uncompressed text
+    codec = Column(String, nullable=False)  # "zstd" or "zlib"
+    data = deferred(Column(LargeBinary, nullable=False))  # loaded only when the text is not cached
+    chars = Column(Integer, nullable=False)
+    segment_hashes = Column(Text, nullable=False)  # JSON list of SHA-256 of each artifact transcript, in order
+    last_artifact_at = Column(DateTime, nullable=True)  # created_at and id of the last artifact included
+    last_artifact_id = Column(String, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    meeting = relationship("Meeting", back_populates="transcript")
+
+    __mapper_args__ = {"version_id_col": version}
+
+# ---- Change tracking ----
+# Rows whose changes show up in GET /meetings/{mid}/bundle; any write bumps Meeting.updated_at,
+# which the bundle uses as its ETag.
+BUNDLED_MODELS = (Participant, Artifact, Summary, Decision, ActionItem)
+
+def touch_meetings(session: Session, meeting_ids) -> None:
+    """Mark meetings as changed. Needed after bulk statements, which bypass the ORM flush hook."""
+    ids = {mid for mid in meeting_ids if mid}
+    if ids:
+        session.execute(
+            update(Meeting).where(Meeting.id.in_(ids))
+            .values(updated_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+@event.listens_for(Session, "before_flush")
+def _touch_changed_meetings(session, flush_context, instances):
+    now = utcnow()
+    ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Meeting):
+            if obj not in session.deleted:
+                obj.updated_at = now
+        elif isinstance(obj, BUNDLED_MODELS):
+            ids.add(obj.meeting_id)
+    touch_meetings(session, ids)
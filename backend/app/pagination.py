@@ -0,0 +1,98 @@
+# app/pagination.py
+# Keyset pagination and field projection for list endpoints.
+#
+# Pages are ordered by (created_at, tiebreaker) and the cursor is the last row's pair, so a page
+# costs an index range scan no matter how deep it is. Rows created before a table had created_at
+# (NULL) sort before all others when ascending and after them when descending.
+#
+# SQLite timestamps have one-second resolution, and ids are random UUIDs, so on SQLite the
+# tiebreaker is the rowid, which follows insertion order. Other databases store microseconds
+# and break the remaining ties by id.
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import String, and_, literal, literal_column, or_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# How SQLite stores CURRENT_TIMESTAMP server defaults. SQLAlchemy binds datetimes with
+# microseconds, which would never compare equal to these strings.
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def encode_cursor(created_at: datetime | None, tiebreaker: int | str) -> str:
+    payload = json.dumps([created_at.isoformat() if created_at else None, tiebreaker])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int | str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, tiebreaker = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(tiebreaker, (int, str)) or isinstance(tiebreaker, bool):
+            raise TypeError(tiebreaker)
+        return (datetime.fromisoformat(created_at) if created_at else None), tiebreaker
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def _is_sqlite(query: Query) -> bool:
+    return query.session.get_bind().dialect.name == "sqlite"
+
+def _time_param(query: Query, value: datetime):
+    if _is_sqlite(query):
+        return literal(value.strftime(SQLITE_TIMESTAMP_FORMAT), String)
+    return value
+
+def keyset_page(query: Query, model, cursor: str | None, limit: int, descending: bool = False) -> tuple[list, str | None]:
+    """One page of ``query`` ordered by (created_at, tiebreaker); returns ``(rows, next_cursor)``."""
+    created = model.created_at
+    sqlite = _is_sqlite(query)
+    row_id = literal_column(f"{model.__tablename__}.rowid") if sqlite else model.id
+    if sqlite:
+        query = query.add_columns(row_id)
+    if cursor:
+        after_at, after_id = decode_cursor(cursor)
+        if not isinstance(after_id, int if sqlite else str):
+            raise ValueError("Invalid cursor")
+        if after_at is None:
+            # Still inside the NULL created_at group
+            same_group = and_(created.is_(None), row_id < after_id if descending else row_id > after_id)
+            query = query.filter(same_group if descending else or_(same_group, created.isnot(None)))
+        else:
+            at = _time_param(query, after_at)
+            if descending:
+                query = query.filter(or_(created < at, and_(created == at, row_id < after_id), created.is_(None)))
+            else:
+                query = query.filter(or_(created > at, and_(created == at, row_id > after_id)))
+    if descending:
+        query = query.order_by(created.desc().nulls_last(), row_id.desc())
+    else:
+        query = query.order_by(created.asc().nulls_first(), row_id.asc())
+    rows = query.limit(limit + 1).all()
+    if sqlite:
+        keys = [key for _, key in rows]
+        rows = [row for row, _ in rows]
+    else:
+        keys = [row.id for row in rows]
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor(rows[limit - 1].created_at, keys[limit - 1])
+
+def projection(schema, fields: str | None, default_exclude: tuple[str, ...] = ()) -> list[str] | None:
+    """Fields of ``schema`` to return: the comma-separated ``fields``, or all but ``default_exclude``.
+
+    None means the full schema. ``fields=*`` asks for every field explicitly.
+    """
+    names = list(schema.model_fields)
+    if fields is None or fields.strip() == "*":
+        if fields is None and default_exclude:
+            return [n for n in names if n not in default_exclude]
+        return None
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in names]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; available: {', '.join(names)}")
+    if "id" not in wanted:
+        wanted.insert(0, "id")
+    return wanted
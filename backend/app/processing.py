@@ -0,0 +1,265 @@
+# app/processing.py
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import models, tts
+from app.db import SessionLocal
+from app.artifacts import ensure_content_hash, lookup_transcripts, remember_transcript
+from app.transcripts import meeting_artifacts, join_transcripts, rebuild_transcript
+from app.retrieval import get_index
+from app.schemas import ExtractionMode
+from app.metrics import PROCESSING_STAGE_SECONDS, timed_stages
+from app.llm import (
+    generate_summary, generate_decisions, generate_action_items, extract_meeting_outputs,
+    transcribe_audio, analyze_image, merge_summaries, is_failed_transcript,
+    deduplicate_transcript, MAX_TRANSCRIPT_CHARS,
+)
+from app.mapreduce import map_reduce_extract, match_existing
+from app.semantic import index_meeting
+from app.timeline import build_timeline
+
+logger = logging.getLogger(__name__)
+
+# Default extraction path; override per request with ?mode=single|multi
+DEFAULT_EXTRACTION_MODE = ExtractionMode(os.getenv("EXTRACTION_MODE", ExtractionMode.single.value))
+
+# Artifact transcription fan-out: at most TRANSCRIBE_CONCURRENCY uploads per meeting,
+# and TRANSCRIBE_GLOBAL_CONCURRENCY across all meetings processed by this process
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+TRANSCRIBE_GLOBAL_CONCURRENCY = int(os.getenv("TRANSCRIBE_GLOBAL_CONCURRENCY", "8"))
+_transcribe_slots = threading.BoundedSemaphore(TRANSCRIBE_GLOBAL_CONCURRENCY)
+
+# Pipeline stages reported through the progress callback, in order
+STAGES = ("transcribe", "extract", "persist")
+
+ProgressCallback = Callable[[str, str], None]
+
+def _no_progress(stage: str, state: str) -> None:
+    pass
+
+def _needs_transcript(a: models.Artifact) -> bool:
+    """No transcript yet, or only the placeholder of a failed attempt (retried on the next run)."""
+    return not a.transcript_text or is_failed_transcript(a.transcript_text)
+
+def _transcribe_artifact(mid: str, artifact_id: str, kind: models.ArtifactKind, file_path: str, content_hash: str | None) -> str:
+    with _transcribe_slots:
+        if kind == models.ArtifactKind.audio:
+            text = transcribe_audio(file_path, mid)
+        else:
+            text = analyze_image(file_path, mid)
+    # Commit right away so finished artifacts survive a crash later in the run
+    with SessionLocal() as db:
+        db.execute(update(models.Artifact).where(models.Artifact.id == artifact_id).values(transcript_text=text))
+        models.touch_meetings(db, [mid])  # a Core update skips the flush hook
+        db.commit()
+        try:
+            remember_transcript(db, content_hash, kind, text)
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # another worker stored this file's transcript first
+    return text
+
+def transcribe_artifacts(db: Session, mid: str, artifacts: list[models.Artifact]) -> None:
+    """Transcribe audio/image artifacts that have no transcript yet, concurrently.
+
+    Files whose content hash already has a transcript reuse it without calling the LLM.
+    Artifacts whose last attempt failed are tried again.
+    """
+    pending = [
+        a for a in artifacts
+        if _needs_transcript(a) and a.file_path
+        and a.kind in (models.ArtifactKind.audio, models.ArtifactKind.image)
+    ]
+    if not pending:
+        return
+
+    known = lookup_transcripts(db, {h for a in pending if (h := ensure_content_hash(a))})
+    for a in pending:
+        if a.content_hash in known:
+            a.transcript_text = known[a.content_hash]
+    db.commit()
+    if known:
+        logger.info(f"Reused {sum(1 for a in pending if a.content_hash in known)} known transcripts for meeting {mid}")
+    pending = [a for a in pending if _needs_transcript(a)]
+    if not pending:
+        return
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(TRANSCRIBE_CONCURRENCY, len(pending))) as pool:
+        futures = {pool.submit(_transcribe_artifact, mid, a.id, a.kind, a.file_path, a.content_hash): a for a in pending}
+        for future in as_completed(futures):
+            # Already committed by the worker; only refresh the in-memory copy
+            set_committed_value(futures[future], "transcript_text", future.result())
+    logger.info(f"Transcribed {len(pending)} artifacts for meeting {mid} in {time.perf_counter() - started:.2f}s")
+
+def extract_outputs(db: Session, mid: str, transcript: str, participant_names: list[str],
+                    mode: ExtractionMode, prune: bool = True) -> dict:
+    """Summary, decisions and action items for ``transcript`` using the cheapest strategy that fits."""
+    started = time.perf_counter()
+    strategy = mode.value
+    if len(deduplicate_transcript(transcript)) > MAX_TRANSCRIPT_CHARS:
+        # Too long for one prompt: map over chunks instead of truncating
+        outputs = map_reduce_extract(db, mid, transcript, participant_names, prune=prune)
+        strategy = "map-reduce"
+    elif mode == ExtractionMode.single:
+        outputs = extract_meeting_outputs(transcript, participant_names, mid)
+    else:
+        outputs = {
+            "summary": generate_summary(transcript, mid),
+            "decisions": generate_decisions(transcript, mid),
+            "action_items": generate_action_items(transcript, participant_names, mid),
+        }
+    logger.info(f"Extraction ({strategy}) for meeting {mid} took {time.perf_counter() - started:.2f}s")
+    return outputs
+
+def _generated(query, model):
+    """Rows written by processing; rows from before sources were tracked count as generated."""
+    return query.filter(or_(model.source.is_(None), model.source == models.OutputSource.auto))
+
+def merge_outputs(db: Session, mid: str, outputs: dict, incremental: bool) -> str:
+    """Add extracted outputs to the meeting without duplicating what it already has. Caller commits.
+
+    Incremental runs fold the new partial summary into the existing generated one; otherwise a
+    new summary is added. Decisions and action items that near-duplicate an existing row
+    (manual or generated) are skipped; a duplicate of a generated action item fills in its
+    missing owner or due date. Returns the meeting's generated summary text.
+    """
+    summary = None
+    if incremental:
+        summary = _generated(db.query(models.Summary).filter_by(meeting_id=mid), models.Summary) \
+            .order_by(models.Summary.created_at.desc()).first()
+    if summary is not None:
+        summary.text = merge_summaries([summary.text, outputs["summary"]], mid)
+    else:
+        summary = models.Summary(meeting_id=mid, text=outputs["summary"], source=models.OutputSource.auto)
+        db.add(summary)
+
+    decisions = db.query(models.Decision).filter_by(meeting_id=mid).all()
+    for text, dup in zip(outputs["decisions"], match_existing([d.text for d in decisions], outputs["decisions"])):
+        if dup is None:
+            db.add(models.Decision(meeting_id=mid, text=text, source=models.OutputSource.auto))
+
+    actions = db.query(models.ActionItem).filter_by(meeting_id=mid).all()
+    tasks = [a["task"] for a in outputs["action_items"]]
+    for a, dup in zip(outputs["action_items"], match_existing([row.task for row in actions], tasks)):
+        if dup is None:
+            db.add(models.ActionItem(
+                meeting_id=mid,
+                task=a['task'],
+                owner=a['owner'],
+                due_date=a['due_date'],
+                status=models.ActionStatus.pending,
+                source=models.OutputSource.auto,
+            ))
+        elif dup < len(actions) and actions[dup].source != models.OutputSource.manual:
+            existing = actions[dup]
+            if existing.owner in (None, "", "Unassigned") and a.get("owner"):
+                existing.owner = a["owner"]
+            if not existing.due_date and a.get("due_date"):
+                existing.due_date = a["due_date"]
+    return summary.text
+
+def real_processing(mid: str, db: Session, mode: ExtractionMode = ExtractionMode.single,
+                    progress: ProgressCallback = _no_progress, refresh: bool = False):
+    """Transcribe a meeting's artifacts and bring its summary, decisions and action items up to date.
+
+    Only artifacts not yet processed are extracted, and the results are merged into the existing
+    outputs. The first run, and any run with ``refresh=True``, rebuilds the generated outputs from
+    the whole transcript instead. Outputs created or edited through the API are always kept.
+
+    ``progress(stage, state)`` is called as each stage in STAGES starts ("running") and ends ("done").
+    """
+    meeting = db.get(models.Meeting, mid)
+    if not meeting:
+        logger.error(f"Meeting {mid} not found during processing")
+        return
+
+    progress = timed_stages(progress)
+    progress("transcribe", "running")
+    artifacts = meeting_artifacts(db, mid)
+
+    # Transcribe non-text artifacts
+    transcribe_artifacts(db, mid, artifacts)
+    progress("transcribe", "done")
+
+    # Bring the stored transcript up to date with this run's transcriptions
+    transcript = rebuild_transcript(db, mid, artifacts)
+    has_transcript = bool(transcript.strip())
+    if has_transcript:
+        get_index(db, mid, transcript)  # warm the chat retrieval index for this transcript version
+    else:
+        logger.warning(f"No valid transcript for meeting {mid}")
+        transcript = "No valid transcript available."
+
+    # Failed transcriptions are neither extracted nor marked processed, so they are picked up once
+    # a later run transcribes them
+    usable = [a for a in artifacts if not a.transcript_text or not is_failed_transcript(a.transcript_text)]
+    if len(usable) < len(artifacts):
+        logger.warning(f"Skipping {len(artifacts) - len(usable)} failed transcriptions for meeting {mid}")
+    processed = [a for a in usable if a.processed_at]
+    incremental = bool(processed) and not refresh
+    if incremental:
+        # Only content not already covered by processed artifacts
+        known = {a.transcript_text for a in processed}
+        new_content = join_transcripts([a for a in usable if not a.processed_at and a.transcript_text not in known])
+    elif len(usable) < len(artifacts):
+        new_content = join_transcripts(usable)
+    else:
+        new_content = transcript
+
+    logger.info(f"Processing transcript for meeting {mid} (length: {len(transcript)} chars)")
+
+    # Get participants for assignment
+    participants = db.query(models.Participant).filter_by(meeting_id=mid).all()
+    participant_names = [p.name for p in participants if p.name]
+
+    progress("extract", "running")
+    outputs = None
+    if new_content.strip():
+        outputs = extract_outputs(db, mid, new_content, participant_names, mode, prune=not incremental)
+    else:
+        logger.info(f"No new content for meeting {mid}; outputs are up to date")
+    progress("extract", "done")
+
+    # Apply all output changes in one transaction, so a failed extraction never leaves the meeting
+    # without outputs
+    progress("persist", "running")
+    summary_text = None
+    if outputs is not None:
+        if not incremental:
+            # Full rebuild: replace everything processing generated, keep manual rows
+            for model in (models.Summary, models.Decision, models.ActionItem):
+                _generated(db.query(model).filter_by(meeting_id=mid), model).delete(synchronize_session=False)
+        summary_text = merge_outputs(db, mid, outputs, incremental)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for a in usable:
+        a.processed_at = now
+    db.commit()
+    progress("persist", "done")
+    if summary_text is not None:
+        tts.prerender_summary(summary_text)
+
+    if has_transcript:
+        try:
+            with PROCESSING_STAGE_SECONDS.labels("timeline").time():
+                build_timeline(db, mid, transcript)
+        except Exception:
+            db.rollback()
+            logger.exception(f"Timeline build failed for meeting {mid}")
+        try:
+            with PROCESSING_STAGE_SECONDS.labels("semantic_index").time():
+                index_meeting(db, mid, transcript)
+        except Exception:
+            # Search freshness is not worth failing (and retrying) the whole job
+            db.rollback()
+            logger.exception(f"Semantic indexing failed for meeting {mid}")
+    logger.info(f"Processing completed for meeting {mid} ({'incremental' if incremental else 'full'})")
@@ -0,0 +1,253 @@
+# app/rate_limit.py
+# Shared limiter in front of every model call (app/llm.py, app/services/llm_processing.py).
+#
+# Two token buckets hold calls to the provider quota: requests per minute (LLM_RPM) and estimated
+# tokens per minute (LLM_TPM). Each bucket holds LLM_BURST_SECONDS worth of quota and refills at
+# the rest of it, so a burst starts at once, calls then run at the remaining rate, and no 60-second
+# window ever spends more than the quota.
+#
+# Concurrency is adaptive (AIMD): a success raises the limit by 1/limit, and a 429 halves it and
+# empties both buckets, so callers back off together. Other errors and cancelled streams leave it alone.
+# Waiting calls are served by priority, so interactive chat goes ahead of batch processing.
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LLM_RATE_LIMIT_ENABLED = os.getenv("LLM_RATE_LIMIT_ENABLED", "1") not in ("0", "false", "False")
+LLM_RPM = float(os.getenv("LLM_RPM", "60"))
+LLM_TPM = float(os.getenv("LLM_TPM", "1000000"))
+LLM_BURST_SECONDS = float(os.getenv("LLM_BURST_SECONDS", "5"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "2"))
+# Token estimates for a call before the response reports its real usage
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "1024"))
+LLM_FILE_TOKEN_ESTIMATE = int(os.getenv("LLM_FILE_TOKEN_ESTIMATE", "4096"))
+
+INTERACTIVE = 0
+BATCH = 1
+LANES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+def is_rate_limited(exc: Exception) -> bool:
+    """True for quota errors (ResourceExhausted / TooManyRequests, HTTP 429)."""
+    return getattr(exc, "code", None) == 429
+
+def estimate_tokens(contents) -> int:
+    """Rough token count of a request: ~4 characters per token, a flat estimate per uploaded file."""
+    parts = contents if isinstance(contents, list) else [contents]
+    tokens = LLM_OUTPUT_TOKEN_ESTIMATE
+    for part in parts:
+        tokens += len(part) // 4 if isinstance(part, str) else LLM_FILE_TOKEN_ESTIMATE
+    return tokens
+
+def response_tokens(response) -> int | None:
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None)
+    return total if isinstance(total, int) and total > 0 else None
+
+class TokenBucket:
+    """Refills at ``per_window / window`` per second up to ``capacity``. The level may go negative
+    when a call turns out to cost more than estimated; later calls then wait off the debt."""
+
+    def __init__(self, per_window: float, capacity: float, window: float = 60.0):
+        self.rate = per_window / window
+        self.capacity = max(1.0, capacity)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def cost(self, amount: float) -> float:
+        # A call larger than the bucket still runs once the bucket is full
+        return min(amount, self.capacity)
+
+    def wait_time(self, amount: float) -> float:
+        missing = self.cost(amount) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+@dataclass
+class Ticket:
+    tokens: int
+    priority: int
+    queued_at: float
+
+class LLMRateLimiter:
+    """``rpm`` and ``tpm`` are the quota per ``window`` seconds (a minute, except in benchmarks)."""
+
+    def __init__(self, rpm: float, tpm: float, burst_seconds: float, max_concurrency: int, min_concurrency: int,
+                 window: float = 60.0):
+        burst = min(max(burst_seconds / window, 0.0), 0.5)
+        self.requests = TokenBucket(rpm * (1 - burst), rpm * burst, window)
+        self.tokens = TokenBucket(tpm * (1 - burst), tpm * burst, window)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._waiting: list[tuple[int, int]] = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._counters = {"calls": 0, "throttled": 0, "retries": 0, "failed": 0, "wait_seconds": 0.0}
+
+    def acquire(self, tokens: int, priority: int = BATCH) -> Ticket:
+        """Block until the call may start: it is first in line, a concurrency slot is free and
+        both buckets can pay for it."""
+        entry = (priority, next(self._seq))
+        queued_at = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                timeout = None
+                if self._waiting[0] == entry and self.in_flight < int(self.limit):
+                    timeout = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if timeout == 0:
+                        heapq.heappop(self._waiting)
+                        self.requests.level -= 1
+                        self.tokens.level -= self.tokens.cost(tokens)
+                        self.in_flight += 1
+                        self._counters["calls"] += 1
+                        self._counters["wait_seconds"] += now - queued_at
+                        # The next in line may be able to start as well
+                        self._cond.notify_all()
+                        return Ticket(tokens, priority, queued_at)
+                self._cond.wait(timeout)
+
+    def release(self, ticket: Ticket, actual_tokens: int | None = None, throttled: bool = False,
+                failed: bool = False, cancelled: bool = False) -> None:
+        """End a call. Only a success raises the concurrency limit; a failure other than a quota
+        error (``failed``) or a stream the consumer closed early (``cancelled``) says nothing
+        about the quota and leaves it unchanged."""
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+                self.requests.level = min(self.requests.level, 0.0)
+                self.tokens.level = min(self.tokens.level, 0.0)
+                self._counters["throttled"] += 1
+            elif not (failed or cancelled):
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                if actual_tokens is not None:
+                    self.tokens.level -= actual_tokens - self.tokens.cost(ticket.tokens)
+            self._cond.notify_all()
+
+    def call(self, fn, tokens: int, priority: int = BATCH, label: str = "llm"):
+        """Run ``fn()`` under the limiter, retrying quota errors with exponential backoff.
+
+        The last quota error is re-raised once LLM_MAX_RETRIES is exhausted.
+        """
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            ticket = self.acquire(tokens, priority)
+            try:
+                response = fn()
+            except Exception as e:
+                if self._should_retry(ticket, e, attempt, label):
+                    continue
+                raise
+            self.release(ticket, response_tokens(response))
+            return response
+
+    def stream(self, fn, tokens: int, priority: int = BATCH, label: str = "llm"):
+        """Like ``call`` for streaming responses: ``fn()`` returns an iterator of chunks, and the
+        concurrency slot is held until it is exhausted or the consumer closes this generator.
+
+        Quota errors are only retried before the first chunk; after that the caller has seen output.
+        """
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            ticket = self.acquire(tokens, priority)
+            try:
+                chunks = iter(fn())
+                chunk = next(chunks, None)
+            except Exception as e:
+                if self._should_retry(ticket, e, attempt, label):
+                    continue
+                raise
+            used, throttled, failed, cancelled = None, False, False, False
+            try:
+                while chunk is not None:
+                    yield chunk
+                    used = response_tokens(chunk) or used
+                    chunk = next(chunks, None)
+            except GeneratorExit:
+                cancelled = True  # e.g. the client disconnected
+                raise
+            except Exception as e:
+                throttled = is_rate_limited(e)
+                failed = not throttled
+                with self._cond:
+                    self._counters["failed"] += 1
+                raise
+            finally:
+                # Closing the provider stream stops generation the consumer no longer reads
+                close = getattr(chunks, "close", None)
+                if close is not None:
+                    close()
+                self.release(ticket, used, throttled, failed, cancelled)
+            return
+
+    def _should_retry(self, ticket: Ticket, exc: Exception, attempt: int, label: str) -> bool:
+        """Release ``ticket`` after a failed call; sleep and return True if it should be retried."""
+        throttled = is_rate_limited(exc)
+        self.release(ticket, throttled=throttled, failed=not throttled)
+        if not throttled or attempt == LLM_MAX_RETRIES:
+            with self._cond:
+                self._counters["failed"] += 1
+            return False
+        delay = LLM_RETRY_BASE_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.0)
+        logger.warning(f"{label}: quota exceeded, retrying in {delay:.1f}s "
+                       f"(attempt {attempt + 1}/{LLM_MAX_RETRIES}, concurrency limit {int(self.limit)})")
+        with self._cond:
+            self._counters["retries"] += 1
+        time.sleep(delay)
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            depth = {name: 0 for name in LANES.values()}
+            for priority, _ in self._waiting:
+                depth[LANES[priority]] += 1
+            return {
+                **self._counters,
+                "wait_seconds": round(self._counters["wait_seconds"], 3),
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiting),
+                "queue_depth_by_lane": depth,
+                "requests_available": round(self.requests.level, 2),
+                "tokens_available": round(self.tokens.level),
+            }
+
+class NullRateLimiter:
+    """Stand-in used when LLM_RATE_LIMIT_ENABLED=0."""
+
+    def call(self, fn, tokens: int, priority: int = BATCH, label: str = "llm"):
+        return fn()
+
+    def stream(self, fn, tokens: int, priority: int = BATCH, label: str = "llm"):
+        yield from fn()
+
+    def stats(self) -> dict:
+        return {"enabled": False}
+
+rate_limiter = (
+    LLMRateLimiter(LLM_RPM, LLM_TPM, LLM_BURST_SECONDS, LLM_MAX_CONCURRENCY, LLM_MIN_CONCURRENCY)
+    if LLM_RATE_LIMIT_ENABLED else NullRateLimiter()
+)
@@ -0,0 +1,133 @@
+# app/retrieval.py
+# Per-meeting BM25 sentence index for chat retrieval.
+#
+# The index is built once per transcript version (keyed by the transcript's SHA-256), stored in
+# the transcript_indexes table and kept hot in an in-process LRU. A question then costs one
+# BM25 pass over the postings of its terms instead of re-tokenizing the whole transcript.
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+CHAT_TOP_K = int(os.getenv("CHAT_TOP_K", "6"))
+INDEX_CACHE_ENTRIES = int(os.getenv("RETRIEVAL_INDEX_CACHE_ENTRIES", "64"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Expect transcript lines like "Parthavi Kurugundla (Chair): Welcome everyone..."
+SPEAKER_LINE_REGEX = re.compile(r"^\s*(?P<speaker>[A-Za-z .'-]+)\s*(?:\([^\)]*\))?\s*:\s*(?P<text>.+)$")
+SENTENCE_SPLIT_REGEX = re.compile(r"(?<=[.?!])\s+")
+TOKEN_REGEX = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by did do does for from had has have how i in is it its of on or "
+    "so that the their them there they this to was we were what when where which who why will with you".split()
+)
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_REGEX.findall(text.lower()) if t not in STOPWORDS]
+
+def transcript_hash(transcript: str) -> str:
+    return hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+
+def build_index(transcript: str) -> dict:
+    """Split a transcript into sentences (with speaker and char offset) and compute BM25 statistics."""
+    sentences, lengths = [], []
+    postings: dict[str, list[list[int]]] = {}
+    offset = 0
+    for line in transcript.split("\n"):
+        m = SPEAKER_LINE_REGEX.match(line)
+        speaker, body = (m.group("speaker").strip(), m.group("text")) if m else (None, line)
+        body_start = offset + (line.index(body) if m else 0)
+        cursor = 0
+        for sentence in SENTENCE_SPLIT_REGEX.split(body):
+            start = body.find(sentence, cursor)
+            cursor = start + len(sentence)
+            if not sentence.strip():
+                continue
+            tokens = tokenize(sentence)
+            idx = len(sentences)
+            sentences.append({"text": sentence.strip(), "speaker": speaker, "offset": body_start + start})
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append([idx, tf])
+        offset += len(line) + 1
+    return {
+        "sentences": sentences,
+        "lengths": lengths,
+        "avgdl": (sum(lengths) / len(lengths)) if lengths else 0.0,
+        "postings": postings,
+    }
+
+def search(index: dict, query: str, k: int = CHAT_TOP_K) -> list[dict]:
+    """Top-k sentences for ``query`` by BM25, best first."""
+    n = len(index["sentences"])
+    if not n:
+        return []
+    lengths, avgdl = index["lengths"], index["avgdl"] or 1.0
+    scores: dict[int, float] = {}
+    for term in set(tokenize(query)):
+        plist = index["postings"].get(term)
+        if not plist:
+            continue
+        idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+        for idx, tf in plist:
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[idx] / avgdl)
+            scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+    best = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+    return [{**index["sentences"][idx], "score": round(score, 4)} for idx, score in best]
+
+def format_passage(passage: dict) -> str:
+    return f"{passage['speaker']}: {passage['text']}" if passage.get("speaker") else passage["text"]
+
+_cache: OrderedDict[tuple[str, str], dict] = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _remember(key: tuple[str, str], index: dict) -> dict:
+    with _cache_lock:
+        _cache[key] = index
+        _cache.move_to_end(key)
+        while len(_cache) > INDEX_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return index
+
+def get_index(db: Session, mid: str, transcript: str) -> dict:
+    """The meeting's index for this transcript version: memory, then database, else built and stored."""
+    key = (mid, transcript_hash(transcript))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    row = db.get(models.TranscriptIndex, mid)
+    if row is not None and row.transcript_hash == key[1]:
+        return _remember(key, json.loads(row.index_json))
+
+    index = build_index(transcript)
+    if row is None:
+        row = models.TranscriptIndex(meeting_id=mid)
+        db.add(row)
+    row.transcript_hash = key[1]
+    row.index_json = json.dumps(index, separators=(",", ":"))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # a concurrent request stored it first; ours is equivalent
+    logger.info(f"Built retrieval index for meeting {mid}: {len(index['sentences'])} sentences")
+    return _remember(key, index)
+
+def retrieve(mid: str, transcript: str, question: str, k: int = CHAT_TOP_K) -> list[dict]:
+    """Top-k passages for a question, with its own session; safe to run in a worker thread."""
+    with SessionLocal() as db:
+        return search(get_index(db, mid, transcript), question, k)
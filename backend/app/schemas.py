@@ -1,6 +1,8 @@
-from datetime import date
+from datetime import date, datetime
+import enum
+import json
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 
 # ---- Meetings ----
 class MeetingCreate(BaseModel):
@@ -11,11 +13,11 @@ class MeetingCreate(BaseModel):
 class MeetingOut(MeetingCreate):
     id: str
 
-    class Config:
-        from_attributes = True  # Updated from orm_mode
+    model_config = ConfigDict(from_attributes=True)
 
 # ---- Participants ----
 class ParticipantCreate(BaseModel):
+    id: Optional[str] = None  # an existing participant's id updates it instead of adding one
     name: str
     role: Optional[str] = None
     email: Optional[str] = None
@@ -24,8 +26,7 @@ class ParticipantCreate(BaseModel):
 class ParticipantOut(ParticipantCreate):
     id: str
 
-    class Config:
-        from_attributes = True  # Updated from orm_mode
+    model_config = ConfigDict(from_attributes=True)
 
 # ---- Artifacts ----
 class ArtifactTextIn(BaseModel):
@@ -38,9 +39,24 @@ class ArtifactOut(BaseModel):
     url: Optional[str] = None
     transcript_text: Optional[str] = None
     file_path: Optional[str] = None
+    content_hash: Optional[str] = None
+    size_bytes: Optional[int] = None
+    processed_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True  # Updated from orm_mode
+    model_config = ConfigDict(from_attributes=True)
+
+class UploadSessionIn(BaseModel):
+    kind: str  # "audio" or "image"
+    filename: Optional[str] = None
+
+class UploadSessionOut(BaseModel):
+    id: str
+    meeting_id: str
+    kind: str
+    filename: Optional[str] = None
+    received_bytes: int
+
+    model_config = ConfigDict(from_attributes=True)
 
 # ---- Summaries ----
 class SummaryIn(BaseModel):
@@ -49,23 +65,25 @@ class SummaryIn(BaseModel):
 class SummaryOut(SummaryIn):
     id: str
     meeting_id: str
+    source: Optional[str] = None
 
-    class Config:
-        from_attributes = True  # Updated from orm_mode
+    model_config = ConfigDict(from_attributes=True)
 
 # ---- Decisions ----
 class DecisionIn(BaseModel):
+    id: Optional[str] = None  # an existing decision's id updates it instead of adding one
     text: str
 
 class DecisionOut(DecisionIn):
     id: str
     meeting_id: str
+    source: Optional[str] = None
 
-    class Config:
-        from_attributes = True  # Updated from orm_mode
+    model_config = ConfigDict(from_attributes=True)
 
 # ---- Action Items ----
 class ActionItemIn(BaseModel):
+    id: Optional[str] = None  # an existing action item's id updates it instead of adding one
     task: str
     owner: Optional[str] = None
     due_date: Optional[date] = None
@@ -74,6 +92,90 @@ class ActionItemOut(ActionItemIn):
     id: str
     meeting_id: str
     status: Optional[str] = None  # Added to match ActionItem model
+    source: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ActionItemUpdate(BaseModel):
+    task: Optional[str] = None
+    owner: Optional[str] = None
+    due_date: Optional[date] = None
+    status: Optional[str] = None
+
+# ---- LLM extraction ----
+class ExtractionMode(str, enum.Enum):
+    single = "single"  # one combined JSON call for summary, decisions and action items
+    multi  = "multi"   # legacy path: one call per output
+
+class ExtractedActionItem(BaseModel):
+    task: str
+    owner: Optional[str] = None
+    due_date: Optional[str] = None
+    dependencies: list[int] = []
+
+# ---- Processing jobs ----
+class JobOut(BaseModel):
+    id: str
+    meeting_id: str
+    mode: str
+    full_refresh: Optional[bool] = False
+    status: str
+    stage: Optional[str] = None
+    progress: dict[str, str] = {}
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @field_validator("progress", mode="before")
+    @classmethod
+    def parse_progress(cls, v):
+        return json.loads(v) if isinstance(v, str) else (v or {})
+
+    model_config = ConfigDict(from_attributes=True)
+
+# ---- Chat sessions ----
+class ChatTurnOut(BaseModel):
+    position: int
+    question: str
+    answer: str
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ChatSessionOut(BaseModel):
+    id: str
+    meeting_id: str
+    history_summary: Optional[str] = None
+    summarized_turns: int = 0
+    created_at: Optional[datetime] = None
+    turns: list[ChatTurnOut] = []
+
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        from_attributes = True  # Updated from orm_mode
+# ---- Search ----
+class SemanticHit(BaseModel):
+    meeting_id: str
+    title: str
+    date: Optional[date]
+    score: float
+    text: str
+
+class SearchHit(BaseModel):
+    kind: str  # "transcript", "summary", "decision" or "action_item"
+    id: str
+    meeting_id: str
+    snippet: str  # matched terms wrapped in <mark>...</mark>
+    score: float
+
+# ---- Bundle ----
+class MeetingBundle(MeetingOut):
+    """A meeting with everything the results page shows, from GET /meetings/{mid}/bundle."""
+    updated_at: Optional[datetime] = None
+    participants: list[ParticipantOut] = []
+    artifacts: list[ArtifactOut] = []
+    summaries: list[SummaryOut] = []
+    decisions: list[DecisionOut] = []
+    action_items: list[ActionItemOut] = []
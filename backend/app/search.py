@@ -0,0 +1,138 @@
+# app/search.py
+# Full-text search over transcripts, summaries, decisions and action items.
+#
+# SQLite: one FTS5 index per source table, in external-content mode (the text stays in the source
+# table, the index holds only postings) and kept in sync by AFTER INSERT/UPDATE/DELETE triggers,
+# so bulk statements that bypass the ORM are indexed too. Rows are matched by rowid; VACUUM can
+# renumber rowids of these tables, so run `python -m app.search --rebuild` after one.
+#
+# PostgreSQL: a GIN index on to_tsvector() of each column; PostgreSQL maintains it itself.
+import argparse
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db import IS_SQLITE, engine
+
+logger = logging.getLogger(__name__)
+
+# kind -> (table, text column)
+SOURCES = {
+    "transcript": ("artifacts", "transcript_text"),
+    "summary": ("summaries", "text"),
+    "decision": ("decisions", "text"),
+    "action_item": ("action_items", "task"),
+}
+
+FTS_TOKENIZER = "porter unicode61 remove_diacritics 2"
+TS_CONFIG = "english"
+HIGHLIGHT_START, HIGHLIGHT_END = "<mark>", "</mark>"
+SNIPPET_TOKENS = 16
+
+QUERY_TERM_REGEX = re.compile(r"\w+\*?")
+
+def _sqlite_ddl(table: str, column: str) -> list[str]:
+    fts = f"{table}_fts"
+    insert = f"INSERT INTO {fts}(rowid, {column}) VALUES (new.rowid, new.{column})"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.rowid, old.{column})"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{table}', content_rowid='rowid', tokenize='{FTS_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN {delete}; {insert}; END",
+    ]
+
+def _tsvector(column: str) -> str:
+    # Must match the indexed expression exactly for PostgreSQL to use the index
+    return f"to_tsvector('{TS_CONFIG}', coalesce({column}, ''))"
+
+def ensure_search_index() -> None:
+    """Create the search indexes and triggers if missing; a new SQLite index is filled from existing rows."""
+    with engine.begin() as conn:
+        for table, column in SOURCES.values():
+            if IS_SQLITE:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": f"{table}_fts"},
+                ).first()
+                for statement in _sqlite_ddl(table, column):
+                    conn.execute(text(statement))
+                if not exists:
+                    conn.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+                    logger.info(f"Built full-text index {table}_fts")
+            else:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_fts ON {table} USING GIN ({_tsvector(column)})"))
+
+def rebuild_search_index() -> None:
+    """Re-read every source row into the SQLite indexes (after VACUUM or a restore)."""
+    if not IS_SQLITE:
+        return
+    with engine.begin() as conn:
+        for table, _ in SOURCES.values():
+            conn.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+
+def fts5_query(q: str) -> str:
+    """User input as an FTS5 query: every word must match, ``word*`` matches as a prefix.
+
+    Each term is quoted, so FTS5 operators and punctuation in the input cannot break the query.
+    """
+    terms = []
+    for term in QUERY_TERM_REGEX.findall(q):
+        word = term.rstrip("*")
+        terms.append(f'"{word}"*' if term.endswith("*") else f'"{word}"')
+    return " ".join(terms)
+
+def _sqlite_part(kind: str, table: str, column: str, meeting_filter: str) -> str:
+    fts = f"{table}_fts"
+    return f"""
+        SELECT * FROM (
+            SELECT '{kind}' AS kind, t.id AS id, t.meeting_id AS meeting_id,
+                   snippet({fts}, 0, :hl_start, :hl_end, '…', {SNIPPET_TOKENS}) AS snippet,
+                   -bm25({fts}) AS score
+            FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid
+            WHERE {fts} MATCH :q {meeting_filter}
+            ORDER BY bm25({fts}) LIMIT :per_kind
+        )"""
+
+def _postgres_part(kind: str, table: str, column: str, meeting_filter: str) -> str:
+    return f"""
+        (SELECT '{kind}' AS kind, t.id AS id, t.meeting_id AS meeting_id,
+                ts_headline('{TS_CONFIG}', t.{column}, query,
+                            'StartSel=' || :hl_start || ', StopSel=' || :hl_end || ', MaxWords=30, MinWords=10') AS snippet,
+                ts_rank({_tsvector('t.' + column)}, query) AS score
+         FROM {table} t, websearch_to_tsquery('{TS_CONFIG}', :q) query
+         WHERE {_tsvector('t.' + column)} @@ query {meeting_filter}
+         ORDER BY score DESC LIMIT :per_kind)"""
+
+def search(db: Session, q: str, kinds: list[str] | None = None, meeting_id: str | None = None,
+           limit: int = 20, offset: int = 0) -> list[dict]:
+    """Best-ranked matches for ``q`` across the selected kinds, with highlighted snippets."""
+    query = fts5_query(q) if IS_SQLITE else q.strip()
+    if not query:
+        return []
+    selected = [k for k in SOURCES if not kinds or k in kinds]
+    meeting_filter = "AND t.meeting_id = :meeting_id" if meeting_id else ""
+    build = _sqlite_part if IS_SQLITE else _postgres_part
+    parts = [build(kind, *SOURCES[kind], meeting_filter) for kind in selected]
+    sql = " UNION ALL ".join(parts) + " ORDER BY score DESC LIMIT :limit OFFSET :offset"
+    rows = db.execute(text(sql), {
+        "q": query, "meeting_id": meeting_id, "hl_start": HIGHLIGHT_START, "hl_end": HIGHLIGHT_END,
+        # Each kind contributes at most the page end, so ranking never reads past it
+        "per_kind": limit + offset, "limit": limit, "offset": offset,
+    }).mappings().all()
+    return [dict(row) for row in rows]
+
+if __name__ == "__main__":
+    from app.db import init_db
+
+    parser = argparse.ArgumentParser(description="Maintain the full-text search indexes")
+    parser.add_argument("--rebuild", action="store_true", help="re-index every row (SQLite, e.g. after VACUUM)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()  # also creates the search indexes
+    if args.rebuild:
+        rebuild_search_index()
+        print("Rebuilt full-text search indexes")
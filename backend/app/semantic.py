@@ -0,0 +1,268 @@
+# app/semantic.py
+# Cross-meeting semantic search over transcript chunks.
+#
+# Chunk vectors are rows of one float32 matrix in SEMANTIC_INDEX_DIR/vectors.f32, memory-mapped
+# so search never loads the corpus into Python objects. The semantic_chunks table maps each row to
+# its meeting and text. Rows are append-only: when a meeting is reprocessed only new chunks are
+# embedded, and rows of chunks that disappeared are zeroed (tombstoned). Once the corpus reaches
+# SEMANTIC_IVF_MIN_ROWS, an IVF index (k-means centroids + one list id per row) limits each query to
+# the SEMANTIC_IVF_PROBES closest lists plus any rows appended since the index was trained.
+#
+# Writers are serialized by a process-wide lock; run a single processing process per index dir.
+# Rebuild from stored transcripts with `python -m app.semantic --rebuild`.
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app import models
+from app.transcripts import current_transcript
+from app.embeddings import Embedder, get_embedder
+from app.mapreduce import split_transcript
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_INDEX_DIR = Path(os.getenv("SEMANTIC_INDEX_DIR", "./semantic_index"))
+SEMANTIC_CHUNK_TOKENS = int(os.getenv("SEMANTIC_CHUNK_TOKENS", "200"))
+SEMANTIC_IVF_MIN_ROWS = int(os.getenv("SEMANTIC_IVF_MIN_ROWS", "20000"))
+SEMANTIC_IVF_PROBES = int(os.getenv("SEMANTIC_IVF_PROBES", "8"))
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_ROWS = 50000
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class VectorStore:
+    """Append-only memory-mapped matrix of unit vectors, with an optional IVF index."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.vectors_path = directory / "vectors.f32"
+        self.meta_path = directory / "meta.json"
+        self.centroids_path = directory / "ivf_centroids.npy"
+        self.lists_path = directory / "ivf_lists.npy"
+        self._mapped = None
+        self._mapped_rows = 0
+        self._ivf = None  # (trained_rows, centroids, lists)
+
+    # ---- metadata ----
+    def meta(self) -> dict:
+        if not self.meta_path.exists():
+            return {"embedder": None, "dim": 0, "rows": 0, "ivf_rows": 0}
+        return json.loads(self.meta_path.read_text(encoding="utf-8"))
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = self.meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.meta_path)
+
+    def reset(self, embedder: str, dim: int) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._mapped, self._mapped_rows, self._ivf = None, 0, None
+        self._write_meta({"embedder": embedder, "dim": dim, "rows": 0, "ivf_rows": 0})
+
+    # ---- vectors ----
+    def matrix(self, meta: dict) -> np.ndarray:
+        """Read-only view of the first ``meta['rows']`` vectors, remapped when the file has grown."""
+        rows, dim = meta["rows"], meta["dim"]
+        if self._mapped is None or self._mapped_rows < rows:
+            self._mapped = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, dim))
+            self._mapped_rows = rows
+        return self._mapped[:rows]
+
+    def append(self, vectors: np.ndarray) -> list[int]:
+        meta = self.meta()
+        start = meta["rows"]
+        with self.vectors_path.open("ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        meta["rows"] = start + len(vectors)
+        self._write_meta(meta)
+        return list(range(start, meta["rows"]))
+
+    def clear(self, rows: list[int]) -> None:
+        """Tombstone rows: a zero vector scores 0 against every query and is never returned."""
+        if not rows:
+            return
+        meta = self.meta()
+        writable = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(meta["rows"], meta["dim"]))
+        writable[rows] = 0.0
+        writable.flush()
+        del writable
+
+    # ---- IVF ----
+    def maybe_train_ivf(self) -> None:
+        meta = self.meta()
+        rows = meta["rows"]
+        if rows < SEMANTIC_IVF_MIN_ROWS or (meta["ivf_rows"] and rows < 2 * meta["ivf_rows"]):
+            return  # too small for IVF, or not grown enough since the last training
+        matrix = self.matrix(meta)
+        nlist = max(1, int(np.sqrt(rows)))
+        rng = np.random.default_rng(0)
+        sample = matrix[rng.choice(rows, size=min(rows, KMEANS_SAMPLE_ROWS), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):  # spherical k-means
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+        lists = np.concatenate([
+            np.argmax(matrix[start:start + 8192] @ centroids.T, axis=1) for start in range(0, rows, 8192)
+        ]).astype(np.int32)
+        np.save(self.centroids_path, centroids)
+        np.save(self.lists_path, lists)
+        meta["ivf_rows"] = rows
+        self._write_meta(meta)
+        self._ivf = None
+        logger.info(f"Trained IVF index: {nlist} lists over {rows} vectors")
+
+    def candidates(self, meta: dict, query: np.ndarray) -> np.ndarray | None:
+        """Row ids worth scoring for ``query``, or None to scan everything."""
+        trained = meta["ivf_rows"]
+        if not trained:
+            return None
+        if self._ivf is None or self._ivf[0] != trained:
+            self._ivf = (trained, np.load(self.centroids_path), np.load(self.lists_path, mmap_mode="r"))
+        _, centroids, lists = self._ivf
+        probes = np.argsort(centroids @ query)[-SEMANTIC_IVF_PROBES:]
+        return np.concatenate([np.flatnonzero(np.isin(lists, probes)), np.arange(trained, meta["rows"])])
+
+    def search(self, query: np.ndarray, k: int) -> list[tuple[int, float]]:
+        meta = self.meta()
+        if not meta["rows"]:
+            return []
+        matrix = self.matrix(meta)
+        rows = self.candidates(meta, query)
+        scores = (matrix if rows is None else matrix[rows]) @ query
+        k = min(k, len(scores))
+        if k <= 0:
+            return []  # the probed lists are empty
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        ids = top if rows is None else rows[top]
+        return [(int(i), float(scores[t])) for i, t in zip(ids, top) if scores[t] > 0]
+
+_store = VectorStore(SEMANTIC_INDEX_DIR)
+_write_lock = threading.Lock()
+
+def _ensure_space(db: Session, embedder: Embedder, dim: int) -> bool:
+    """Start a fresh index if none exists or it was built by a different embedder; True if it did.
+
+    Caller holds the write lock.
+    """
+    meta = _store.meta()
+    if meta["embedder"] == embedder.name and meta["dim"] == dim:
+        return False
+    if meta["embedder"]:
+        logger.warning(f"Semantic index was built with {meta['embedder']}; starting over with {embedder.name}. "
+                       f"Run `python -m app.semantic --rebuild` to re-embed existing meetings.")
+    db.query(models.SemanticChunk).delete()
+    db.commit()
+    _store.reset(embedder.name, dim)
+    return True
+
+def index_meeting(db: Session, mid: str, transcript: str) -> int:
+    """Bring a meeting's chunk vectors in line with its transcript; returns the number of chunks embedded."""
+    chunks = {chunk_hash(c): (pos, c) for pos, c in enumerate(split_transcript(transcript, SEMANTIC_CHUNK_TOKENS)) if c.strip()}
+    embedder = get_embedder()
+    with _write_lock:
+        existing = {c.chunk_hash: c for c in db.query(models.SemanticChunk).filter_by(meeting_id=mid)}
+        new = [(h, pos, text) for h, (pos, text) in chunks.items() if h not in existing]
+        stale = [c for h, c in existing.items() if h not in chunks]
+        if not new and not stale:
+            return 0
+
+        if new:
+            vectors = embedder.embed([text for _, _, text in new])
+            if _ensure_space(db, embedder, vectors.shape[1]) and existing:
+                # The index was started over, so every chunk of this meeting is new again
+                existing, stale = {}, []
+                new = [(h, pos, text) for h, (pos, text) in chunks.items()]
+                vectors = embedder.embed([text for _, _, text in new])
+            rows = _store.append(vectors)
+            db.add_all([
+                models.SemanticChunk(meeting_id=mid, row=row, chunk_hash=h, position=pos, text=text)
+                for row, (h, pos, text) in zip(rows, new)
+            ])
+        _store.clear([c.row for c in stale])
+        for c in stale:
+            db.delete(c)
+        for h, c in existing.items():
+            if h in chunks:
+                c.position = chunks[h][0]
+        db.commit()
+        _store.maybe_train_ivf()
+    logger.info(f"Semantic index for meeting {mid}: {len(new)} chunks embedded, {len(stale)} removed")
+    return len(new)
+
+def search_meetings(db: Session, query: str, k: int = 10) -> list[dict]:
+    """The ``k`` meetings whose transcripts best match ``query``, each with its best-matching chunk."""
+    if not query.strip():
+        return []
+    embedder = get_embedder()
+    meta = _store.meta()
+    if meta["embedder"] != embedder.name:
+        return []
+    q = embedder.embed([query], query=True)[0]
+    # Several chunks can come from the same meeting, so over-fetch before grouping
+    hits = dict(_store.search(q, k * 8))
+    if not hits:
+        return []
+    rows = (
+        db.query(models.SemanticChunk, models.Meeting)
+        .join(models.Meeting, models.Meeting.id == models.SemanticChunk.meeting_id)
+        .filter(models.SemanticChunk.row.in_(hits.keys()))
+        .all()
+    )
+    best: dict[str, dict] = {}
+    for chunk, meeting in rows:
+        score = hits[chunk.row]
+        if chunk.meeting_id not in best or score > best[chunk.meeting_id]["score"]:
+            best[chunk.meeting_id] = {
+                "meeting_id": meeting.id,
+                "title": meeting.title,
+                "date": meeting.date,
+                "score": round(score, 4),
+                "text": chunk.text,
+            }
+    return sorted(best.values(), key=lambda r: r["score"], reverse=True)[:k]
+
+def rebuild(db: Session) -> int:
+    """Re-embed every meeting from its stored transcripts."""
+    with _write_lock:
+        db.query(models.SemanticChunk).delete()
+        db.commit()
+        _store.reset(None, 0)
+    total = 0
+    for (mid,) in db.query(models.Meeting.id).all():
+        transcript = current_transcript(db, mid)
+        if transcript.strip():
+            total += index_meeting(db, mid, transcript)
+    return total
+
+if __name__ == "__main__":
+    from app.db import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description="Maintain the cross-meeting semantic search index")
+    parser.add_argument("--rebuild", action="store_true", help="re-embed all meetings from stored transcripts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    if args.rebuild:
+        with SessionLocal() as db:
+            print(f"Embedded {rebuild(db)} chunks")
+    else:
+        print(json.dumps(_store.meta()))
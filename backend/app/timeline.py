@@ -0,0 +1,125 @@
+# app/timeline.py
+# Speaker timeline for the action-flow view.
+#
+# The transcript is parsed once per version, line by line as a stream, into timeline_entries
+# rows written in batches; only the per-speaker counters are kept in memory. Pages are then
+# index range scans: by position for the whole timeline, by (speaker, position) when filtered.
+#
+# Talk time is estimated from word counts at TIMELINE_WORDS_PER_MINUTE, since transcripts carry
+# no timestamps.
+import hashlib
+import io
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.transcripts import load_transcript
+from app.retrieval import SPEAKER_LINE_REGEX
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_WORDS_PER_MINUTE = int(os.getenv("TIMELINE_WORDS_PER_MINUTE", "150"))
+TIMELINE_BATCH_ROWS = 1000
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def parse_timeline(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """(speaker, text) for every line that looks like "Speaker (Role): text"."""
+    for line in lines:
+        m = SPEAKER_LINE_REGEX.match(line)
+        if m:
+            yield m.group("speaker").strip(), m.group("text").strip()
+
+def build_timeline(db: Session, mid: str, transcript: str, transcript_hash: str | None = None) -> models.SpeakerTimeline:
+    """Replace the meeting's stored timeline with one parsed from ``transcript`` and commit."""
+    transcript_hash = transcript_hash or hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+    db.query(models.TimelineEntry).filter_by(meeting_id=mid).delete(synchronize_session=False)
+
+    stats: dict[str, dict] = {}
+    batch: list[dict] = []
+    position = turn = 0
+    previous = None
+    for speaker, text in parse_timeline(io.StringIO(transcript)):
+        words = len(text.split())
+        s = stats.setdefault(speaker, {"speaker": speaker, "lines": 0, "turns": 0, "words": 0})
+        if speaker != previous:
+            turn += 1
+            s["turns"] += 1
+            previous = speaker
+        s["lines"] += 1
+        s["words"] += words
+        batch.append({"meeting_id": mid, "position": position, "turn": turn, "speaker": speaker, "text": text, "words": words})
+        position += 1
+        if len(batch) >= TIMELINE_BATCH_ROWS:
+            db.execute(insert(models.TimelineEntry), batch)
+            batch = []
+    if batch:
+        db.execute(insert(models.TimelineEntry), batch)
+
+    total_words = sum(s["words"] for s in stats.values()) or 1
+    speakers = sorted(stats.values(), key=lambda s: s["words"], reverse=True)
+    for s in speakers:
+        s["talk_seconds"] = round(s["words"] * 60 / TIMELINE_WORDS_PER_MINUTE)
+        s["talk_share"] = round(s["words"] / total_words, 4)
+
+    row = db.get(models.SpeakerTimeline, mid)
+    if row is None:
+        row = models.SpeakerTimeline(meeting_id=mid)
+        db.add(row)
+    row.transcript_hash = transcript_hash
+    row.entries = position
+    row.turns = turn
+    row.speakers_json = json.dumps(speakers)
+    row.checked_at = utcnow()
+    db.commit()
+    logger.info(f"Built timeline for meeting {mid}: {position} lines, {turn} turns, {len(speakers)} speakers")
+    return row
+
+def current_timeline(db: Session, meeting: models.Meeting) -> models.SpeakerTimeline:
+    """The stored timeline, rebuilt first if the meeting's transcript changed since it was parsed.
+
+    Meeting.updated_at moves on every artifact write, so an unchanged meeting costs no transcript read.
+    """
+    row = db.get(models.SpeakerTimeline, meeting.id)
+    if row is not None and (meeting.updated_at is None or row.checked_at >= meeting.updated_at):
+        return row
+    stored = load_transcript(db, meeting.id)
+    if row is not None and row.transcript_hash == stored.content_hash:
+        row.checked_at = utcnow()  # only outputs changed
+        db.commit()
+        return row
+    return build_timeline(db, meeting.id, stored.text, stored.content_hash)
+
+def timeline_page(db: Session, timeline: models.SpeakerTimeline, offset: int, limit: int,
+                  speakers: list[str] | None = None) -> dict:
+    """Entries ``offset``..``offset + limit`` of the timeline, optionally of some speakers only."""
+    mid = timeline.meeting_id
+    stats = json.loads(timeline.speakers_json)
+    query = db.query(models.TimelineEntry).filter(models.TimelineEntry.meeting_id == mid)
+    if speakers:
+        query = query.filter(models.TimelineEntry.speaker.in_(speakers)) \
+            .order_by(models.TimelineEntry.position).offset(offset)
+        total = sum(s["lines"] for s in stats if s["speaker"] in speakers)
+    else:
+        # Positions are contiguous from 0, so the offset is a range start on the primary key
+        query = query.filter(models.TimelineEntry.position >= offset).order_by(models.TimelineEntry.position)
+        total = timeline.entries
+    entries = query.limit(limit).all()
+    return {
+        "timeline": [
+            {"id": f"{mid}-t-{e.position}", "position": e.position, "turn": e.turn, "speaker": e.speaker, "text": e.text}
+            for e in entries
+        ],
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "turns": timeline.turns,
+        "speakers": stats,
+    }
@@ -0,0 +1,215 @@
+# app/transcripts.py
+# The canonical transcript of each meeting.
+#
+# A meeting's transcript is its artifacts' transcripts in upload order, exact duplicates dropped
+# (join_transcripts). Upload order is created_at, then insertion order: SQLite timestamps have
+# one-second resolution, so its rowid breaks ties; elsewhere timestamps have microseconds and the
+# id breaks the rest. It is kept materialized in meeting_transcripts, compressed, with its
+# content hash, a version and the hash of every segment, so readers decompress one row instead
+# of re-joining every artifact. The last decompressed text per meeting is also kept in memory and
+# reused while the stored hash is unchanged.
+#
+# A new artifact transcript is appended to the stored text when it is newer than everything
+# included so far; an artifact that sorts earlier (an older upload finishing transcription late)
+# or a deleted one means a rebuild from the artifacts. Writers of a meeting take turns within a
+# process; across processes they conflict on the version, and the loser rebuilds from the
+# artifacts instead of overwriting. If that keeps failing the row is dropped, and the next reader
+# rebuilds it.
+#
+# zstd is used when the zstandard package is installed, zlib otherwise; rows record their codec,
+# so either reads the other's rows.
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import delete, literal_column
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app import models
+from app.db import IS_SQLITE
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_CODEC = "zstd" if zstandard is not None else "zlib"
+TRANSCRIPT_ZSTD_LEVEL = int(os.getenv("TRANSCRIPT_ZSTD_LEVEL", "9"))
+TRANSCRIPT_CACHE_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_ENTRIES", "128"))
+TRANSCRIPT_WRITE_ATTEMPTS = 3
+TRANSCRIPT_WRITE_LOCKS = 64
+
+@dataclass(frozen=True)
+class StoredTranscript:
+    text: str
+    content_hash: str
+    version: int
+
+EMPTY = StoredTranscript(text="", content_hash=hashlib.sha256(b"").hexdigest(), version=0)
+
+_texts: OrderedDict[str, StoredTranscript] = OrderedDict()
+_texts_lock = threading.Lock()
+_write_locks = [threading.Lock() for _ in range(TRANSCRIPT_WRITE_LOCKS)]
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compress(text: str) -> tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    if TRANSCRIPT_CODEC == "zstd":
+        return "zstd", zstandard.ZstdCompressor(level=TRANSCRIPT_ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+def decompress(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Transcript stored with zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+def join_transcripts(artifacts: list[models.Artifact]) -> str:
+    """Concatenate artifact transcripts, skipping exact duplicates."""
+    transcripts = [a.transcript_text for a in artifacts if a.transcript_text]
+    unique_transcripts = list(dict.fromkeys(transcripts))  # Remove duplicates
+    return "\n".join(unique_transcripts)
+
+# Sort key of artifacts in upload order
+ARTIFACT_ORDER = (models.Artifact.created_at, literal_column("artifacts.rowid") if IS_SQLITE else models.Artifact.id)
+
+def meeting_artifacts(db: Session, mid: str) -> list[models.Artifact]:
+    return db.query(models.Artifact).filter_by(meeting_id=mid).order_by(*ARTIFACT_ORDER).all()
+
+def _sorts_before_last(db: Session, artifact: models.Artifact, row: models.MeetingTranscript) -> bool:
+    """True if ``artifact`` comes before the last artifact included in ``row``, or either is gone."""
+    ids = [artifact.id, row.last_artifact_id]
+    positions = {
+        art_id: (at, tiebreaker)
+        for art_id, at, tiebreaker in db.query(models.Artifact.id, *ARTIFACT_ORDER).filter(models.Artifact.id.in_(ids))
+    }
+    current, last = positions.get(artifact.id), positions.get(row.last_artifact_id)
+    if current is None or last is None or current[0] is None or last[0] is None:
+        return True
+    return current < last
+
+def _remember(mid: str, stored: StoredTranscript) -> StoredTranscript:
+    with _texts_lock:
+        _texts[mid] = stored
+        _texts.move_to_end(mid)
+        while len(_texts) > TRANSCRIPT_CACHE_ENTRIES:
+            _texts.popitem(last=False)
+    return stored
+
+def _write(db: Session, mid: str, row: models.MeetingTranscript | None, text: str, segments: list[str],
+           last_artifact: tuple | None) -> StoredTranscript:
+    """Store ``text`` as the meeting's transcript and commit."""
+    if row is None:
+        row = models.MeetingTranscript(meeting_id=mid)
+        db.add(row)
+    row.codec, row.data = compress(text)
+    row.content_hash = text_hash(text)
+    row.chars = len(text)
+    row.segment_hashes = json.dumps(segments)
+    row.last_artifact_at, row.last_artifact_id = last_artifact or (None, None)
+    db.flush()  # assigns the new version; read it before commit expires the row
+    stored = StoredTranscript(text, row.content_hash, row.version)
+    db.commit()
+    return _remember(mid, stored)
+
+def _retrying(db: Session, mid: str, write):
+    """Run ``write()``; if another writer changed the row first, rebuild from the artifacts instead."""
+    with _write_locks[hash(mid) % TRANSCRIPT_WRITE_LOCKS]:
+        for _ in range(TRANSCRIPT_WRITE_ATTEMPTS):
+            try:
+                return write()
+            except (StaleDataError, IntegrityError):
+                db.rollback()
+                logger.info(f"Transcript of meeting {mid} changed concurrently; rebuilding")
+                write = lambda: _rebuild(db, mid, meeting_artifacts(db, mid))  # noqa: E731
+        logger.warning(f"Gave up storing the transcript of meeting {mid}; it is rebuilt on next read")
+        db.execute(delete(models.MeetingTranscript).where(models.MeetingTranscript.meeting_id == mid))
+        db.commit()
+        with _texts_lock:
+            _texts.pop(mid, None)
+        return None
+
+def _rebuild(db: Session, mid: str, artifacts: list[models.Artifact]) -> StoredTranscript:
+    text = join_transcripts(artifacts)
+    segments = [text_hash(t) for t in dict.fromkeys(a.transcript_text for a in artifacts if a.transcript_text)]
+    last_artifact = next(((a.created_at, a.id) for a in reversed(artifacts) if a.transcript_text), None)
+    row = db.get(models.MeetingTranscript, mid)
+    if row is not None and row.content_hash == text_hash(text) and json.loads(row.segment_hashes) == segments:
+        return _remember(mid, StoredTranscript(text, row.content_hash, row.version))
+    stored = _write(db, mid, row, text, segments, last_artifact)
+    logger.info(f"Rebuilt transcript of meeting {mid}: {len(text)} chars from {len(segments)} artifacts")
+    return stored
+
+def rebuild_transcript(db: Session, mid: str, artifacts: list[models.Artifact] | None = None) -> str:
+    """Re-join the meeting's transcript from its artifacts (in upload order, if given) and commit."""
+    if artifacts is None:
+        artifacts = meeting_artifacts(db, mid)
+    stored = _retrying(db, mid, lambda: _rebuild(db, mid, artifacts))
+    return stored.text if stored is not None else join_transcripts(artifacts)
+
+def append_transcript(db: Session, artifact: models.Artifact) -> None:
+    """Add a newly transcribed artifact to its meeting's transcript and commit.
+
+    ``artifact`` must be committed (its created_at is compared with the artifacts already included).
+    """
+    text = artifact.transcript_text
+    if not text:
+        return
+    mid = artifact.meeting_id
+
+    def append() -> StoredTranscript | None:
+        row = db.get(models.MeetingTranscript, mid)
+        if row is None:
+            return _rebuild(db, mid, meeting_artifacts(db, mid))
+        if row.last_artifact_id and _sorts_before_last(db, artifact, row):
+            return _rebuild(db, mid, meeting_artifacts(db, mid))
+        segments = json.loads(row.segment_hashes)
+        segment = text_hash(text)
+        if segment in segments:
+            return None  # an exact repeat of an included transcript
+        current = _stored_text(mid, row)
+        return _write(db, mid, row, f"{current}\n{text}" if current else text, segments + [segment],
+                      (artifact.created_at, artifact.id))
+
+    _retrying(db, mid, append)
+
+def _stored_text(mid: str, row: models.MeetingTranscript) -> str:
+    with _texts_lock:
+        cached = _texts.get(mid)
+    if cached is not None and cached.content_hash == row.content_hash:
+        return cached.text
+    return decompress(row.codec, row.data)
+
+def load_transcript(db: Session, mid: str) -> StoredTranscript:
+    """The meeting's current transcript; built from the artifacts the first time it is asked for.
+
+    While the stored hash matches the text kept in memory, this is a primary-key lookup that
+    leaves the compressed data unread.
+    """
+    row = db.get(models.MeetingTranscript, mid)
+    if row is None:
+        # Meetings from before the store existed, and meetings without artifacts yet
+        if db.get(models.Meeting, mid) is None:
+            return EMPTY
+        artifacts = meeting_artifacts(db, mid)
+        stored = _retrying(db, mid, lambda: _rebuild(db, mid, artifacts))
+        if stored is None:
+            text = join_transcripts(artifacts)
+            return StoredTranscript(text, text_hash(text), 0)
+        return stored
+    return _remember(mid, StoredTranscript(_stored_text(mid, row), row.content_hash, row.version))
+
+def current_transcript(db: Session, mid: str) -> str:
+    return load_transcript(db, mid).text
@@ -0,0 +1,151 @@
+# app/tts.py
+# Disk cache of synthesized summary audio for the /avatar endpoint.
+#
+# Files are named by sha256(voice, text), so a summary is synthesized once per voice and served
+# as a static file afterwards. Renders run on a small thread pool (kicked off whenever a summary
+# is written) and never on the event loop. The cache is trimmed least-recently-used first (file
+# mtime is bumped on every hit) to stay under TTS_CACHE_MAX_BYTES.
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", "./tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+TTS_RENDER_WORKERS = int(os.getenv("TTS_RENDER_WORKERS", "2"))
+TTS_VOICE = os.getenv("TTS_VOICE", "en")  # gTTS language code
+TTS_MAX_CHARS = 1000
+NO_SUMMARY_TEXT = "Hello! No summary is available for this meeting yet."
+
+TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+_pool = ThreadPoolExecutor(max_workers=TTS_RENDER_WORKERS, thread_name_prefix="tts")
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+_serving: Counter[Path] = Counter()  # files being streamed to clients; evict() leaves them alone
+_serving_lock = threading.Lock()
+
+def speech_text(summary: str | None) -> str:
+    """The text read aloud for a summary: a fixed greeting when there is none, capped at TTS_MAX_CHARS."""
+    text = summary or NO_SUMMARY_TEXT
+    if len(text) > TTS_MAX_CHARS:
+        text = text[:TTS_MAX_CHARS] + "... The full details contain more."
+    return text
+
+def cache_key(text: str, voice: str = TTS_VOICE) -> str:
+    return hashlib.sha256(f"{voice}\x00{text}".encode("utf-8")).hexdigest()
+
+def _path(key: str) -> Path:
+    return TTS_CACHE_DIR / f"{key}.mp3"
+
+def cached_path(key: str) -> Path | None:
+    """The cached file for ``key``, marked as recently used; None if it has not been rendered."""
+    path = _path(key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+def acquire(key: str) -> Path | None:
+    """Like cached_path, but the file is not evicted until release() is called for it."""
+    with _serving_lock:
+        path = cached_path(key)
+        if path is not None:
+            _serving[path] += 1
+    return path
+
+def release(path: Path) -> None:
+    with _serving_lock:
+        _serving[path] -= 1
+        if _serving[path] <= 0:
+            del _serving[path]
+
+def _synthesize(text: str, voice: str, out_path: Path) -> None:
+    from gtts import gTTS  # deferred: only needed when something is actually rendered
+
+    gTTS(text, lang=voice, slow=False).save(str(out_path))
+
+def _render(key: str, text: str, voice: str) -> Path:
+    path = _path(key)
+    if path.exists():
+        return path
+    tmp = TTS_CACHE_DIR / f".{uuid.uuid4().hex}.tmp"
+    try:
+        _synthesize(text, voice, tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    logger.info(f"Rendered TTS audio {key[:12]} ({path.stat().st_size} bytes)")
+    evict(keep=path)
+    return path
+
+def render_async(text: str, voice: str = TTS_VOICE) -> Future:
+    """Render in the background; concurrent requests for the same audio share one render."""
+    key = cache_key(text, voice)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = _pool.submit(_render, key, text, voice)
+        _inflight[key] = future
+    # Outside the lock: a render that already finished runs the callback right here
+    future.add_done_callback(lambda done: _forget(key, done))
+    return future
+
+def _forget(key: str, future: Future) -> None:
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+def render(text: str, voice: str = TTS_VOICE) -> Path:
+    """Blocking render (or cache hit). Call from a worker thread, not the event loop."""
+    return cached_path(cache_key(text, voice)) or render_async(text, voice).result()
+
+def prerender_summary(summary: str, voice: str = TTS_VOICE) -> None:
+    """Queue audio for a newly written summary so the first /avatar request is already a cache hit."""
+    try:
+        render_async(speech_text(summary), voice).add_done_callback(_log_failure)
+    except RuntimeError:
+        pass  # pool already shut down (process exiting)
+
+def _log_failure(future: Future) -> None:
+    if future.exception() is not None:
+        logger.warning(f"Background TTS render failed: {future.exception()}")
+
+def evict(max_bytes: int = TTS_CACHE_MAX_BYTES, keep: Path | None = None) -> int:
+    """Delete least-recently-used files until the cache fits in ``max_bytes``.
+
+    ``keep`` and files being served are never removed. Returns the number of files removed.
+    """
+    entries = []
+    for path in TTS_CACHE_DIR.glob("*.mp3"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    with _serving_lock:
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if path == keep or path in _serving:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+    if removed:
+        logger.info(f"Evicted {removed} TTS files; cache now {total} bytes")
+    return removed
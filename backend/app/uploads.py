@@ -0,0 +1,115 @@
+# app/uploads.py
+# Upload storage: bodies are streamed to a temp file in fixed-size chunks and hashed on the fly.
+# Finished files are atomically renamed to a content-addressed name, so byte-identical uploads
+# are stored once.
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(os.getcwd())
+UPLOAD_DIR = PROJECT_ROOT / "uploads"
+TMP_DIR = UPLOAD_DIR / ".tmp"          # same filesystem as UPLOAD_DIR, so os.replace is atomic
+PARTIAL_DIR = UPLOAD_DIR / ".partial"  # resumable uploads in progress
+for d in (UPLOAD_DIR, TMP_DIR, PARTIAL_DIR):
+    d.mkdir(parents=True, exist_ok=True)
+
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+
+class UploadTooLarge(Exception):
+    pass
+
+class UploadBusy(Exception):
+    pass
+
+@dataclass
+class StoredUpload:
+    path: Path
+    sha256: str
+    size_bytes: int
+    deduplicated: bool  # an identical file was already stored
+
+    @property
+    def file_name(self) -> str:
+        return self.path.name
+
+def _finalize(tmp_path: Path, sha256: str, size: int, ext: str) -> StoredUpload:
+    final_path = UPLOAD_DIR / f"{sha256}{ext.lower()}"
+    if final_path.exists():
+        tmp_path.unlink(missing_ok=True)
+        logger.info(f"Upload {sha256[:12]} already stored, reusing {final_path.name}")
+        return StoredUpload(final_path, sha256, size, deduplicated=True)
+    os.replace(tmp_path, final_path)
+    return StoredUpload(final_path, sha256, size, deduplicated=False)
+
+def store_stream(chunks: Iterable[bytes], ext: str) -> StoredUpload:
+    """Write ``chunks`` to disk with constant memory, enforcing MAX_UPLOAD_BYTES."""
+    tmp_path = TMP_DIR / uuid.uuid4().hex
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with tmp_path.open("wb") as f:
+            for chunk in chunks:
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge(f"Upload exceeds the {MAX_UPLOAD_BYTES} byte limit")
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return _finalize(tmp_path, digest.hexdigest(), size, ext)
+
+def read_chunks(fileobj, chunk_size: int = UPLOAD_CHUNK_BYTES) -> Iterable[bytes]:
+    return iter(lambda: fileobj.read(chunk_size), b"")
+
+# ---- Resumable uploads ----
+def partial_path(upload_id: str) -> Path:
+    return PARTIAL_DIR / upload_id
+
+_busy: set[str] = set()
+_busy_lock = threading.Lock()
+
+@contextmanager
+def exclusive(upload_id: str):
+    """Hold a resumable upload for one request at a time; raises UploadBusy if another request has it."""
+    with _busy_lock:
+        if upload_id in _busy:
+            raise UploadBusy("Another request is writing this upload")
+        _busy.add(upload_id)
+    try:
+        yield
+    finally:
+        with _busy_lock:
+            _busy.discard(upload_id)
+
+def open_partial(upload_id: str, offset: int):
+    """Open a resumable upload's partial file for writing at ``offset``, dropping anything after it."""
+    path = partial_path(upload_id)
+    f = path.open("r+b" if path.exists() else "wb")
+    f.seek(offset)
+    f.truncate()
+    return f
+
+def finalize_partial(upload_id: str, ext: str) -> StoredUpload:
+    """Hash a completed resumable upload and move it into place; FileNotFoundError if its data is gone."""
+    path = partial_path(upload_id)
+    digest = hashlib.sha256()
+    size = 0
+    with path.open("rb") as f:
+        for chunk in read_chunks(f):
+            digest.update(chunk)
+            size += len(chunk)
+    return _finalize(path, digest.hexdigest(), size, ext)
@@ -0,0 +1,73 @@
+# benchmarks/bulk_insert.py
+# Inserted rows per second for the list-writing endpoints (participants, decisions, action
+# items), run against the app in-process on a throwaway SQLite database. Each request posts
+# --batch rows; the SQL statement count per request is reported alongside, since the point of
+# the bulk path is that it does not grow with the batch.
+#
+#   cd backend && python -m benchmarks.bulk_insert --batch 200 --requests 20
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ENDPOINTS = {
+    "participants": lambda i: {"name": f"Person {i}", "role": "member", "email": f"p{i}@example.com"},
+    "decisions": lambda i: {"text": f"Decision {i}: go ahead with option {i % 3}."},
+    "action-items": lambda i: {"task": f"Task {i}: follow up on item {i}", "owner": f"Person {i % 7}", "due_date": "2024-02-01"},
+}
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import event
+    from app.db import engine
+    from app.main import app
+
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for endpoint, make in ENDPOINTS.items():
+            meeting = (await client.post("/meetings", json={"title": endpoint, "date": "2024-01-01", "created_by": "bench"})).json()
+            url = f"/meetings/{meeting['id']}/{endpoint}"
+            statements[0] = 0
+            started = time.perf_counter()
+            for r in range(args.requests):
+                resp = await client.post(url, json=[make(r * args.batch + i) for i in range(args.batch)])
+                resp.raise_for_status()
+            elapsed = time.perf_counter() - started
+            rows = args.requests * args.batch
+            results[endpoint] = {
+                "rows": rows,
+                "elapsed_s": round(elapsed, 3),
+                "rows_per_s": round(rows / elapsed, 1),
+                "statements_per_request": round(statements[0] / args.requests, 1),
+            }
+    event.remove(engine, "before_cursor_execute", count)
+    return {"batch": args.batch, "requests": args.requests, "endpoints": results}
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk insert throughput of the list endpoints")
+    parser.add_argument("--batch", type=int, default=200, help="rows per request")
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint")
+    args = parser.parse_args()
+
+    # Throwaway database and caches so the benchmark never touches real data
+    workdir = tempfile.mkdtemp(prefix="bulk-insert-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+    os.environ.setdefault("LLM_PROVIDER", "stub")
+    os.environ.setdefault("LLM_CACHE_PATH", f"{workdir}/llm_cache.db")
+    os.environ.setdefault("SEMANTIC_INDEX_DIR", f"{workdir}/semantic_index")
+    os.environ.setdefault("TTS_CACHE_DIR", f"{workdir}/tts_cache")
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
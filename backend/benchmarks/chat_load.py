@@ -0,0 +1,103 @@
+# benchmarks/chat_load.py
+# Concurrent chat load test against the app in-process, with a model provider that sleeps
+# like a slow Gemini call. Reports latency percentiles and throughput for /chat, and the
+# latency of a cheap GET / issued during the load: if chat blocked the event loop, those
+# probes would queue behind the slow calls.
+#
+#   cd backend && python -m benchmarks.chat_load --requests 200 --concurrency 50 --latency 0.5
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "mean_ms": round(statistics.mean(values) * 1000, 1),
+    }
+
+async def run(args) -> dict:
+    import httpx
+    from app import llm_provider
+    from app.main import app
+
+    class SlowProvider(llm_provider.StubProvider):
+        def generate_content(self, contents, **kwargs):
+            time.sleep(args.latency)  # blocking, like the real SDK
+            return super().generate_content(contents, **kwargs)
+
+    llm_provider.set_provider(SlowProvider())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        meeting = (await client.post("/meetings", json={"title": "load", "date": "2024-01-01", "created_by": "bench"})).json()
+        mid = meeting["id"]
+        lines = [f"Speaker{i % 5}: Item {i} covers the budget, the roadmap and the hiring plan." for i in range(200)]
+        await client.post(f"/meetings/{mid}/artifacts/text", json={"text": "\n".join(lines)})
+
+        sem = asyncio.Semaphore(args.concurrency)
+        chat_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        done = asyncio.Event()
+
+        async def chat(i: int):
+            async with sem:
+                started = time.perf_counter()
+                # Distinct questions so the LLM cache does not short-circuit the provider
+                r = await client.post(f"/meetings/{mid}/chat", json={"question": f"What about item {i} and the budget?"})
+                r.raise_for_status()
+                chat_latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(chat(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "provider_latency_s": args.latency,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "chat": summarize(chat_latencies),
+        "event_loop_probe": summarize(probe_latencies),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /chat load test")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated model call latency in seconds")
+    args = parser.parse_args()
+
+    # Throwaway database and caches so the benchmark never touches real data
+    workdir = tempfile.mkdtemp(prefix="chat-load-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{workdir}/bench.db")
+    os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+    os.environ.setdefault("LLM_PROVIDER", "stub")
+    os.environ.setdefault("LLM_RATE_LIMIT_ENABLED", "0")  # measure the app, not the quota
+    os.environ.setdefault("SEMANTIC_INDEX_DIR", f"{workdir}/semantic_index")
+    os.environ.setdefault("TTS_CACHE_DIR", f"{workdir}/tts_cache")
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/fake_llm.py
+# A model provider that behaves like a remote model without the network: each call waits a fixed
+# latency plus its output length at a fixed token rate, reports token usage, and a configurable
+# share of calls fail. Output, timing and which calls fail depend only on the prompts and the call
+# order, so two runs with the same settings do the same work.
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+
+from app.llm_provider import StubProvider, StubResponse
+
+VOCABULARY = (
+    "budget roadmap hiring launch review customer release design metrics onboarding pricing "
+    "migration security backlog deadline vendor training support contract forecast"
+).split()
+
+class FakeProviderError(Exception):
+    """Injected failure; ``code`` 429 makes the rate limiter retry it like a quota error."""
+
+    def __init__(self, message: str, code: int = 500):
+        super().__init__(message)
+        self.code = code
+
+class FakeProvider(StubProvider):
+    name = "fake"
+
+    def __init__(self, latency: float = 0.2, tokens_per_second: float = 200.0, output_tokens: int = 120,
+                 failure_rate: float = 0.0, failure_code: int = 500):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.failure_rate = failure_rate
+        self.failure_code = failure_code
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        return "fake"
+
+    def _words(self, prompt: str, n: int) -> list[str]:
+        seed = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return [VOCABULARY[seed[i % len(seed)] * (i + 1) % len(VOCABULARY)] for i in range(n)]
+
+    def respond(self, prompt: str, json_output: bool) -> str:
+        text = super().respond(prompt, json_output)
+        if text != "Stub response.":
+            return text  # JSON extraction output
+        words = self._words(prompt, self.output_tokens)
+        if prompt.startswith("Transcribe"):
+            # Speaker lines, so timelines and retrieval have something to parse
+            return "\n".join(f"Speaker{i % 3} (Member): " + " ".join(words[i:i + 12]) + "."
+                             for i in range(0, len(words), 12))
+        return " ".join(words).capitalize() + "."
+
+    def _begin(self) -> None:
+        """Count the call and raise if it is one of the injected failures (evenly spread)."""
+        with self._lock:
+            n = self.calls
+            self.calls += 1
+            fail = int((n + 1) * self.failure_rate) > int(n * self.failure_rate)
+            if fail:
+                self.failures += 1
+        if fail:
+            time.sleep(self.latency)
+            raise FakeProviderError(f"injected failure on call {n}", self.failure_code)
+
+    def _response(self, contents, kwargs) -> StubResponse:
+        response = super().generate_content(contents, **kwargs)
+        parts = contents if isinstance(contents, list) else [contents]
+        prompt_tokens = sum(len(p) for p in parts if isinstance(p, str)) // 4
+        output_tokens = len(response.text.split())
+        response.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+        return response
+
+    def generate_content(self, contents, **kwargs):
+        self._begin()
+        response = self._response(contents, kwargs)
+        time.sleep(self.latency + response.usage_metadata.candidates_token_count / self.tokens_per_second)
+        return response
+
+    def generate_content_stream(self, contents, **kwargs):
+        self._begin()
+        response = self._response(contents, kwargs)
+        time.sleep(self.latency)
+        words = response.text.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(1 / self.tokens_per_second)
+            last = i == len(words) - 1
+            yield StubResponse(word if i == 0 else " " + word, response.usage_metadata if last else None)
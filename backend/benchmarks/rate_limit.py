@@ -0,0 +1,100 @@
+# benchmarks/rate_limit.py
+# Bursty load against the shared LLM rate limiter with a simulated provider that enforces a
+# per-minute request quota over a sliding window and answers 429 when it is exceeded.
+# A batch burst is fired together with a trickle of interactive calls; reports throughput as a
+# share of the quota, how many calls were throttled, and queue wait per lane.
+#
+#   cd backend && python -m benchmarks.rate_limit --rpm 60 --batch 120 --interactive 20
+import argparse
+import collections
+import json
+import threading
+import time
+
+from benchmarks.chat_load import percentile
+
+class QuotaExceeded(Exception):
+    code = 429
+
+class SimulatedQuota:
+    """Admits at most ``rpm`` calls in any ``window`` seconds."""
+
+    def __init__(self, rpm: float, window: float, latency: float):
+        self.rpm = rpm
+        self.window = window
+        self.latency = latency
+        self.calls = collections.deque()
+        self.lock = threading.Lock()
+
+    def generate(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.calls and self.calls[0] <= now - self.window:
+                self.calls.popleft()
+            if len(self.calls) >= self.rpm:
+                raise QuotaExceeded("429 quota exceeded")
+            self.calls.append(now)
+        time.sleep(self.latency)
+        return None
+
+def run(args, limited: bool) -> dict:
+    from app import rate_limit
+
+    # Compress a minute into args.window seconds so the run stays short
+    scale = 60.0 / args.window
+    rate_limit.LLM_RETRY_BASE_SECONDS = 0.2
+    quota = SimulatedQuota(args.rpm, args.window, args.latency)
+    limiter = (
+        rate_limit.LLMRateLimiter(args.rpm, 1e12, rate_limit.LLM_BURST_SECONDS / scale,
+                                  args.concurrency, 1, window=args.window)
+        if limited else rate_limit.NullRateLimiter()
+    )
+    waits = {"interactive": [], "batch": []}
+    outcomes = collections.Counter()
+
+    def one(priority: int, lane: str, delay: float):
+        time.sleep(delay)
+        started = time.perf_counter()
+        try:
+            limiter.call(quota.generate, 100, priority)
+            outcomes["ok"] += 1
+        except QuotaExceeded:
+            outcomes["failed"] += 1
+        waits[lane].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=one, args=(rate_limit.BATCH, "batch", 0.0)) for _ in range(args.batch)]
+    threads += [
+        threading.Thread(target=one, args=(rate_limit.INTERACTIVE, "interactive", i * args.window / args.interactive))
+        for i in range(args.interactive)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    stats = limiter.stats()
+    return {
+        "ok": outcomes["ok"],
+        "failed": outcomes["failed"],
+        "throttled": stats.get("throttled", "n/a"),
+        "quota_used_pct": round(100 * outcomes["ok"] / (args.rpm * elapsed / args.window), 1),
+        "elapsed_s": round(elapsed, 2),
+        **{f"{lane}_p50_ms": round(percentile(v, 50) * 1000, 1) for lane, v in waits.items() if v},
+        **{f"{lane}_p95_ms": round(percentile(v, 95) * 1000, 1) for lane, v in waits.items() if v},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM rate limiter under a bursty load")
+    parser.add_argument("--rpm", type=int, default=60, help="simulated requests-per-minute quota")
+    parser.add_argument("--window", type=float, default=6.0, help="seconds standing in for one minute")
+    parser.add_argument("--batch", type=int, default=120)
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    print(json.dumps({"unlimited": run(args, False), "limited": run(args, True)}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/startup.py
+# Measure cold start of the API: time to import app.main and time to the first request.
+# Each run is a fresh interpreter, so module caches do not carry over.
+#
+#   cd backend && python -m benchmarks.startup --runs 5 [--provider stub]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+status = client.get("/").status_code
+t2 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "first_request_s": t2 - t1, "total_s": t2 - t0, "status": status}))
+"""
+
+def run_once(env: dict) -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--provider", default=None, help="LLM_PROVIDER to use (default: from environment)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.provider:
+        env["LLM_PROVIDER"] = args.provider
+    runs = [run_once(env) for _ in range(args.runs)]
+    report = {"runs": args.runs, "provider": env.get("LLM_PROVIDER", "gemini")}
+    for key in ("import_s", "first_request_s", "total_s"):
+        values = [r[key] for r in runs]
+        report[key] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# benchmarks/suite.py
+# End-to-end benchmark suite: runs the API in-process (with its job workers) against the fake model
+# provider in benchmarks/fake_llm.py and an instant TTS renderer, on a throwaway database, upload
+# directory and caches. Prints one JSON report: latency percentiles, throughput and errors per
+# scenario, and the process's peak RSS.
+#
+# Pass --baseline with an earlier report to flag scenarios whose p95 latency or throughput got
+# worse by more than --tolerance; the exit status is then 1.
+#
+#   cd backend && python -m benchmarks.suite --output bench.json
+#   cd backend && python -m benchmarks.suite --baseline bench.json
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks.chat_load import summarize
+
+SCENARIOS = ("create_meeting", "bulk_participants", "text_upload", "audio_upload", "process", "chat", "avatar")
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KiB on Linux
+
+def transcript_lines(n: int, seed: int) -> str:
+    rng = random.Random(seed)
+    topics = ["the budget", "the roadmap", "hiring", "the launch", "customer feedback", "the vendor contract"]
+    return "\n".join(
+        f"Speaker{rng.randrange(5)} (Member): Item {i} is about {rng.choice(topics)} and {rng.choice(topics)}."
+        for i in range(n)
+    )
+
+async def measure(requests: int, concurrency: int, call) -> dict:
+    """Run ``await call(i)`` for i in range(requests), at most ``concurrency`` at a time."""
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with sem:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        **(summarize(latencies) if latencies else {}),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+async def run(args) -> dict:
+    import httpx
+    from app import jobs, llm_provider, tts
+    from app.main import app
+    from benchmarks.fake_llm import FakeProvider
+
+    provider = FakeProvider(args.latency, args.tokens_per_second, args.output_tokens, args.failure_rate,
+                            args.failure_code)
+    llm_provider.set_provider(provider)
+
+    def synthesize(text: str, voice: str, out_path):
+        time.sleep(args.tts_latency)
+        out_path.write_bytes(b"ID3" + text.encode("utf-8"))
+
+    tts._synthesize = synthesize  # gTTS needs the network
+    jobs.JOB_POLL_SECONDS = 0.05
+
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def post(url: str, **kwargs) -> dict:
+            r = await client.post(url, **kwargs)
+            r.raise_for_status()
+            return r.json()
+
+        async def new_meeting(title: str) -> str:
+            return (await post("/meetings", json={"title": title, "date": "2024-01-01", "created_by": "bench"}))["id"]
+
+        n, c = args.requests, args.concurrency
+        selected = [s for s in SCENARIOS if not args.scenarios or s in args.scenarios]
+
+        if "create_meeting" in selected:
+            results["create_meeting"] = await measure(n, c, lambda i: new_meeting(f"bench {i}"))
+
+        if "bulk_participants" in selected:
+            mids = [await new_meeting(f"participants {i}") for i in range(n)]
+            people = [{"name": f"Person {j}", "role": "Member", "email": f"p{j}@example.com"}
+                      for j in range(args.participants)]
+            results["bulk_participants"] = await measure(
+                n, c, lambda i: post(f"/meetings/{mids[i]}/participants", json=people))
+            results["bulk_participants"]["participants_per_request"] = args.participants
+
+        if "text_upload" in selected:
+            mid = await new_meeting("text upload")
+            results["text_upload"] = await measure(
+                n, c, lambda i: post(f"/meetings/{mid}/artifacts/text",
+                                     json={"text": transcript_lines(args.transcript_lines, seed=i)}))
+
+        if "audio_upload" in selected:
+            mid = await new_meeting("audio upload")
+            blobs = [random.Random(i).randbytes(args.audio_kb * 1024) for i in range(n)]
+            results["audio_upload"] = await measure(
+                n, c, lambda i: post(f"/meetings/{mid}/artifacts/audio",
+                                     files={"file": (f"bench-{i}.mp3", blobs[i], "audio/mpeg")}))
+            results["audio_upload"]["bytes_per_request"] = args.audio_kb * 1024
+
+        if "process" in selected:
+            mids = []
+            for i in range(args.process_meetings):
+                mid = await new_meeting(f"process {i}")
+                await post(f"/meetings/{mid}/artifacts/text", json={"text": transcript_lines(args.transcript_lines, seed=1000 + i)})
+                await post(f"/meetings/{mid}/artifacts/audio",
+                           files={"file": (f"process-{i}.mp3", random.Random(1000 + i).randbytes(4096), "audio/mpeg")})
+                mids.append(mid)
+
+            async def process(i: int):
+                job = await post(f"/meetings/{mids[i]}/process")
+                while True:
+                    r = await client.get(f"/meetings/{mids[i]}/jobs/{job['job_id']}")
+                    status = r.json()["status"]
+                    if status == "succeeded":
+                        return
+                    if status == "failed":
+                        raise RuntimeError(f"processing job {job['job_id']} failed")
+                    await asyncio.sleep(0.02)
+
+            results["process"] = await measure(args.process_meetings, jobs.JOB_WORKERS, process)
+            results["process"]["job_workers"] = jobs.JOB_WORKERS
+
+        if "chat" in selected:
+            mid = await new_meeting("chat")
+            await post(f"/meetings/{mid}/artifacts/text", json={"text": transcript_lines(args.transcript_lines, seed=7)})
+            # Distinct questions so neither cache short-circuits the provider
+            results["chat"] = await measure(
+                n, args.chat_concurrency,
+                lambda i: post(f"/meetings/{mid}/chat", json={"question": f"What about item {i} and the budget?"}))
+
+        if "avatar" in selected:
+            mid = await new_meeting("avatar")
+            await post(f"/meetings/{mid}/summary", json={"text": "The team agreed on the budget and the launch date."})
+            started = time.perf_counter()
+            (await client.get(f"/meetings/{mid}/avatar")).raise_for_status()
+            first_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            async def avatar(i: int):
+                r = await client.get(f"/meetings/{mid}/avatar")
+                r.raise_for_status()
+
+            results["avatar"] = await measure(n, c, avatar)
+            results["avatar"]["first_request_ms"] = first_ms
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("baseline", "output")},
+        "provider": {"calls": provider.calls, "injected_failures": provider.failures},
+        "scenarios": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Scenarios whose p95 latency rose, or throughput fell, by more than ``tolerance`` (a fraction)."""
+    found = []
+    for name, now in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        if before.get("p95_ms") and now.get("p95_ms", float("inf")) > before["p95_ms"] * (1 + tolerance):
+            found.append({"scenario": name, "metric": "p95_ms", "baseline": before["p95_ms"], "current": now.get("p95_ms")})
+        if before.get("throughput_rps") and now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            found.append({"scenario": name, "metric": "throughput_rps",
+                          "baseline": before["throughput_rps"], "current": now["throughput_rps"]})
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end API benchmarks")
+    parser.add_argument("--scenarios", nargs="*", choices=SCENARIOS, help="default: all")
+    parser.add_argument("--requests", type=int, default=50, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--chat-concurrency", type=int, default=20)
+    parser.add_argument("--process-meetings", type=int, default=6)
+    parser.add_argument("--participants", type=int, default=50, help="participants per bulk request")
+    parser.add_argument("--transcript-lines", type=int, default=200)
+    parser.add_argument("--audio-kb", type=int, default=512)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model latency per call, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="fake model output rate")
+    parser.add_argument("--output-tokens", type=int, default=120, help="fake model output length")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of model calls that fail")
+    parser.add_argument("--failure-code", type=int, default=500, help="429 to exercise rate-limiter retries")
+    parser.add_argument("--tts-latency", type=float, default=0.05)
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Throwaway database, uploads and caches (uploads go under the working directory), so the
+    # suite never touches real data; no rate limiting, since the fake provider has no quota
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = json.loads(open(args.baseline).read()) if args.baseline else None
+    workdir = tempfile.mkdtemp(prefix="bench-suite-")
+    os.chdir(workdir)
+    # Paths always point into workdir, even if the environment (or .env) names real ones
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["LLM_CACHE_PATH"] = f"{workdir}/llm_cache.db"
+    os.environ["SEMANTIC_INDEX_DIR"] = f"{workdir}/semantic_index"
+    os.environ["TTS_CACHE_DIR"] = f"{workdir}/tts_cache"
+    os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+    os.environ.setdefault("LLM_PROVIDER", "stub")
+    os.environ.setdefault("LLM_RATE_LIMIT_ENABLED", "0")
+    os.environ.setdefault("JOB_WORKER_MODE", "thread")
+
+    report = asyncio.run(run(args))
+    if baseline is not None:
+        report["regressions"] = regressions(report, baseline, args.tolerance)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    sys.exit(1 if report.get("regressions") else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,15 @@
 # cleanup_artifacts.py
+# Remove duplicate artifacts. Usage: python cleanup_artifacts.py [meeting_id]
+# (all meetings when no id is given; same as POST /admin/artifacts/cleanup)
+import sys
+
 from app.db import SessionLocal
-from app import models
+from app.artifacts import dedupe_artifacts
 
 db = SessionLocal()
-meeting_id = "d0c9bd96-b609-4420-a6bf-0004c6059d81"
-artifacts = db.query(models.Artifact).filter_by(meeting_id=meeting_id).all()
-seen = set()
-keepers = []
-for a in artifacts:
-    if a.transcript_text not in seen:
-        seen.add(a.transcript_text)
-        keepers.append(a.id)
-    else:
-        db.delete(a)
-db.commit()
+meeting_id = sys.argv[1] if len(sys.argv) > 1 else None
+removed = dedupe_artifacts(db, meeting_id)
 db.close()
-print(f"Kept artifacts: {keepers}")
+for mid, count in removed.items():
+    print(f"Meeting {mid}: removed {count} duplicate artifacts")
 print("Duplicate artifacts removed.")
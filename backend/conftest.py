@@ -0,0 +1,71 @@
+# conftest.py
+# Tests run against a throwaway SQLite database, caches and upload directory, with the offline stub
+# model backend. Settings are read when app modules are imported, so they are set here, first.
+import os
+import tempfile
+from datetime import date
+
+_workdir = tempfile.mkdtemp(prefix="meetings-tests-")
+os.chdir(_workdir)  # uploads and static files are written under the working directory
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_workdir}/test.db",
+    "LLM_PROVIDER": "stub",
+    "LLM_CACHE_ENABLED": "1",
+    "LLM_CACHE_PATH": f"{_workdir}/llm_cache.db",
+    "LLM_RATE_LIMIT_ENABLED": "0",
+    "JOB_WORKER_MODE": "external",
+    "SEMANTIC_INDEX_DIR": f"{_workdir}/semantic_index",
+    "TTS_CACHE_DIR": f"{_workdir}/tts_cache",
+    "GEMINI_MODEL_CACHE_PATH": f"{_workdir}/gemini_model",
+})
+
+# Only now import the app, which reads the settings above
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.db import SessionLocal
+from app.llm_provider import StubProvider, get_provider, set_provider
+from app.main import app
+
+# Manual scripts, not tests: they print the local .env and create tables in the configured database
+collect_ignore = ["app/test_db.py", "app/test_env.py"]
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def meeting(db):
+    row = models.Meeting(title="Weekly sync", date=date(2026, 1, 5), created_by="tests")
+    db.add(row)
+    db.commit()
+    return row
+
+class ScriptedProvider(StubProvider):
+    """The stub backend, recording each prompt; ``replies`` maps a prompt substring to a canned response."""
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.replies: dict[str, str] = {}
+
+    def respond(self, prompt: str, json_output: bool) -> str:
+        self.prompts.append(prompt)
+        for needle, reply in self.replies.items():
+            if needle in prompt:
+                return reply
+        return super().respond(prompt, json_output)
+
+@pytest.fixture
+def provider():
+    """A fresh ScriptedProvider as the model backend. The LLM cache is shared, so tests use unique inputs."""
+    previous = get_provider()
+    scripted = ScriptedProvider()
+    set_provider(scripted)
+    yield scripted
+    set_provider(previous)
@@ -0,0 +1,39 @@
+import uuid
+
+from app import models
+from app.artifacts import dedupe_artifacts
+
+def add(db, meeting, transcript=None, content_hash=None, kind=models.ArtifactKind.audio):
+    artifact = models.Artifact(meeting_id=meeting.id, kind=kind, transcript_text=transcript, content_hash=content_hash)
+    db.add(artifact)
+    db.commit()
+    return artifact.id
+
+def remaining(db, meeting):
+    db.expire_all()
+    return {a.id for a in db.query(models.Artifact).filter_by(meeting_id=meeting.id)}
+
+def test_same_file_or_transcript_is_removed(db, meeting):
+    first = add(db, meeting, "Alice: hello", content_hash="a" * 64)
+    add(db, meeting, "Alice: hello again", content_hash="a" * 64)
+    add(db, meeting, "Alice: hello", content_hash="b" * 64)
+    text = add(db, meeting, "Bob: notes", kind=models.ArtifactKind.text)
+    add(db, meeting, "Bob: notes", kind=models.ArtifactKind.text)
+
+    assert dedupe_artifacts(db, meeting.id) == {meeting.id: 3}
+    assert remaining(db, meeting) == {first, text}
+
+def test_failed_uploads_of_different_files_both_survive(db, meeting):
+    failed = "Audio transcription failed: 503 service unavailable"
+    kept = {add(db, meeting, failed, content_hash=uuid.uuid4().hex * 2) for _ in range(2)}
+    assert dedupe_artifacts(db, meeting.id) == {}
+    assert remaining(db, meeting) == kept
+
+def test_cleanup_is_scoped_to_each_meeting(db, meeting, client):
+    other = models.Meeting(title="Retro", created_by="tests")
+    db.add(other)
+    db.commit()
+    add(db, meeting, "Shared notes", kind=models.ArtifactKind.text)
+    add(db, other, "Shared notes", kind=models.ArtifactKind.text)
+    assert client.post("/admin/artifacts/cleanup").json()["meetings"].get(meeting.id) is None
+    assert len(remaining(db, meeting)) == len(remaining(db, other)) == 1
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import httpx
+
+from app.db import to_async_url
+from app.main import app
+
+def test_async_driver_is_derived_from_the_sync_url():
+    assert to_async_url("sqlite:///./meeting.db") == "sqlite+aiosqlite:///./meeting.db"
+    assert to_async_url("postgresql://u:p@db/meetings") == "postgresql+asyncpg://u:p@db/meetings"
+    assert to_async_url("postgres://u:p@db/meetings") == "postgresql+asyncpg://u:p@db/meetings"
+
+def test_slow_model_calls_do_not_block_the_event_loop(client, meeting, provider, monkeypatch):
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": "Alice: the budget is approved.\nBob: hiring starts in May."})
+    respond = provider.respond
+
+    def slow(prompt, json_output):
+        time.sleep(0.3)  # blocking, like the real SDK
+        return respond(prompt, json_output)
+
+    monkeypatch.setattr(provider, "respond", slow)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            async def probe():
+                await asyncio.sleep(0.1)
+                started = time.perf_counter()
+                await http.get("/")
+                return time.perf_counter() - started
+
+            questions = [f"What about the budget, part {i}?" for i in range(5)]
+            started = time.perf_counter()
+            *answers, probe_seconds = await asyncio.gather(
+                *(http.post(f"/meetings/{meeting.id}/chat", json={"question": q}) for q in questions), probe())
+            return time.perf_counter() - started, answers, probe_seconds
+
+    elapsed, answers, probe_seconds = asyncio.run(run())
+    assert all(r.status_code == 200 for r in answers)
+    assert elapsed < 5 * 0.3  # the five calls overlapped
+    assert probe_seconds < 0.2  # GET / was answered while the calls were in flight
+
+def test_process_enqueues_once(client, meeting):
+    first = client.post(f"/meetings/{meeting.id}/process").json()
+    again = client.post(f"/meetings/{meeting.id}/process").json()
+    assert first["status"] == "processing started"
+    assert again["status"] == "processing already in progress" and again["job_id"] == first["job_id"]
+    assert client.post("/meetings/missing/process").status_code == 404
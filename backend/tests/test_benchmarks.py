@@ -0,0 +1,39 @@
+from benchmarks.chat_load import percentile
+from benchmarks.fake_llm import FakeProvider, FakeProviderError
+
+def test_fake_provider_is_deterministic_and_reports_usage():
+    prompt = "Summarize the planning notes"
+    first = FakeProvider(latency=0, tokens_per_second=1e9, output_tokens=30).generate_content(prompt)
+    second = FakeProvider(latency=0, tokens_per_second=1e9, output_tokens=30).generate_content(prompt)
+
+    assert first.text == second.text
+    assert len(first.text.split()) == 30
+    assert first.usage_metadata.candidates_token_count == 30
+    assert first.usage_metadata.total_token_count == first.usage_metadata.prompt_token_count + 30
+
+def test_injected_failures_are_spread_evenly():
+    fake = FakeProvider(latency=0, tokens_per_second=1e9, failure_rate=0.25, failure_code=429)
+    outcomes = []
+    for i in range(8):
+        try:
+            fake.generate_content(f"call {i}")
+            outcomes.append("ok")
+        except FakeProviderError as e:
+            assert e.code == 429
+            outcomes.append("fail")
+
+    assert outcomes == ["ok", "ok", "ok", "fail"] * 2
+    assert (fake.calls, fake.failures) == (8, 2)
+
+def test_stream_yields_the_full_text_with_usage_on_the_last_chunk():
+    fake = FakeProvider(latency=0, tokens_per_second=1e9, output_tokens=12)
+    chunks = list(fake.generate_content_stream("Describe the launch"))
+
+    assert "".join(c.text for c in chunks) == fake.generate_content("Describe the launch").text
+    assert [c.usage_metadata is not None for c in chunks] == [False] * (len(chunks) - 1) + [True]
+
+def test_percentile_picks_the_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 51.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
@@ -0,0 +1,50 @@
+from sqlalchemy import event
+
+from app import models
+from app.bulk import upsert_rows
+from app.db import engine
+
+def count_inserts(statements):
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+    return listener
+
+def test_a_batch_is_one_insert_returning_rows_in_order(client, meeting):
+    statements = []
+    listener = count_inserts(statements)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        resp = client.post(f"/meetings/{meeting.id}/participants", json=[{"name": f"P{i}"} for i in range(25)])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert resp.status_code == 201
+    assert [p["name"] for p in resp.json()] == [f"P{i}" for i in range(25)]
+    assert len(statements) == 1
+
+def test_reimporting_by_id_updates_in_place(client, meeting):
+    url = f"/meetings/{meeting.id}/action-items"
+    [item] = client.post(url, json=[{"task": "Draft the plan"}]).json()
+    client.patch(f"{url}/{item['id']}", json={"status": "done"})
+
+    [updated] = client.post(url, json=[{"id": item["id"], "task": "Draft the plan", "owner": "Alice"}]).json()
+    assert updated["id"] == item["id"] and updated["owner"] == "Alice"
+    assert updated["status"] == "done"  # an update keeps the item's status
+    assert len(client.get(url).json()) == 1
+
+def test_ids_cannot_move_rows_between_meetings(client, db, meeting):
+    other = models.Meeting(title="Retro", created_by="tests")
+    db.add(other)
+    db.commit()
+    [decision] = client.post(f"/meetings/{other.id}/decisions", json=[{"text": "Keep retros short"}]).json()
+
+    resp = client.post(f"/meetings/{meeting.id}/decisions", json=[{"id": decision["id"], "text": "Hijacked"}])
+    assert resp.json() == []
+    assert client.get(f"/meetings/{other.id}/decisions").json()[0]["text"] == "Keep retros short"
+
+def test_rows_without_update_columns_are_kept(db, meeting):
+    [row] = upsert_rows(db, models.Decision, [{"meeting_id": meeting.id, "text": "Original"}], update_columns=())
+    again = upsert_rows(db, models.Decision, [{"id": row["id"], "meeting_id": meeting.id, "text": "Changed"}], update_columns=())
+    db.commit()
+    assert again == []
+    assert db.get(models.Decision, row["id"]).text == "Original"
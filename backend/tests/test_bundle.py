@@ -0,0 +1,25 @@
+def test_bundle_has_every_section_without_transcripts(client, meeting):
+    client.post(f"/meetings/{meeting.id}/participants", json=[{"name": "Alice"}])
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": "Alice: hello"})
+    client.post(f"/meetings/{meeting.id}/decisions", json=[{"text": "Ship it"}])
+
+    bundle = client.get(f"/meetings/{meeting.id}/bundle").json()
+    assert bundle["title"] == "Weekly sync"
+    assert [p["name"] for p in bundle["participants"]] == ["Alice"]
+    assert [d["text"] for d in bundle["decisions"]] == ["Ship it"]
+    assert len(bundle["artifacts"]) == 1 and "transcript_text" not in bundle["artifacts"][0]
+    assert bundle["summaries"] == [] and bundle["action_items"] == []
+
+def test_unchanged_bundle_revalidates_with_304(client, meeting):
+    url = f"/meetings/{meeting.id}/bundle"
+    etag = client.get(url).headers["etag"]
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["etag"] == etag
+
+    client.post(f"/meetings/{meeting.id}/action-items", json=[{"task": "Book the room"}])
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert [a["task"] for a in changed.json()["action_items"]] == ["Book the room"]
+
+def test_missing_meeting(client):
+    assert client.get("/meetings/missing/bundle").status_code == 404
@@ -0,0 +1,50 @@
+import threading
+import uuid
+
+from app import chat, models
+
+def new_session(client, meeting):
+    resp = client.post(f"/meetings/{meeting.id}/chat/sessions")
+    assert resp.status_code == 201
+    return resp.json()["id"]
+
+def test_follow_up_questions_see_the_conversation(client, meeting, provider):
+    topic = uuid.uuid4().hex
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": f"Alice: the {topic} budget is 10k.\nBob: hiring starts in May."})
+    sid = new_session(client, meeting)
+    first = client.post(f"/meetings/{meeting.id}/chat", json={"question": f"What is the {topic} budget?", "session_id": sid})
+    assert first.json()["session_id"] == sid
+    client.post(f"/meetings/{meeting.id}/chat", json={"question": "And when does hiring start?", "session_id": sid})
+
+    assert f"User: What is the {topic} budget?" in provider.prompts[-1]
+    turns = client.get(f"/meetings/{meeting.id}/chat/sessions/{sid}").json()["turns"]
+    assert [(t["position"], t["question"]) for t in turns] == [
+        (0, f"What is the {topic} budget?"), (1, "And when does hiring start?"),
+    ]
+
+def test_unknown_session(client, meeting):
+    resp = client.post(f"/meetings/{meeting.id}/chat", json={"question": "Hi?", "session_id": "missing"})
+    assert resp.status_code == 404
+    assert client.get(f"/meetings/{meeting.id}/chat/sessions/missing").status_code == 404
+
+def test_concurrent_answers_get_distinct_positions(db, meeting):
+    session = chat.create_session(db, meeting.id)
+    threads = [threading.Thread(target=chat.record_turn, args=(session.id, f"Q{i}", f"A{i}")) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    positions = [t.position for t in db.query(models.ChatTurn).filter_by(session_id=session.id)]
+    assert sorted(positions) == list(range(8))
+
+def test_old_turns_are_folded_into_the_summary(db, meeting, provider, monkeypatch):
+    monkeypatch.setattr(chat, "CHAT_HISTORY_TURNS", 2)
+    monkeypatch.setattr(chat, "CHAT_SUMMARY_BATCH", 1)
+    session = chat.create_session(db, meeting.id)
+    for i in range(4):
+        chat.record_turn(session.id, f"Question {i} {uuid.uuid4().hex}", f"Answer {i}")
+
+    chat.compact_history(session.id)
+    db.refresh(session)
+    assert session.summarized_turns == 2 and session.history_summary
+    assert [t.position for t in chat.recent_turns(db, session)] == [2, 3]
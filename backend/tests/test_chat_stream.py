@@ -0,0 +1,61 @@
+import asyncio
+import json
+import uuid
+
+from app.main import _stream_events
+
+def events(body: str) -> list[tuple[str, dict]]:
+    parsed = []
+    for frame in body.strip().split("\n\n"):
+        event, data = "message", ""
+        for line in frame.split("\n"):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data += line[len("data: "):]
+        parsed.append((event, json.loads(data)))
+    return parsed
+
+def test_answer_streams_as_sources_deltas_and_done(client, meeting, provider):
+    topic = uuid.uuid4().hex
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": f"Alice: the {topic} launch is on Friday."})
+    provider.replies[topic] = "The launch is on Friday."
+    resp = client.post(f"/meetings/{meeting.id}/chat/stream", json={"question": f"When is the {topic} launch?"})
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    parsed = events(resp.text)
+    assert parsed[0][0] == "sources" and parsed[0][1][0]["speaker"] == "Alice"
+    deltas = [data["delta"] for event, data in parsed[1:-1]]
+    assert len(deltas) == 5 and "".join(deltas) == "The launch is on Friday."
+    assert parsed[-1] == ("done", {"answer": "The launch is on Friday."})
+
+    # The finished answer was cached: a repeat arrives as one chunk without a model call
+    provider.prompts.clear()
+    again = events(client.post(f"/meetings/{meeting.id}/chat/stream", json={"question": f"When is the {topic} launch?"}).text)
+    assert [data["delta"] for _, data in again[1:-1]] == ["The launch is on Friday."] and provider.prompts == []
+
+def test_disconnect_closes_the_answer_stream():
+    closed = []
+
+    def chunks():
+        try:
+            yield from ["one", " two", " three"]
+        finally:
+            closed.append(True)
+
+    class GoneAfterFirstChunk:
+        calls = 0
+
+        async def is_disconnected(self):
+            self.calls += 1
+            return self.calls > 1
+
+    async def collect():
+        return [frame async for frame in _stream_events(GoneAfterFirstChunk(), chunks(), [])]
+
+    frames = asyncio.run(collect())
+    assert len(frames) == 2  # sources and the first delta, no done event
+    assert closed == [True]
+
+def test_missing_meeting(client):
+    assert client.post("/meetings/missing/chat/stream", json={"question": "Anyone?"}).status_code == 404
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+from app import db as database
+from app.db import SessionLocal, engine_options, pool_stats
+
+def pragma(name):
+    with SessionLocal() as session:
+        return session.execute(text(f"PRAGMA {name}")).scalar()
+
+def test_sqlite_connections_get_the_tuned_pragmas():
+    assert pragma("journal_mode") == "wal"
+    assert pragma("synchronous") == 1  # NORMAL
+    assert pragma("busy_timeout") == database.SQLITE_BUSY_TIMEOUT_MS
+    assert pragma("cache_size") == -database.SQLITE_CACHE_SIZE_KB
+
+def test_pool_options_follow_the_database():
+    assert engine_options("sqlite:///:memory:") == {}
+    options = engine_options("sqlite:///./meeting.db")
+    assert options["pool_size"] == database.DB_POOL_SIZE and "pool_recycle" not in options
+
+def test_pool_stats_track_checkouts(client):
+    before = pool_stats()["sync"]["checkouts"]
+    with SessionLocal() as session:
+        session.execute(text("SELECT 1"))
+        assert pool_stats()["sync"]["checked_out"] >= 1
+    stats = client.get("/admin/db/pool").json()
+    assert stats["sync"]["checkouts"] > before
+    assert set(stats) == {"sync", "async", "sqlite"}
+    assert stats["sqlite"]["journal_mode"] == database.SQLITE_JOURNAL_MODE
@@ -0,0 +1,37 @@
+import uuid
+
+from app import llm
+
+def transcript(*lines):
+    # Unique per test, so the shared LLM cache never answers from an earlier test
+    return "\n".join([*lines, f"(meeting {uuid.uuid4()})"])
+
+def test_one_call_extracts_all_outputs(provider):
+    outputs = llm.extract_meeting_outputs(transcript("Alice: we ship on Friday."), ["Alice"])
+    assert len(provider.prompts) == 1
+    assert outputs == {"summary": "Stub summary of the meeting.", "decisions": [], "action_items": []}
+
+def test_malformed_fields_fall_back_to_their_own_generator(provider):
+    provider.replies["single JSON object"] = '{"summary": "Shipping Friday.", "decisions": "not a list", "action_items": []}'
+    provider.replies["key decisions"] = '["Ship on Friday"]'
+    outputs = llm.extract_meeting_outputs(transcript("Alice: we ship on Friday."), ["Alice"])
+    assert outputs["summary"] == "Shipping Friday."
+    assert outputs["decisions"] == ["Ship on Friday"]
+    assert len(provider.prompts) == 2
+
+def test_invalid_action_items_are_dropped(provider):
+    provider.replies["single JSON object"] = (
+        '{"summary": "s", "decisions": [], "action_items": [{"task": "Write notes", "owner": "Bob", '
+        '"due_date": "2026-03-01", "dependencies": []}, {"owner": "no task"}]}'
+    )
+    outputs = llm.extract_meeting_outputs(transcript("Bob: I will write notes."), ["Bob"])
+    assert [a["task"] for a in outputs["action_items"]] == ["Write notes"]
+
+def test_fenced_json_parses_fresh_and_from_cache(provider):
+    provider.replies["key decisions"] = '```json\n["Hire two engineers"]\n```'
+    provider.replies["Extract action items"] = '```json\n[{"task": "Post the job", "owner": "Carol", "due_date": null}]\n```'
+    text = transcript("Carol: we will hire two engineers.")
+    for _ in range(2):
+        assert llm.generate_decisions(text) == ["Hire two engineers"]
+        assert [a["task"] for a in llm.generate_action_items(text, ["Carol"])] == ["Post the job"]
+    assert len(provider.prompts) == 2  # the second round was served from the cache
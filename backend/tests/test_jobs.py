@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+
+from app import jobs, models
+from app.schemas import ExtractionMode
+
+@pytest.fixture(autouse=True)
+def empty_queue(db):
+    # claim_next takes any runnable job, so each test starts from an empty queue
+    db.query(models.ProcessingJob).delete()
+    db.commit()
+
+def job_row(db, job_id):
+    db.expire_all()
+    return db.get(models.ProcessingJob, job_id)
+
+def test_enqueue_joins_the_active_job(db, meeting):
+    job, created = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    assert created and job.status == models.JobStatus.queued
+    again, created = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    assert not created and again.id == job.id
+
+def test_refresh_upgrades_a_queued_job(db, meeting):
+    job, _ = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    joined, created = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single, refresh=True)
+    assert not created and joined.id == job.id
+    assert job_row(db, job.id).full_refresh
+
+def test_only_one_worker_claims_a_job(db, meeting):
+    job, _ = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    assert jobs.claim_next("worker-a") == job.id
+    assert jobs.claim_next("worker-b") is None
+    row = job_row(db, job.id)
+    assert row.status == models.JobStatus.running and row.lease_owner == "worker-a" and row.attempts == 1
+
+def test_expired_lease_is_reclaimed_and_fences_the_old_worker(db, meeting):
+    job, _ = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    jobs.claim_next("worker-a")
+    row = job_row(db, job.id)
+    row.lease_expires_at = jobs.utcnow() - timedelta(seconds=1)  # worker-a stopped heartbeating
+    db.commit()
+
+    assert jobs.claim_next("worker-b") == job.id
+    assert job_row(db, job.id).attempts == 2
+    assert not jobs._record(job.id, "worker-a", stage="extract")
+    assert jobs._record(job.id, "worker-b", stage="extract")
+    assert job_row(db, job.id).stage == "extract"
+
+def test_stale_worker_stops_before_persisting(db, meeting, monkeypatch):
+    job, _ = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    jobs.claim_next("worker-a")
+    reached = []
+
+    def processing(mid, session, mode, progress, refresh=False):
+        progress("transcribe", "running")
+        # Another worker takes over while this one is still running
+        session.query(models.ProcessingJob).filter_by(id=job.id).update({"lease_owner": "worker-b"})
+        session.commit()
+        progress("transcribe", "done")
+        reached.append("persist")
+
+    monkeypatch.setattr(jobs, "real_processing", processing)
+    jobs.run_job(job.id, "worker-a")
+    assert reached == []
+    row = job_row(db, job.id)
+    assert row.status == models.JobStatus.running and row.lease_owner == "worker-b"
+
+def test_failures_retry_with_backoff_then_fail(db, meeting, monkeypatch):
+    def failing(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(jobs, "real_processing", failing)
+    monkeypatch.setattr(jobs, "JOB_RETRY_BASE_SECONDS", 30)
+    job, _ = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    row = job_row(db, job.id)
+    row.max_attempts = 2
+    db.commit()
+
+    jobs.claim_next("worker-a")
+    jobs.run_job(job.id, "worker-a")
+    row = job_row(db, job.id)
+    assert row.status == models.JobStatus.queued and row.error == "model unavailable"
+    assert row.lease_owner is None
+    assert row.run_after > jobs.utcnow() + timedelta(seconds=20)
+    assert jobs.claim_next("worker-a") is None  # still backing off
+
+    row.run_after = jobs.utcnow()
+    db.commit()
+    assert jobs.claim_next("worker-a") == job.id
+    jobs.run_job(job.id, "worker-a")
+    row = job_row(db, job.id)
+    assert row.status == models.JobStatus.failed and row.attempts == 2
+
+def test_refresh_requested_while_running_runs_again(db, meeting, monkeypatch):
+    runs = []
+
+    def processing(mid, session, mode, progress, refresh=False):
+        runs.append(refresh)
+        if len(runs) == 1:
+            jobs.enqueue_processing(session, mid, ExtractionMode.single, refresh=True)
+
+    monkeypatch.setattr(jobs, "real_processing", processing)
+    job, _ = jobs.enqueue_processing(db, meeting.id, ExtractionMode.single)
+    jobs.claim_next("worker-a")
+    jobs.run_job(job.id, "worker-a")
+    assert job_row(db, job.id).status == models.JobStatus.queued
+
+    assert jobs.claim_next("worker-a") == job.id
+    jobs.run_job(job.id, "worker-a")
+    assert runs == [False, True]
+    assert job_row(db, job.id).status == models.JobStatus.succeeded
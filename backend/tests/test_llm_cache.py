@@ -0,0 +1,80 @@
+import time
+import uuid
+
+import pytest
+
+from app import llm
+from app.llm_cache import LLMCache, llm_cache, make_key, normalize_text
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(str(tmp_path / "cache.db"), ttl_seconds=60, memory_entries=2, max_bytes=1000)
+
+def test_second_call_is_a_cache_hit(provider):
+    transcript = f"Alice: ship the release on Friday. ({uuid.uuid4()})"
+    before = llm_cache.stats()
+    first = llm.cached_generate("answer_question", transcript, "What was decided?")
+    second = llm.cached_generate("answer_question", transcript, "What was decided?")
+    assert first == second == "Stub response."
+    assert len(provider.prompts) == 1
+    after = llm_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["memory_hits"] == before["memory_hits"] + 1
+
+def test_different_input_or_kind_misses(provider):
+    transcript = f"Bob: hire two engineers. ({uuid.uuid4()})"
+    llm.cached_generate("answer_question", transcript, "Who is hiring?")
+    llm.cached_generate("answer_question", transcript + " Carol: agreed.", "Who is hiring?")
+    llm.cached_generate("merge_summaries", transcript, "Who is hiring?")
+    assert len(provider.prompts) == 3
+
+def test_lazy_contents_only_run_on_a_miss(provider):
+    key = str(uuid.uuid4())
+    built = []
+
+    def contents():
+        built.append(key)
+        return "Describe the upload"
+
+    llm.cached_generate("analyze_image", key, contents)
+    llm.cached_generate("analyze_image", key, contents)
+    assert built == [key] and len(provider.prompts) == 1
+
+def test_rejected_responses_are_not_cached(provider):
+    key = str(uuid.uuid4())
+    for _ in range(2):
+        llm.cached_generate("answer_question", key, "Question", validate=lambda text: False)
+    assert len(provider.prompts) == 2
+
+def test_keys_ignore_cosmetic_whitespace():
+    assert normalize_text("  Alice:   hi \n\n Bob: hello  ") == "Alice: hi\nBob: hello"
+    assert make_key("m", "kind", "1", "a") != make_key("m", "kind", "2", "a")
+
+def test_disk_tier_serves_entries_evicted_from_memory(cache):
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get("a") == "A"
+    assert cache.stats()["disk_hits"] == 1
+
+def test_entries_expire(cache):
+    cache.ttl_seconds = 0.05
+    cache.set("a", "A")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["expired"] == 1
+
+def test_least_recently_used_entries_are_evicted_over_the_byte_budget(cache):
+    for key in ("first", "second", "third"):
+        cache.set(key, key * 80)  # 400-ish bytes each, 1000 allowed
+        time.sleep(0.01)
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["disk_bytes"] <= 1000
+    assert cache.get("first") is None  # also gone from memory, which holds two entries
+    assert cache.get("third") == "third" * 80
+
+def test_invalidate_meeting_drops_only_its_entries(cache):
+    cache.set("a", "A", meeting_id="m1")
+    cache.set("b", "B", meeting_id="m2")
+    assert cache.invalidate_meeting("m1") == 1
+    assert cache.get("a") is None and cache.get("b") == "B"
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import llm, llm_provider
+from app.llm_cache import llm_cache, make_key
+from app.llm_provider import GeminiProvider, set_provider
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+@pytest.fixture
+def gemini(monkeypatch, tmp_path):
+    """A Gemini backend with no API key, model discovery cached under tmp_path."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setattr(llm_provider, "GEMINI_MODEL", None)
+    monkeypatch.setattr(llm_provider, "GEMINI_MODEL_CACHE_PATH", tmp_path / "gemini_model")
+    previous = llm_provider.get_provider()
+    provider = GeminiProvider()
+    set_provider(provider)
+    yield provider
+    set_provider(previous)
+
+def test_importing_the_app_does_not_load_the_gemini_sdk(tmp_path):
+    code = "import sys, app.main; print('google.generativeai' in sys.modules)"
+    env = {**os.environ, "PYTHONPATH": str(BACKEND)}
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+def test_pinned_model_needs_no_api_key(gemini, monkeypatch):
+    monkeypatch.setattr(llm_provider, "GEMINI_MODEL", "models/gemini-pinned")
+    assert gemini.model_name == "models/gemini-pinned"
+
+def test_discovered_model_is_read_from_its_cache_file(gemini):
+    llm_provider.GEMINI_MODEL_CACHE_PATH.write_text("models/gemini-discovered\n", encoding="utf-8")
+    assert gemini.model_name == "models/gemini-discovered"
+
+def test_cache_hits_are_served_without_an_api_key(gemini, monkeypatch):
+    monkeypatch.setattr(llm_provider, "GEMINI_MODEL", "models/gemini-pinned")
+    key = make_key("models/gemini-pinned", "generate_summary", llm.PROMPT_VERSIONS["generate_summary"], "offline transcript")
+    llm_cache.set(key, "Cached summary.")
+    assert llm.cached_generate("generate_summary", "offline transcript", ["unused prompt"]) == "Cached summary."
+    with pytest.raises(ValueError, match="GEMINI_API_KEY"):
+        llm.cached_generate("generate_summary", "a transcript nobody has summarized", ["prompt"])
+
+def test_unknown_provider_is_rejected(monkeypatch):
+    monkeypatch.setattr(llm_provider, "LLM_PROVIDER", "nope")
+    monkeypatch.setattr(llm_provider, "_provider", None)
+    with pytest.raises(ValueError, match="Unknown LLM_PROVIDER"):
+        llm_provider.get_provider()
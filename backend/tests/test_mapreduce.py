@@ -0,0 +1,50 @@
+import uuid
+
+from app import models
+from app.mapreduce import map_reduce_extract, merge_action_items, merge_decisions, split_transcript
+
+def speaker_lines(n, tag=""):
+    return "\n".join(f"Speaker{i % 3}: item {i} of the plan {tag} needs discussion today." for i in range(n))
+
+def test_chunks_respect_the_budget_and_keep_lines_whole():
+    text = speaker_lines(200)
+    chunks = split_transcript(text, chunk_tokens=100)
+    assert len(chunks) > 1
+    assert all(len(c) <= 400 for c in chunks)
+    assert "\n".join(chunks) == text
+
+def test_appending_leaves_earlier_chunks_unchanged():
+    text = speaker_lines(200)
+    before = split_transcript(text, chunk_tokens=100)
+    after = split_transcript(text + "\nSpeaker1: one more thing.", chunk_tokens=100)
+    assert after[:len(before) - 1] == before[:-1]
+
+def test_overlong_lines_are_split():
+    chunks = split_transcript("x" * 1000, chunk_tokens=50)
+    assert [len(c) for c in chunks] == [200] * 5
+
+def test_near_duplicate_decisions_are_merged():
+    merged = merge_decisions([["Ship the release on Friday"], ["ship the release on friday!", "Hire a designer"]])
+    assert merged == ["Ship the release on Friday", "Hire a designer"]
+
+def test_action_items_merge_and_renumber_dependencies():
+    first = [{"task": "Draft the launch plan", "owner": "Unassigned", "dependencies": []}]
+    second = [
+        {"task": "Review the budget numbers", "owner": "Bob", "dependencies": [2]},
+        {"task": "Draft the launch plan", "owner": "Alice", "due_date": "2026-02-01", "dependencies": []},
+    ]
+    merged = merge_action_items([first, second])
+    assert [a["task"] for a in merged] == ["Draft the launch plan", "Review the budget numbers"]
+    assert merged[0]["owner"] == "Alice" and merged[0]["due_date"] == "2026-02-01"
+    assert merged[1]["dependencies"] == [1]  # chunk-local item 2 is the merged item 1
+
+def test_only_new_chunks_are_mapped(db, meeting, provider):
+    text = speaker_lines(400, tag=str(uuid.uuid4()))
+    map_reduce_extract(db, meeting.id, text, ["Alice"])
+    mapped = sum("single JSON object" in p for p in provider.prompts)
+    stored = db.query(models.TranscriptChunk).filter_by(meeting_id=meeting.id).count()
+    assert mapped == stored > 1
+
+    provider.prompts.clear()
+    map_reduce_extract(db, meeting.id, text + "\nSpeaker1: a brand new closing remark.", ["Alice"])
+    assert sum("single JSON object" in p for p in provider.prompts) == 1
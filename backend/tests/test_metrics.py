@@ -0,0 +1,37 @@
+import re
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.metrics import _gauges
+
+def scrape(client) -> dict:
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    families = {}
+    for family in text_string_to_metric_families(resp.text):
+        assert family.name not in families, f"{family.name} emitted twice"
+        families[family.name] = family
+    return families
+
+def samples(family, **labels):
+    return [s for s in family.samples if all(s.labels.get(k) == v for k, v in labels.items())]
+
+def test_each_gauge_family_is_emitted_once_with_one_sample_per_engine(client):
+    families = scrape(client)
+    checkouts = families["db_pool_checkouts"]
+    assert {s.labels["engine"] for s in checkouts.samples} == {"sync", "async"}
+    assert len(families["llm_cache_hit_rate"].samples) == 1
+    assert {s.labels["status"] for s in families["processing_queue_depth"].samples} == {"queued", "running"}
+
+def test_nested_stats_become_a_key_label():
+    [depth] = _gauges("limiter", {(): {"queue_depth_by_lane": {"interactive": 1, "batch": 2}, "label": "x"}})
+    assert depth.name == "limiter_queue_depth_by_lane"
+    assert [(s.labels, s.value) for s in depth.samples] == [({"key": "interactive"}, 1), ({"key": "batch"}, 2)]
+
+def test_requests_are_timed_by_route_template(client, meeting):
+    client.get(f"/meetings/{meeting.id}/decisions")
+    requests = scrape(client)["http_request_duration_seconds"]
+    [count] = [s for s in samples(requests, route="/meetings/{mid}/decisions", method="GET", status="200")
+               if s.name.endswith("_count")]
+    assert count.value >= 1
+    assert not any(re.search(meeting.id, s.labels.get("route", "")) for s in requests.samples)
@@ -0,0 +1,68 @@
+import json
+import uuid
+
+from app import models
+from app.processing import real_processing
+
+def outputs(summary, decisions=(), action_items=()):
+    return json.dumps({"summary": summary, "decisions": list(decisions), "action_items": list(action_items)})
+
+def add_text(client, meeting, text):
+    assert client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": text}).status_code == 201
+
+def extraction_prompts(provider):
+    return [p for p in provider.prompts if "single JSON object" in p]
+
+def test_reprocessing_extracts_only_new_artifacts_and_keeps_manual_rows(client, db, meeting, provider):
+    first, second = f"Alice: kickoff {uuid.uuid4().hex}.", f"Bob: follow-up {uuid.uuid4().hex}."
+    provider.replies[first] = outputs("Kickoff summary.", ["Use Postgres"],
+                                      [{"task": "Write the schema", "owner": "Alice", "due_date": None}])
+    provider.replies[second] = outputs("Follow-up summary.", ["Use Postgres", "Hire a DBA"])
+    provider.replies["consecutive parts of one meeting"] = "Merged summary."
+
+    add_text(client, meeting, first)
+    real_processing(meeting.id, db)
+    client.post(f"/meetings/{meeting.id}/decisions", json=[{"text": "Keep the weekly demo"}])
+
+    add_text(client, meeting, second)
+    provider.prompts.clear()
+    real_processing(meeting.id, db)
+    [prompt] = extraction_prompts(provider)
+    assert second in prompt and first not in prompt
+
+    db.expire_all()
+    assert [s.text for s in db.query(models.Summary).filter_by(meeting_id=meeting.id)] == ["Merged summary."]
+    decisions = {d.text: d.source for d in db.query(models.Decision).filter_by(meeting_id=meeting.id)}
+    assert decisions == {"Use Postgres": models.OutputSource.auto, "Hire a DBA": models.OutputSource.auto,
+                         "Keep the weekly demo": models.OutputSource.manual}
+
+    provider.prompts.clear()
+    real_processing(meeting.id, db)
+    assert extraction_prompts(provider) == []  # nothing new
+
+def test_refresh_rebuilds_generated_outputs_only(client, db, meeting, provider):
+    text = f"Alice: planning {uuid.uuid4().hex}."
+    provider.replies[text] = outputs("Planning summary.", ["Ship in May"])
+    add_text(client, meeting, text)
+    real_processing(meeting.id, db)
+    client.post(f"/meetings/{meeting.id}/decisions", json=[{"text": "Manual note"}])
+
+    provider.replies[text] = outputs("Planning summary.", ["Ship in June"])
+    client.delete(f"/meetings/{meeting.id}/llm-cache")
+    real_processing(meeting.id, db, refresh=True)
+    db.expire_all()
+    assert {d.text for d in db.query(models.Decision).filter_by(meeting_id=meeting.id)} == {"Ship in June", "Manual note"}
+
+def test_failed_transcriptions_are_left_out_and_not_marked_processed(client, db, meeting, provider):
+    text = f"Alice: budget {uuid.uuid4().hex}."
+    add_text(client, meeting, text)
+    failed = models.Artifact(meeting_id=meeting.id, kind=models.ArtifactKind.audio,
+                             transcript_text="Audio transcription failed: 429 quota exceeded")
+    db.add(failed)
+    db.commit()
+
+    real_processing(meeting.id, db)
+    [prompt] = extraction_prompts(provider)
+    assert text in prompt and "transcription failed" not in prompt
+    db.refresh(failed)
+    assert failed.processed_at is None
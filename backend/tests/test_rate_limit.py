@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from app import rate_limit
+from app.rate_limit import BATCH, INTERACTIVE, LLMRateLimiter
+
+class QuotaError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limit, "LLM_RETRY_BASE_SECONDS", 0)
+
+def limiter(**kwargs):
+    options = dict(rpm=1000, tpm=1_000_000, burst_seconds=1, max_concurrency=8, min_concurrency=1, window=1.0)
+    options.update(kwargs)
+    return LLMRateLimiter(**options)
+
+def failing(codes):
+    """A call that raises a QuotaError for each code in turn, then succeeds."""
+    codes = list(codes)
+
+    def call():
+        if codes:
+            raise QuotaError(codes.pop(0))
+        return "ok"
+    return call
+
+def test_quota_errors_are_retried_and_halve_concurrency():
+    lim = limiter()
+    assert lim.call(failing([429, 429]), 10) == "ok"
+    stats = lim.stats()
+    assert stats["throttled"] == 2 and stats["retries"] == 2 and stats["failed"] == 0
+    assert lim.limit < 3  # 8 -> 4 -> 2, then one success adds 1/2
+
+def test_quota_errors_are_raised_after_the_last_retry(monkeypatch):
+    monkeypatch.setattr(rate_limit, "LLM_MAX_RETRIES", 2)
+    lim = limiter()
+    with pytest.raises(QuotaError):
+        lim.call(failing([429] * 3), 10)
+    assert lim.stats()["failed"] == 1 and lim.limit == 1
+
+def test_other_errors_leave_concurrency_unchanged():
+    lim = limiter(max_concurrency=4)
+    lim.limit = 2.0
+    with pytest.raises(QuotaError):
+        lim.call(failing([500]), 10)
+    assert lim.limit == 2.0 and lim.stats()["retries"] == 0
+    lim.call(lambda: "ok", 10)
+    assert lim.limit == 2.5
+
+def test_request_bucket_throttles_calls():
+    # 20 requests per 1s window with a burst of 10: the last 5 calls wait for the refill (~0.5s)
+    lim = limiter(rpm=20, burst_seconds=0.5)
+    started = time.monotonic()
+    for _ in range(15):
+        lim.call(lambda: "ok", 1)
+    elapsed = time.monotonic() - started
+    assert 0.2 < elapsed < 2
+    assert lim.stats()["wait_seconds"] > 0
+
+def test_interactive_calls_go_first():
+    lim = limiter(max_concurrency=1)
+    order = []
+    gate = threading.Event()
+    holder = threading.Thread(target=lim.call, args=(gate.wait, 1))
+    holder.start()
+    while lim.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+
+    batch = threading.Thread(target=lim.call, args=(lambda: order.append("batch"), 1, BATCH))
+    batch.start()
+    while lim.stats()["queue_depth"] < 1:
+        time.sleep(0.01)
+    interactive = threading.Thread(target=lim.call, args=(lambda: order.append("interactive"), 1, INTERACTIVE))
+    interactive.start()
+    while lim.stats()["queue_depth"] < 2:
+        time.sleep(0.01)
+
+    gate.set()
+    for thread in (holder, batch, interactive):
+        thread.join(5)
+    assert order == ["interactive", "batch"]
+
+def test_closed_stream_frees_its_slot_without_growing_the_limit():
+    lim = limiter(max_concurrency=8)
+    lim.limit = 4.0
+    chunks = lim.stream(lambda: iter(["a", "b", "c"]), 10)
+    assert next(chunks) == "a"
+    assert lim.in_flight == 1
+    chunks.close()  # the client went away mid-answer
+    assert lim.in_flight == 0 and lim.limit == 4.0
+
+    assert list(lim.stream(lambda: iter(["a", "b"]), 10)) == ["a", "b"]
+    assert lim.limit == 4.25  # a finished stream counts as a success
@@ -0,0 +1,43 @@
+import json
+
+from app import models, retrieval
+from app.retrieval import build_index, get_index, search
+
+TRANSCRIPT = (
+    "Alice (Chair): Welcome everyone. The budget review is due Friday.\n"
+    "Bob: I will draft the hiring plan. Marketing needs two designers.\n"
+    "Notes without a speaker mention the budget once more."
+)
+
+def test_sentences_keep_speaker_and_offset():
+    sentences = build_index(TRANSCRIPT)["sentences"]
+    assert [s["speaker"] for s in sentences] == ["Alice", "Alice", "Bob", "Bob", None]
+    for s in sentences:
+        assert TRANSCRIPT[s["offset"]:s["offset"] + len(s["text"])] == s["text"]
+
+def test_best_matching_sentences_come_first():
+    hits = search(build_index(TRANSCRIPT), "When is the budget review due?", k=2)
+    assert hits[0]["text"] == "The budget review is due Friday."
+    assert hits[0]["score"] > hits[1]["score"]
+    assert search(build_index(TRANSCRIPT), "the of and") == []
+    assert search(build_index(""), "budget") == []
+
+def test_index_is_stored_and_rebuilt_for_a_new_transcript(db, meeting):
+    first = get_index(db, meeting.id, TRANSCRIPT)
+    row = db.get(models.TranscriptIndex, meeting.id)
+    assert json.loads(row.index_json) == first
+
+    longer = TRANSCRIPT + "\nCarol: Budget approved."
+    assert len(get_index(db, meeting.id, longer)["sentences"]) == len(first["sentences"]) + 1
+    db.refresh(row)
+    assert row.transcript_hash == retrieval.transcript_hash(longer)
+
+def test_stored_index_is_loaded_without_rebuilding(db, meeting, monkeypatch):
+    stored = get_index(db, meeting.id, TRANSCRIPT)
+    retrieval._cache.clear()
+
+    def rebuild(transcript):
+        raise AssertionError("index rebuilt")
+
+    monkeypatch.setattr(retrieval, "build_index", rebuild)
+    assert get_index(db, meeting.id, TRANSCRIPT) == stored
@@ -0,0 +1,45 @@
+import uuid
+
+from app import models
+from app.search import fts5_query, rebuild_search_index
+
+def test_user_input_becomes_a_quoted_fts5_query():
+    assert fts5_query('budget "review" OR NEAR(x') == '"budget" "review" "OR" "NEAR" "x"'
+    assert fts5_query("hir*") == '"hir"*'
+    assert fts5_query("  ?! ") == ""
+
+def test_matches_across_kinds_with_highlights(client, meeting):
+    word = f"zebra{uuid.uuid4().hex[:8]}"
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": f"Alice: the {word} rollout starts Monday."})
+    client.post(f"/meetings/{meeting.id}/decisions", json=[{"text": f"Approve the {word} rollout"}])
+    client.post(f"/meetings/{meeting.id}/action-items", json=[{"task": f"Announce the {word} rollout"}])
+
+    hits = client.get("/search", params={"q": word}).json()
+    assert {h["kind"] for h in hits} == {"transcript", "decision", "action_item"}
+    assert all(f"<mark>{word}</mark>" in h["snippet"] for h in hits)
+    only = client.get("/search", params={"q": word, "kind": "decision"}).json()
+    assert [h["kind"] for h in only] == ["decision"]
+    assert client.get("/search", params={"q": word, "kind": "nope"}).status_code == 400
+
+def test_updates_and_deletes_stay_in_sync(client, db, meeting):
+    word, other = f"yak{uuid.uuid4().hex[:8]}", f"gnu{uuid.uuid4().hex[:8]}"
+    [decision] = client.post(f"/meetings/{meeting.id}/decisions", json=[{"text": f"Buy a {word}"}]).json()
+    client.post(f"/meetings/{meeting.id}/decisions", json=[{"id": decision["id"], "text": f"Buy a {other}"}])
+    assert client.get("/search", params={"q": word}).json() == []
+    assert [h["id"] for h in client.get("/search", params={"q": other}).json()] == [decision["id"]]
+
+    db.delete(db.get(models.Decision, decision["id"]))
+    db.commit()
+    rebuild_search_index()
+    assert client.get("/search", params={"q": other}).json() == []
+
+def test_prefix_and_meeting_filter(client, db, meeting):
+    stem = f"quokka{uuid.uuid4().hex[:6]}x"  # ends in one consonant, so stemming "…xing" keeps the stem
+    other = models.Meeting(title="Retro", created_by="tests")
+    db.add(other)
+    db.commit()
+    for m in (meeting, other):
+        client.post(f"/meetings/{m.id}/decisions", json=[{"text": f"Adopt {stem}ing"}])
+    assert len(client.get("/search", params={"q": f"{stem}*"}).json()) == 2
+    scoped = client.get("/search", params={"q": f"{stem}*", "meeting_id": other.id}).json()
+    assert [h["meeting_id"] for h in scoped] == [other.id]
@@ -0,0 +1,55 @@
+import uuid
+
+import numpy as np
+
+from app import models, semantic
+from app.semantic import VectorStore, index_meeting, search_meetings
+
+def unit(*values):
+    v = np.array(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+def store(tmp_path, vectors):
+    s = VectorStore(tmp_path / "index")
+    s.reset("test", len(vectors[0]))
+    s.append(np.stack(vectors))
+    return s
+
+def test_search_returns_closest_rows_and_skips_tombstones(tmp_path):
+    s = store(tmp_path, [unit(1, 0, 0), unit(1, 1, 0), unit(0, 0, 1)])
+    assert [row for row, _ in s.search(unit(1, 0.2, 0), k=2)] == [0, 1]
+    s.clear([0])
+    assert [row for row, _ in s.search(unit(1, 0.2, 0), k=2)] == [1]
+
+def test_ivf_probes_nearby_lists_and_rows_added_since_training(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic, "SEMANTIC_IVF_MIN_ROWS", 4)
+    monkeypatch.setattr(semantic, "SEMANTIC_IVF_PROBES", 1)
+    s = store(tmp_path, [unit(1, 0.1 * i, 0) for i in range(3)] + [unit(0, 0.1 * i, 1) for i in range(3)])
+    s.maybe_train_ivf()
+    assert s.meta()["ivf_rows"] == 6
+    s.append(np.stack([unit(1, 0, 0.05)]))
+    rows = [row for row, _ in s.search(unit(1, 0, 0), k=10)]
+    assert 6 in rows and not {3, 4, 5} & set(rows)
+
+def test_empty_probed_lists_return_no_hits(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic, "SEMANTIC_IVF_PROBES", 1)
+    s = store(tmp_path, [unit(1, 0), unit(1, 0.1)])
+    np.save(s.centroids_path, np.stack([unit(1, 0), unit(0, 1)]))
+    np.save(s.lists_path, np.zeros(2, dtype=np.int32))  # every row sits in list 0
+    s._write_meta({**s.meta(), "ivf_rows": 2})
+    assert s.search(unit(0, 1), k=5) == []
+
+def test_meetings_are_found_by_meaning_and_reindexed_incrementally(db, meeting):
+    topic = uuid.uuid4().hex
+    transcript = f"Alice: the {topic} migration moves billing to the new warehouse.\nBob: agreed."
+    assert index_meeting(db, meeting.id, transcript) == 1
+    hits = search_meetings(db, f"{topic} billing migration")
+    assert hits[0]["meeting_id"] == meeting.id and hits[0]["title"] == "Weekly sync"
+
+    assert index_meeting(db, meeting.id, transcript) == 0  # unchanged: nothing re-embedded
+    index_meeting(db, meeting.id, "Alice: something else entirely.")
+    assert db.query(models.SemanticChunk).filter_by(meeting_id=meeting.id).count() == 1
+    assert all(h["meeting_id"] != meeting.id for h in search_meetings(db, f"{topic} billing migration"))
+
+def test_semantic_endpoint(client):
+    assert client.get("/search/semantic", params={"q": "   "}).json() == []
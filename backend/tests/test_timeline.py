@@ -0,0 +1,44 @@
+from app import timeline
+
+TRANSCRIPT = "\n".join([
+    "Alice (Chair): Welcome everyone to the planning meeting today.",
+    "Alice (Chair): First item is the budget.",
+    "Bob: The budget is approved.",
+    "a line without a speaker",
+    "Alice (Chair): Great, thanks.",
+])
+
+def flow(client, meeting, **params):
+    resp = client.get(f"/meetings/{meeting.id}/action-flow", params=params)
+    assert resp.status_code == 200
+    return resp.json()
+
+def test_timeline_counts_lines_turns_and_talk_share(client, meeting):
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": TRANSCRIPT})
+    page = flow(client, meeting)
+    assert [(e["position"], e["turn"], e["speaker"]) for e in page["timeline"]] == [
+        (0, 1, "Alice"), (1, 1, "Alice"), (2, 2, "Bob"), (3, 3, "Alice"),
+    ]
+    assert page["total"] == 4 and page["turns"] == 3
+    alice, bob = page["speakers"]
+    assert (alice["speaker"], alice["lines"], alice["turns"], alice["words"]) == ("Alice", 3, 2, 14)
+    assert bob["talk_share"] == round(4 / 18, 4)
+
+def test_pages_and_speaker_filter(client, meeting):
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": TRANSCRIPT})
+    assert [e["position"] for e in flow(client, meeting, offset=1, limit=2)["timeline"]] == [1, 2]
+    only_alice = flow(client, meeting, speaker="Alice", offset=1)
+    assert [e["position"] for e in only_alice["timeline"]] == [1, 3] and only_alice["total"] == 3
+
+def test_rebuilt_only_when_the_transcript_changes(client, meeting, monkeypatch):
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": TRANSCRIPT})
+    flow(client, meeting)
+    builds = []
+    build = timeline.build_timeline
+    monkeypatch.setattr(timeline, "build_timeline", lambda *args: builds.append(1) or build(*args))
+
+    client.post(f"/meetings/{meeting.id}/decisions", json=[{"text": "Budget approved"}])
+    assert flow(client, meeting)["total"] == 4 and builds == []  # only outputs changed
+
+    client.post(f"/meetings/{meeting.id}/artifacts/text", json={"text": "Carol: One more thing."})
+    assert flow(client, meeting)["total"] == 5 and builds == [1]
@@ -0,0 +1,53 @@
+import threading
+import uuid
+
+from app import models
+from app.artifacts import remember_transcript
+from app.llm_cache import hash_file
+from app.processing import transcribe_artifacts
+
+def add_audio(db, meeting, tmp_path, content=None):
+    path = tmp_path / f"{uuid.uuid4()}.mp3"
+    path.write_bytes(content or uuid.uuid4().bytes)
+    artifact = models.Artifact(meeting_id=meeting.id, kind=models.ArtifactKind.audio, file_path=str(path))
+    db.add(artifact)
+    db.commit()
+    return artifact
+
+def test_artifacts_are_transcribed_concurrently(db, meeting, provider, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.processing.TRANSCRIBE_CONCURRENCY", 3)
+    artifacts = [add_audio(db, meeting, tmp_path) for _ in range(3)]
+    together = threading.Barrier(3, timeout=5)  # breaks, failing every call, unless all three overlap
+    respond = provider.respond
+
+    def overlapping(prompt, json_output):
+        together.wait()
+        return respond(prompt, json_output)
+
+    monkeypatch.setattr(provider, "respond", overlapping)
+    transcribe_artifacts(db, meeting.id, artifacts)
+    assert [a.transcript_text for a in artifacts] == ["Stub response."] * 3
+    db.expire_all()
+    assert all(db.get(models.Artifact, a.id).transcript_text == "Stub response." for a in artifacts)
+    assert db.get(models.Meeting, meeting.id).updated_at is not None  # workers' Core updates still mark the meeting
+
+def test_known_content_reuses_its_transcript(db, meeting, provider, tmp_path):
+    content = uuid.uuid4().bytes
+    path = tmp_path / "earlier.mp3"
+    path.write_bytes(content)
+    remember_transcript(db, hash_file(str(path)), models.ArtifactKind.audio, "Alice: we already heard this one.")
+    db.commit()
+
+    artifact = add_audio(db, meeting, tmp_path, content)
+    transcribe_artifacts(db, meeting.id, [artifact])
+    assert artifact.transcript_text == "Alice: we already heard this one."
+    assert provider.prompts == []
+
+def test_failed_attempts_are_retried(db, meeting, provider, tmp_path):
+    artifact = add_audio(db, meeting, tmp_path)
+    artifact.transcript_text = "Audio transcription failed: quota exceeded"
+    db.commit()
+    transcribe_artifacts(db, meeting.id, [artifact])
+    assert artifact.transcript_text == "Stub response."
+    assert len(provider.prompts) == 1
+    assert db.get(models.TranscriptMemo, artifact.content_hash).transcript_text == "Stub response."
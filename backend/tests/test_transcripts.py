@@ -0,0 +1,46 @@
+from app import models
+from app.db import SessionLocal
+from app.transcripts import append_transcript, load_transcript
+
+def add_text(db, mid, text):
+    artifact = models.Artifact(meeting_id=mid, kind=models.ArtifactKind.text, transcript_text=text)
+    db.add(artifact)
+    db.commit()
+    return artifact
+
+def stored(mid):
+    with SessionLocal() as db:
+        return load_transcript(db, mid)
+
+def test_appends_bump_the_version(db, meeting):
+    append_transcript(db, add_text(db, meeting.id, "Alice: hello."))
+    first = stored(meeting.id)
+    append_transcript(db, add_text(db, meeting.id, "Bob: hi."))
+    second = stored(meeting.id)
+    assert first.text == "Alice: hello."
+    assert second.text == "Alice: hello.\nBob: hi."
+    assert second.version == first.version + 1
+    append_transcript(db, add_text(db, meeting.id, "Bob: hi."))  # exact repeat
+    assert stored(meeting.id) == second
+
+def test_stale_writer_rebuilds_instead_of_overwriting(db, meeting):
+    append_transcript(db, add_text(db, meeting.id, "Alice: first."))
+    late = add_text(db, meeting.id, "Bob: second.")
+    stale = db.get(models.MeetingTranscript, meeting.id)  # read before the other writer commits
+    version = stale.version
+
+    with SessionLocal() as other:
+        append_transcript(other, add_text(other, meeting.id, "Carol: third."))
+    assert stored(meeting.id).version == version + 1
+
+    # Writing from the stale row fails the version check; the loser rebuilds from the artifacts
+    append_transcript(db, late)
+    result = stored(meeting.id)
+    assert result.version == version + 2
+    assert sorted(result.text.split("\n")) == ["Alice: first.", "Bob: second.", "Carol: third."]
+
+def test_missing_row_is_built_on_read(db, meeting):
+    add_text(db, meeting.id, "Alice: one.")
+    add_text(db, meeting.id, "Bob: two.")
+    assert db.get(models.MeetingTranscript, meeting.id) is None
+    assert stored(meeting.id).text == "Alice: one.\nBob: two."
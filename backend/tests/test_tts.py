@@ -0,0 +1,50 @@
+import os
+import uuid
+
+import pytest
+
+from app import models, tts
+
+@pytest.fixture
+def synthesize(monkeypatch):
+    """Renders write the spoken text as the file body; returns the list of rendered texts."""
+    rendered = []
+
+    def fake(text, voice, out_path):
+        rendered.append(text)
+        out_path.write_bytes(text.encode("utf-8") * 50)
+
+    monkeypatch.setattr(tts, "_synthesize", fake)
+    return rendered
+
+def add_summary(db, meeting):
+    text = f"We agreed to ship {uuid.uuid4().hex}."
+    db.add(models.Summary(meeting_id=meeting.id, text=text))
+    db.commit()
+    return text
+
+def test_avatar_is_rendered_once_and_revalidated(client, db, meeting, synthesize):
+    text = add_summary(db, meeting)
+    first = client.get(f"/meetings/{meeting.id}/avatar")
+    assert first.status_code == 200 and first.content == text.encode() * 50
+    again = client.get(f"/meetings/{meeting.id}/avatar")
+    assert again.content == first.content and synthesize == [text]
+
+    etag = first.headers["etag"]
+    assert client.get(f"/meetings/{meeting.id}/avatar", headers={"If-None-Match": etag}).status_code == 304
+    part = client.get(f"/meetings/{meeting.id}/avatar", headers={"Range": "bytes=0-9"})
+    assert part.status_code == 206 and part.content == first.content[:10]
+    assert not tts._serving  # released once each response was sent
+
+def test_eviction_skips_files_being_served(synthesize):
+    served = tts.render(f"served {uuid.uuid4().hex}")
+    other = tts.render(f"other {uuid.uuid4().hex}")
+    os.utime(served, (1, 1))  # least recently used
+    assert tts.acquire(served.stem) == served
+    try:
+        tts.evict(max_bytes=0)
+        assert served.exists() and not other.exists()
+    finally:
+        tts.release(served)
+    tts.evict(max_bytes=0)
+    assert not served.exists()
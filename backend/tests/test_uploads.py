@@ -0,0 +1,60 @@
+import hashlib
+import os
+import uuid
+
+from app import models, uploads
+
+def start(client, meeting, filename="standup.mp3"):
+    resp = client.post(f"/meetings/{meeting.id}/uploads", json={"kind": "audio", "filename": filename})
+    assert resp.status_code == 201
+    return f"/meetings/{meeting.id}/uploads/{resp.json()['id']}"
+
+def test_resumable_upload_creates_a_hashed_artifact(client, meeting):
+    data = uuid.uuid4().bytes * 100
+    url = start(client, meeting)
+    assert client.put(f"{url}?offset=0", content=data[:1000]).json()["received_bytes"] == 1000
+    assert client.get(url).json()["received_bytes"] == 1000  # where a dropped client resumes
+    assert client.put(f"{url}?offset=1000", content=data[1000:]).json()["received_bytes"] == len(data)
+
+    resp = client.post(f"{url}/complete")
+    assert resp.status_code == 201
+    digest = hashlib.sha256(data).hexdigest()
+    artifact = resp.json()
+    assert artifact["content_hash"] == digest and artifact["size_bytes"] == len(data)
+    assert (uploads.UPLOAD_DIR / f"{digest}.mp3").read_bytes() == data
+    assert client.get(url).status_code == 404
+
+def test_chunk_at_the_wrong_offset_is_rejected(client, meeting):
+    url = start(client, meeting)
+    client.put(f"{url}?offset=0", content=b"abcd")
+    resp = client.put(f"{url}?offset=2", content=b"cd")
+    assert resp.status_code == 409 and resp.json()["detail"] == "Expected offset 4"
+
+def test_upload_over_the_limit_keeps_what_was_written(client, meeting, monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_UPLOAD_BYTES", 10)
+    url = start(client, meeting)
+    client.put(f"{url}?offset=0", content=b"x" * 6)
+    assert client.put(f"{url}?offset=6", content=b"x" * 6).status_code == 413
+    assert client.get(url).json()["received_bytes"] == 6
+
+def test_concurrent_writer_is_turned_away(client, meeting):
+    url = start(client, meeting)
+    with uploads.exclusive(url.rsplit("/", 1)[1]):
+        assert client.put(f"{url}?offset=0", content=b"abcd").status_code == 409
+        assert client.post(f"{url}/complete").status_code == 409
+    assert client.put(f"{url}?offset=0", content=b"abcd").status_code == 200
+
+def test_complete_without_partial_data_asks_for_a_restart(client, meeting, db):
+    url = start(client, meeting)
+    client.put(f"{url}?offset=0", content=b"abcd")
+    upload_id = url.rsplit("/", 1)[1]
+    os.remove(uploads.partial_path(upload_id))
+    assert client.post(f"{url}/complete").status_code == 409
+    assert db.get(models.UploadSession, upload_id).received_bytes == 0
+
+def test_identical_files_are_stored_once(client, meeting):
+    data = uuid.uuid4().bytes
+    first = client.post(f"/meetings/{meeting.id}/artifacts/audio", files={"file": ("a.mp3", data)}).json()
+    second = client.post(f"/meetings/{meeting.id}/artifacts/audio", files={"file": ("b.mp3", data)}).json()
+    assert first["id"] != second["id"]
+    assert first["url"] == second["url"]
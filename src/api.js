@@ -1,9 +1,24 @@
 const BASE = (import.meta.env.VITE_API_URL || "http://localhost:8000").replace(/\/+$/, "");
 const DEFAULT_AVATAR = "https://www.gravatar.com/avatar/?d=mp";
+const PAGE_SIZE = 200; // the API's maximum page size
+
+// List endpoints return one page at a time; follow the X-Next-Cursor header until the last page
+async function fetchAllPages(path) {
+  const items = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`${BASE}${path}?${params}`);
+    if (!res.ok) throw new Error(`Request for ${path} failed with status ${res.status}`);
+    items.push(...(await res.json()));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
+}
 
 export async function fetchMeetings() {
-  const res = await fetch(`${BASE}/meetings`);
-  return res.json();
+  return fetchAllPages("/meetings");
 }
 
 export async function createMeeting(meeting) {
@@ -16,8 +31,7 @@ export async function createMeeting(meeting) {
 }
 
 export async function fetchParticipants(meetingId) {
-  const res = await fetch(`${BASE}/meetings/${meetingId}/participants`);
-  let participants = await res.json();
+  const participants = await fetchAllPages(`/meetings/${meetingId}/participants`);
   return participants.map(p => ({ ...p, avatar: p.avatar || DEFAULT_AVATAR }));
 }
 
@@ -31,11 +45,25 @@ export async function addParticipants(meetingId, participants) {
   return res.json();
 }
 
-export async function fetchSummaries(meetingId) {
-  const res = await fetch(`${BASE}/meetings/${meetingId}/summary`);
+// Meeting, participants, artifacts, summaries, decisions and action items in one request.
+// The response carries an ETag, so the browser revalidates it with a cheap 304 when polling.
+export async function fetchMeetingBundle(meetingId) {
+  const res = await fetch(`${BASE}/meetings/${meetingId}/bundle`);
   return res.json();
 }
 
+// One page of the speaker timeline; `speakers` (optional) keeps only their lines
+export async function fetchActionFlow(meetingId, { offset = 0, limit = 100, speakers = [] } = {}) {
+  const params = new URLSearchParams({ offset, limit });
+  speakers.forEach(s => params.append("speaker", s));
+  const res = await fetch(`${BASE}/meetings/${meetingId}/action-flow?${params}`);
+  return res.json();
+}
+
+export async function fetchSummaries(meetingId) {
+  return fetchAllPages(`/meetings/${meetingId}/summary`);
+}
+
 export async function addSummary(meetingId, text) {
   const res = await fetch(`${BASE}/meetings/${meetingId}/summary`, {
     method: "POST",
@@ -46,8 +74,7 @@ export async function addSummary(meetingId, text) {
 }
 
 export async function fetchDecisions(meetingId) {
-  const res = await fetch(`${BASE}/meetings/${meetingId}/decisions`);
-  return res.json();
+  return fetchAllPages(`/meetings/${meetingId}/decisions`);
 }
 
 export async function addDecisions(meetingId, decisions) {
@@ -60,8 +87,7 @@ export async function addDecisions(meetingId, decisions) {
 }
 
 export async function fetchActionItems(meetingId) {
-  const res = await fetch(`${BASE}/meetings/${meetingId}/action-items`);
-  return res.json();
+  return fetchAllPages(`/meetings/${meetingId}/action-items`);
 }
 
 export async function addActionItems(meetingId, items) {
@@ -82,4 +108,52 @@ export async function chatMeeting(meetingId, question) {
   return res.json();
 }
 
+// A chat session keeps the conversation history server-side, so follow-up questions can refer to earlier ones
+export async function createChatSession(meetingId) {
+  const res = await fetch(`${BASE}/meetings/${meetingId}/chat/sessions`, { method: "POST" });
+  return res.json();
+}
+
+// Streams the answer as Server-Sent Events. onDelta receives each chunk as it is generated;
+// aborting `signal` closes the connection, which also stops generation on the server.
+export async function streamChat(meetingId, question, { sessionId, onDelta, onSources, signal } = {}) {
+  const res = await fetch(`${BASE}/meetings/${meetingId}/chat/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ question, session_id: sessionId }),
+    signal,
+  });
+  if (!res.ok) throw new Error(`Chat failed with status ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let answer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let end;
+    while ((end = buffer.indexOf("\n\n")) >= 0) {
+      const frame = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === "sources") onSources?.(payload);
+      else if (event === "done") answer = payload.answer;
+      else {
+        answer += payload.delta;
+        onDelta?.(payload.delta);
+      }
+    }
+  }
+  return answer;
+}
+
 // Removed unused fetchArtifacts
@@ -1,50 +1,80 @@
 // src/components/ActionFlow.jsx
 import React, { useEffect, useState, useContext } from "react";
-import axios from "axios";
 import { MeetingContext } from "../context/MeetingContext";
+import { fetchActionFlow } from "../api";
+
+const PAGE_SIZE = 100;
 
 export default function ActionFlow({ meetingId: propMeetingId }) {
   const { meetingId: ctxMeetingId } = useContext(MeetingContext);
   const meetingId = propMeetingId || ctxMeetingId;
 
   const [timeline, setTimeline] = useState([]);
+  const [speakers, setSpeakers] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [selected, setSelected] = useState(null);
   const [loading, setLoading] = useState(true);
 
+  const loadPage = async (offset) => {
+    setLoading(true);
+    try {
+      const page = await fetchActionFlow(meetingId, {
+        offset,
+        limit: PAGE_SIZE,
+        speakers: selected ? [selected] : [],
+      });
+      const entries = page.timeline || [];
+      setTimeline(prev => (offset === 0 ? entries : [...prev, ...entries]));
+      setSpeakers(page.speakers || []);
+      setTotal(page.total || 0);
+    } catch (err) {
+      console.error("Failed to fetch timeline", err);
+    } finally {
+      setLoading(false);
+    }
+  };
+
   useEffect(() => {
     if (!meetingId) return;
-    const fetchTimeline = async () => {
-      setLoading(true);
-      try {
-        const res = await axios.get(`http://localhost:8000/meetings/${meetingId}/action-flow`);
-        setTimeline(res.data.timeline || []);
-      } catch (err) {
-        console.error("Failed to fetch timeline", err);
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchTimeline();
-  }, [meetingId]);
+    loadPage(0);
+  }, [meetingId, selected]);
 
   if (!meetingId) return <p>No meeting selected.</p>;
-  if (loading) return <p>Loading action flow...</p>;
+  if (loading && timeline.length === 0) return <p>Loading action flow...</p>;
 
   return (
     <div className="action-flow">
       <h2>Action Flow / Timeline</h2>
+      {speakers.length > 0 && (
+        <div className="speaker-stats">
+          {speakers.map(s => (
+            <button
+              key={s.speaker}
+              className={selected === s.speaker ? "speaker active" : "speaker"}
+              onClick={() => setSelected(selected === s.speaker ? null : s.speaker)}
+            >
+              {s.speaker}: {s.turns} turns, ~{Math.round(s.talk_seconds / 60)} min ({Math.round(s.talk_share * 100)}%)
+            </button>
+          ))}
+        </div>
+      )}
       {timeline.length === 0 && <p>No timeline found in transcript.</p>}
       <div className="timeline-list">
-        {timeline.map((t, i) => (
+        {timeline.map(t => (
           <div key={t.id} className="timeline-item">
             <div className="timeline-meta">
               <strong>{t.speaker}</strong>
-              <span className="index">#{i + 1}</span>
+              <span className="index">#{t.position + 1}</span>
             </div>
             <div className="timeline-text">{t.text}</div>
           </div>
         ))}
       </div>
+      {timeline.length < total && (
+        <button onClick={() => loadPage(timeline.length)} disabled={loading}>
+          {loading ? "Loading..." : `Load more (${total - timeline.length} left)`}
+        </button>
+      )}
     </div>
   );
 }
-
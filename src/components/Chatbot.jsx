@@ -1,7 +1,7 @@
 // src/components/Chatbot.jsx
-import React, { useState, useContext } from "react";
-import axios from "axios";
+import React, { useState, useContext, useEffect, useRef } from "react";
 import { MeetingContext } from "../context/MeetingContext";
+import { createChatSession, streamChat } from "../api";
 
 export default function Chatbot({ meetingId: propMeetingId }) {
   const { meetingId: ctxMeetingId } = useContext(MeetingContext);
@@ -10,17 +10,41 @@ export default function Chatbot({ meetingId: propMeetingId }) {
   const [history, setHistory] = useState([]);
   const [q, setQ] = useState("");
   const [loading, setLoading] = useState(false);
+  const abortRef = useRef(null);
+  const sessionRef = useRef(null);
+
+  // A new meeting starts a new conversation
+  useEffect(() => {
+    sessionRef.current = null;
+    setHistory([]);
+  }, [meetingId]);
+
+  // Stop an answer in flight when the chat goes away, so the server stops generating it
+  useEffect(() => () => abortRef.current?.abort(), []);
+
+  const setLastAnswer = (update) =>
+    setHistory(prev => prev.map((h, idx) => (idx === prev.length - 1 ? { ...h, answer: update(h.answer) } : h)));
 
   const askQuestion = async () => {
     if (!q.trim() || !meetingId) return;
+    const question = q;
+    const controller = new AbortController();
+    abortRef.current = controller;
     setLoading(true);
+    setQ("");
+    setHistory(prev => [...prev, { question, answer: "" }]);
     try {
-      const res = await axios.post(`http://localhost:8000/meetings/${meetingId}/chat`, { question: q });
-      setHistory(prev => [...prev, { question: res.data.question, answer: res.data.answer }]);
-      setQ("");
+      if (!sessionRef.current) sessionRef.current = (await createChatSession(meetingId)).id;
+      const answer = await streamChat(meetingId, question, {
+        sessionId: sessionRef.current,
+        onDelta: (delta) => setLastAnswer(prev => prev + delta),
+        signal: controller.signal,
+      });
+      setLastAnswer(() => answer);
     } catch (err) {
+      if (err.name === "AbortError") return;
       console.error("Chat error", err);
-      setHistory(prev => [...prev, { question: q, answer: "Error answering question." }]);
+      setLastAnswer(() => "Error answering question.");
     } finally {
       setLoading(false);
     }
@@ -34,7 +58,7 @@ export default function Chatbot({ meetingId: propMeetingId }) {
         {history.map((h, idx) => (
           <div key={idx} className="chat-entry">
             <div className="q"><strong>You:</strong> {h.question}</div>
-            <div className="a"><strong>Bot:</strong> {h.answer}</div>
+            <div className="a"><strong>Bot:</strong> {h.answer || (loading && idx === history.length - 1 ? "…" : "")}</div>
           </div>
         ))}
       </div>
@@ -45,4 +69,3 @@ export default function Chatbot({ meetingId: propMeetingId }) {
     </div>
   );
 }
-
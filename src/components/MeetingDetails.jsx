@@ -16,22 +16,14 @@ export default function MeetingDetails({ meetingId }) {
       try {
         setLoading(true);
 
-        const summaryRes = await axios.get(
-          `http://localhost:8000/meetings/${meetingId}/summary`
-        );
-        const decisionsRes = await axios.get(
-          `http://localhost:8000/meetings/${meetingId}/decisions`
-        );
-        const actionItemsRes = await axios.get(
-          `http://localhost:8000/meetings/${meetingId}/action-items`
+        const { data: bundle } = await axios.get(
+          `http://localhost:8000/meetings/${meetingId}/bundle`
         );
 
         setData({
-          summary: Array.isArray(summaryRes.data) ? summaryRes.data : [],
-          decisions: Array.isArray(decisionsRes.data) ? decisionsRes.data : [],
-          actionItems: Array.isArray(actionItemsRes.data)
-            ? actionItemsRes.data
-            : []
+          summary: bundle.summaries || [],
+          decisions: bundle.decisions || [],
+          actionItems: bundle.action_items || []
         });
       } catch (error) {
         console.error("Error fetching meeting details:", error);
@@ -43,11 +35,15 @@ export default function MeetingDetails({ meetingId }) {
     fetchData();
 
     interval = setInterval(async () => {
-      const summaryRes = await axios.get(
-        `http://localhost:8000/meetings/${meetingId}/summary`
+      const { data: bundle } = await axios.get(
+        `http://localhost:8000/meetings/${meetingId}/bundle`
       );
-      if (Array.isArray(summaryRes.data) && summaryRes.data.length > 0) {
-        setData((prev) => ({ ...prev, summary: summaryRes.data }));
+      if (Array.isArray(bundle.summaries) && bundle.summaries.length > 0) {
+        setData({
+          summary: bundle.summaries,
+          decisions: bundle.decisions || [],
+          actionItems: bundle.action_items || []
+        });
         clearInterval(interval);
       }
     }, 5000);
@@ -64,8 +64,8 @@ function Outputs() {
     setIsProcessing(true);
     try {
       await axios.get(`http://localhost:8000/meetings/${meetingId}`);
-      await axios.post(`http://localhost:8000/meetings/${meetingId}/process`);
-      navigate("/results", { state: { selected, meetingId } });
+      const res = await axios.post(`http://localhost:8000/meetings/${meetingId}/process`);
+      navigate("/results", { state: { selected, meetingId, jobId: res.data.job_id } });
     } catch (error) {
       if (error.response?.status === 404) {
         await handleCreateNewMeeting();
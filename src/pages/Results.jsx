@@ -6,7 +6,7 @@ import "./Results.css";
 function Results() {
   const navigate = useNavigate();
   const location = useLocation();
-  const { selected, meetingId } = location.state || {};
+  const { selected, meetingId, jobId } = location.state || {};
 
   const [summary, setSummary] = useState([]);
   const [decisions, setDecisions] = useState([]);
@@ -14,6 +14,7 @@ function Results() {
   const [loading, setLoading] = useState(true);
   const [processingComplete, setProcessingComplete] = useState(false);
   const [error, setError] = useState(null);
+  const [jobStage, setJobStage] = useState(null);
 
   // Chatbot states
   const [question, setQuestion] = useState("");
@@ -35,20 +36,35 @@ function Results() {
     let pollCount = 0;
     const MAX_POLLS = 60; // Poll for up to 5 minutes (60 * 5 seconds)
 
+    // With a job id, wait for the processing job to finish instead of guessing from partial data
+    const checkJob = async () => {
+      if (!jobId) return "succeeded";
+      const res = await axios.get(`http://localhost:8000/meetings/${meetingId}/jobs/${jobId}`);
+      setJobStage(res.data.stage);
+      if (res.data.status === "failed") {
+        setError(res.data.error || "Processing failed.");
+      }
+      return res.data.status;
+    };
+
     const fetchData = async () => {
       try {
-        const [s, d, a] = await Promise.all([
-          axios.get(`http://localhost:8000/meetings/${meetingId}/summary`),
-          axios.get(`http://localhost:8000/meetings/${meetingId}/decisions`),
-          axios.get(`http://localhost:8000/meetings/${meetingId}/action-items`),
-        ]);
-        
-        setSummary(s.data);
-        setDecisions(d.data);
-        setActionItems(a.data);
+        const jobStatus = await checkJob();
+        if (jobStatus === "failed") {
+          setLoading(false);
+          if (pollInterval) clearInterval(pollInterval);
+          return true;
+        }
+        if (jobStatus !== "succeeded") return false;
+
+        const { data: bundle } = await axios.get(`http://localhost:8000/meetings/${meetingId}/bundle`);
+
+        setSummary(bundle.summaries);
+        setDecisions(bundle.decisions);
+        setActionItems(bundle.action_items);
 
         // Check if processing is complete
-        if (s.data.length > 0 || d.data.length > 0 || a.data.length > 0) {
+        if (bundle.summaries.length > 0 || bundle.decisions.length > 0 || bundle.action_items.length > 0) {
           setProcessingComplete(true);
           setLoading(false);
           if (pollInterval) clearInterval(pollInterval);
@@ -86,7 +102,7 @@ function Results() {
     return () => {
       if (pollInterval) clearInterval(pollInterval);
     };
-  }, [meetingId]);
+  }, [meetingId, jobId]);
 
   const sendChat = async () => {
     if (!question.trim()) return;
@@ -117,7 +133,7 @@ function Results() {
   const fetchAvatarAudio = async () => {
     try {
       setAudioError(null);
-      setAudioUrl(`http://localhost:8000/meetings/${meetingId}/avatar?ts=${Date.now()}`);
+      setAudioUrl(`http://localhost:8000/meetings/${meetingId}/avatar`);
     } catch (error) {
       console.error("Error fetching avatar audio:", error);
       setAudioError("Failed to generate audio. Try again later.");
@@ -129,6 +145,7 @@ function Results() {
       <div className="loading-container">
         <div className="spinner"></div>
         <p>Processing your meeting... This may take a moment.</p>
+        {jobStage && <p style={{ fontSize: "0.9em", opacity: 0.7 }}>Current step: {jobStage}</p>}
         <p style={{ fontSize: "0.9em", marginTop: "10px", opacity: 0.7 }}>
           We're generating summaries, extracting decisions, and creating action items.
         </p>